@@ -11,6 +11,7 @@ from .documents import router as documents_router
 from .employees import router as employees_router
 from .project_mappings import router as project_mappings_router
 from .projects import router as projects_router
+from .role_permissions import router as role_permissions_router
 from .root import router as root_router
 from .uploads import router as uploads_router
 from .workloads import router as workloads_router
@@ -27,6 +28,7 @@ router.include_router(documents_router)
 router.include_router(document_permissions_router)
 router.include_router(employees_router)
 router.include_router(projects_router)
+router.include_router(role_permissions_router)
 router.include_router(root_router)
 router.include_router(uploads_router)
 router.include_router(chat_router)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Header, HTTPException, Response, status
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
 
 from app.schemas.auth import (
     AuthSession,
@@ -17,6 +17,7 @@ from app.schemas.auth import (
 from app.services import auth as auth_service
 from app.services.auth import (
     AuthenticationError,
+    LoginThrottledError,
     PasswordResetError,
     UserNotFoundError,
 )
@@ -31,13 +32,20 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
     summary="Authenticate with email and password",
     response_description="Session token with the authenticated user's profile.",
 )
-async def login(payload: LoginRequest) -> AuthSession:
+async def login(payload: LoginRequest, request: Request) -> AuthSession:
     """Validate credentials and issue a short-lived session token."""
     try:
         result = await auth_service.login(
             email=payload.email,
             password=payload.password,
+            client_ip=request.client.host if request.client else None,
         )
+    except LoginThrottledError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
     except AuthenticationError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -130,13 +138,12 @@ async def get_current_user(authorization: str = Header()) -> UserProfile:
     """Resolve the user profile associated with the supplied bearer token."""
     token = auth_service.parse_bearer_token(authorization)
     try:
-        user_data = await auth_service.get_user_profile_from_token(token=token)
+        return await auth_service.get_request_profile(token)
     except (AuthenticationError, UserNotFoundError) as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(exc),
         ) from exc
-    return UserProfile.model_validate(user_data)
 
 
 @router.post(
@@ -9,6 +9,8 @@ from app.schemas import MessageResponse, UserProfile
 from app.schemas.document_permission import (
     AddDivisionPermissionRequest,
     AddUserPermissionRequest,
+    BulkPermissionRequest,
+    BulkPermissionResponse,
     DocumentPermissionsResponse,
     UpdatePermissionRequest,
 )
@@ -18,6 +20,7 @@ from app.services.document_permission import (
     DocumentPermissionError,
     add_division_permission,
     add_user_permission,
+    apply_permission_operations,
     get_document_permissions,
     remove_division_permission,
     remove_user_permission,
@@ -32,14 +35,12 @@ async def _get_current_user(authorization: str) -> UserProfile:
     """Get current user from authorization header."""
     token = auth_service.parse_bearer_token(authorization)
     try:
-        user_data = await auth_service.get_user_profile_from_token(token=token)
-        print(user_data)
+        return await auth_service.get_request_profile(token)
     except (AuthenticationError, UserNotFoundError) as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(exc),
         ) from exc
-    return UserProfile.model_validate(user_data)
 
 
 def _is_admin(user: UserProfile) -> bool:
@@ -52,6 +53,33 @@ def _is_admin(user: UserProfile) -> bool:
     return is_admin
 
 
+@router.post(
+    "/permissions/bulk",
+    response_model=BulkPermissionResponse,
+    summary="Apply permission changes in bulk",
+    response_description="Per-operation outcome in request order.",
+)
+async def bulk_permissions_endpoint(
+    payload: BulkPermissionRequest,
+    authorization: str = Header(alias="Authorization"),
+) -> BulkPermissionResponse:
+    """Grant or revoke user/division permissions across many documents in one write.
+
+    Operations on documents the caller cannot manage are reported as forbidden
+    instead of failing the whole request.
+    """
+    log_info(logger, "bulk_permissions called", operations=len(payload.operations))
+    user = await _get_current_user(authorization)
+
+    results = await apply_permission_operations(
+        payload.operations, actor_id=None if _is_admin(user) else user.id
+    )
+    applied = sum(1 for result in results if result["status"] == "applied")
+    failed = sum(1 for result in results if result["status"] in {"not_found", "forbidden"})
+    log_info(logger, "bulk_permissions succeeded", applied=applied, failed=failed)
+    return BulkPermissionResponse(results=results, applied=applied, failed=failed)
+
+
 @router.get(
     "/{document_id}/permissions",
     response_model=DocumentPermissionsResponse,
@@ -6,13 +6,16 @@ from typing import Any
 
 from fastapi import APIRouter, Header, HTTPException, Query, status
 
-from app.logging_utils import get_logger, log_debug, log_info, log_warning
-from app.models.document import DocumentItem  # NEW
+from app.logging_utils import get_logger, log_debug, log_error, log_info, log_warning
+from app.models.document import DocumentSummary
 from app.schemas import (
     DistinctValuesResponse,
     DocumentBreadcrumbSchema,
     DocumentCreate,
     DocumentResponse,
+    DocumentSearchPage,
+    DocumentSearchResult,
+    DocumentSummaryResponse,
     DocumentUpdate,
     ItemCountResponse,
     MessageResponse,
@@ -22,12 +25,18 @@ from app.services import auth as auth_service
 from app.services import document as document_service
 from app.services.auth import AuthenticationError, UserNotFoundError
 from app.services.document import DocumentAlreadyExistsError, DocumentNotFoundError
+from app.services.document_history import (
+    DocumentHistoryCorruptedError,
+    DocumentRevisionNotFoundError,
+)
 from app.services.document_permission import (
+    _resolve_user,
+    build_access_predicate,
     can_user_edit_document,
     can_user_view_document,
-    check_document_access,
     get_document_access_summary,
 )
+from app.services.document_search import SearchHit
 
 _ALLOWED_OWNER_ROLES = {"admin", "manager", "employee", "secretary"}
 
@@ -55,41 +64,72 @@ logger = get_logger(__name__)
 
 @router.get(
     "/",
-    response_model=list[DocumentResponse],
+    response_model=list[DocumentSummaryResponse],
     summary="List documents by parent",
     response_description="Documents that belong to the requested parent folder.",
 )
 async def list_documents(
     parent_id: str | None = Query(None),
     authorization: str = Header(alias="Authorization"),
-) -> list[DocumentResponse]:
+) -> list[DocumentSummaryResponse]:
     log_info(logger, "list_documents called", parent_id=parent_id)
     try:
         token = auth_service.parse_bearer_token(authorization)
-        profile_payload = await auth_service.get_user_profile_from_token(token)
+        profile = await auth_service.get_request_profile(token)
     except AuthenticationError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     except UserNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
-    owner_payload = _derive_owner_payload(UserProfile.model_validate(profile_payload))
+    owner_payload = _derive_owner_payload(profile)
 
     documents = await document_service.get_documents_by_parent(parent_id, owner_payload["id"])
     log_debug(logger, "list_documents resolved", parent_id=parent_id, result_count=len(documents))
-    return [DocumentResponse.model_validate(doc) for doc in documents]
+    return [DocumentSummaryResponse.model_validate(doc) for doc in documents]
 
 
 # -----------------------------
 # NEW: Search across accessible
 # -----------------------------
+_ALLOWED_SEARCH_TYPES = {"file", "folder"}
+
+
+def _search_type_filter(types: list[str] | None) -> list[str] | None:
+    if not types:
+        return None
+    type_filter = [t for t in types if t in _ALLOWED_SEARCH_TYPES]
+    return type_filter or None
+
+
+def _search_result(document: DocumentSummary, hit: SearchHit) -> DocumentSearchResult:
+    payload = document_service._serialize_summary(document)  # type: ignore[attr-defined]
+    return DocumentSearchResult.model_validate(
+        {**payload, "score": hit.score, "snippet": hit.snippet}
+    )
+
+
+async def _search_access_filter(authorization: str) -> tuple[UserProfile, dict[str, Any] | None]:
+    """Resolve the caller and translate their grants into a Mongo predicate."""
+    try:
+        token = auth_service.parse_bearer_token(authorization)
+        user = await auth_service.get_request_profile(token)
+    except AuthenticationError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
+    except UserNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+    db_user = await _resolve_user(user.id)
+    return user, await build_access_predicate(db_user, "viewer")
+
+
 @router.get(
     "/search",
-    response_model=list[DocumentResponse],
+    response_model=list[DocumentSearchResult],
     summary="Search accessible documents",
     response_description="All documents/folders matching query that the current user can access.",
 )
 async def search_documents(
-    q: str = Query(..., min_length=1, description="Text to search in name/category"),
+    q: str = Query(..., min_length=1, description="Words to search in name/category/content"),
     types: list[str] | None = Query(
         None,
         description="Repeat param for multiple types, e.g. ?types=file&types=folder",
@@ -97,81 +137,63 @@ async def search_documents(
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     authorization: str = Header(alias="Authorization"),
-) -> list[DocumentResponse]:
+) -> list[DocumentSearchResult]:
     """
-    Find docs/folders by name/category (case-insensitive) that the caller can view.
-    - Respects direct & inherited access via `check_document_access`
+    Find docs/folders by name, category or content that the caller can view.
+    - Every word must match; the last word also matches as a prefix
+    - Respects direct & inherited access via a Mongo predicate built by `build_access_predicate`
     - Filters by types=['file','folder'] if provided
-    - Paginates using limit+offset *after* access filtering (keeps code simple)
+    - Ranks by relevance then recency and paginates with limit+offset inside MongoDB
     """
     log_info(logger, "search_documents called", query=q, types=types, limit=limit, offset=offset)
-    # Auth -> user
-    try:
-        token = auth_service.parse_bearer_token(authorization)
-        profile_payload = await auth_service.get_user_profile_from_token(token)
-    except AuthenticationError as exc:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
-    except UserNotFoundError as exc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
-
-    user = UserProfile.model_validate(profile_payload)
-
-    # Check if user is admin for optimization
-    from app.models.user import User
-    from app.services.document_permission import _is_admin
-    
-    db_user = await User.find_one(User.employee_id == user.id)
-    is_admin = db_user and db_user.is_active and _is_admin(db_user)
-
-    # Validate type filter
-    allowed_types = {"file", "folder"}
-    type_filter: list[str] | None = None
-    if types:
-        type_filter = [t for t in types if t in allowed_types]
-        if not type_filter:
-            type_filter = None
-
-    # Build simple regex query on name/category + not deleted
-    base_query: dict[str, Any] = {
-        "is_deleted": False,
-        "$or": [
-            {"name": {"$regex": q, "$options": "i"}},
-            {"category": {"$regex": q, "$options": "i"}},
-        ],
-    }
-    if type_filter:
-        base_query["type"] = {"$in": type_filter}
-
-    # Fetch candidates (broad), then access-filter
-    candidates = await DocumentItem.find(base_query).to_list()
-
-    accessible: list[dict[str, Any]] = []
-    # For admins, skip access filtering as they have access to all documents
-    if is_admin:
-        log_debug(logger, "admin user: skipping access filter in search, showing all matching documents", user_id=user.id)
-        accessible = [document_service._serialize_document(doc) for doc in candidates]  # type: ignore[attr-defined]
-    else:
-        for doc in candidates:
-            try:
-                # viewer access (direct or inherited, assuming your check does inherited)
-                if await check_document_access(doc.document_id, user.id, "viewer"):
-                    # service ensures content normalization + shape
-                    accessible.append(document_service._serialize_document(doc))  # type: ignore[attr-defined]
-            except Exception:
-                # silently skip inaccessible/broken docs (consistent with listing semantics)
-                continue
+    user, access_filter = await _search_access_filter(authorization)
+
+    results, _ = await document_service.search_documents(
+        q,
+        access_filter,
+        types=_search_type_filter(types),
+        limit=limit,
+        offset=offset,
+    )
+    log_debug(logger, "search_documents resolved", user_id=user.id, returned=len(results))
+    return [_search_result(document, hit) for document, hit in results]
 
-    # Sort newest modified first (fallbacks if missing)
-    def _sort_key(d: dict[str, Any]):
-        # d keys follow _serialize_document shape
-        return d.get("last_modified") or d.get("date_created") or ""
 
-    accessible.sort(key=_sort_key, reverse=True)
+@router.get(
+    "/search/page",
+    response_model=DocumentSearchPage,
+    summary="Search accessible documents with a cursor",
+    response_description="One page of matching documents plus the cursor for the next page.",
+)
+async def search_documents_page(
+    q: str = Query(..., min_length=1, description="Words to search in name/category/content"),
+    types: list[str] | None = Query(
+        None,
+        description="Repeat param for multiple types, e.g. ?types=file&types=folder",
+    ),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="`next_cursor` from the previous page"),
+    authorization: str = Header(alias="Authorization"),
+) -> DocumentSearchPage:
+    """Keyset-paginated search ordered by (score, last_modified, _id), best first."""
+    log_info(logger, "search_documents_page called", query=q, types=types, limit=limit)
+    user, access_filter = await _search_access_filter(authorization)
 
-    # Pagination after access-filter
-    sliced = accessible[offset : offset + limit]
-    log_debug(logger, "search_documents resolved", accessible=len(accessible), returned=len(sliced))
-    return [DocumentResponse.model_validate(item) for item in sliced]
+    try:
+        results, next_cursor = await document_service.search_documents(
+            q,
+            access_filter,
+            types=_search_type_filter(types),
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    log_debug(logger, "search_documents_page resolved", user_id=user.id, returned=len(results))
+    return DocumentSearchPage(
+        items=[_search_result(document, hit) for document, hit in results],
+        next_cursor=next_cursor,
+    )
 
 
 # -----------------------------
@@ -191,14 +213,12 @@ async def get_document(
     # Enforce access (direct or inherited from ancestor folders)
     try:
         token = auth_service.parse_bearer_token(authorization)
-        profile_payload = await auth_service.get_user_profile_from_token(token)
+        user = await auth_service.get_request_profile(token)
     except AuthenticationError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     except UserNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
-    user = UserProfile.model_validate(profile_payload)
-
     allowed = await can_user_view_document(document_id, user.id)
     if not allowed:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -295,13 +315,13 @@ async def create_document(
 ) -> DocumentResponse:
     try:
         token = auth_service.parse_bearer_token(authorization)
-        profile_payload = await auth_service.get_user_profile_from_token(token)
+        profile = await auth_service.get_request_profile(token)
     except AuthenticationError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     except UserNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
-    owner_payload = _derive_owner_payload(UserProfile.model_validate(profile_payload))
+    owner_payload = _derive_owner_payload(profile)
 
     try:
         document = await document_service.create_document(
@@ -330,13 +350,12 @@ async def update_document(
     # identify editor and enforce edit access
     try:
         token = auth_service.parse_bearer_token(authorization)
-        profile_payload = await auth_service.get_user_profile_from_token(token)
+        user = await auth_service.get_request_profile(token)
     except AuthenticationError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     except UserNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
-    user = UserProfile.model_validate(profile_payload)
     allowed = await can_user_edit_document(document_id, user.id)
     if not allowed:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -364,14 +383,12 @@ async def get_edit_history(document_id: str, authorization: str = Header(alias="
     log_info(logger, "get_edit_history called", document_id=document_id)
     try:
         token = auth_service.parse_bearer_token(authorization)
-        profile_payload = await auth_service.get_user_profile_from_token(token)
+        user = await auth_service.get_request_profile(token)
     except AuthenticationError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     except UserNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
-    user = UserProfile.model_validate(profile_payload)
-
     # owner or editor access
     is_owner = False
     try:
@@ -389,6 +406,53 @@ async def get_edit_history(document_id: str, authorization: str = Header(alias="
     return events
 
 
+@router.get(
+    "/{document_id}/revisions/{revision}",
+    summary="Rebuild a document revision",
+    response_description="Snapshot of the document as stored at the requested revision.",
+)
+async def get_revision(
+    document_id: str,
+    revision: int,
+    authorization: str = Header(alias="Authorization"),
+) -> dict:
+    # Same audience as the edit history: owner or editor
+    log_info(logger, "get_revision called", document_id=document_id, revision=revision)
+    try:
+        token = auth_service.parse_bearer_token(authorization)
+        user = await auth_service.get_request_profile(token)
+    except AuthenticationError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
+    except UserNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+    try:
+        doc = await document_service.get_document_by_id(document_id)
+    except DocumentNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+    is_owner = doc.owned_by.id == user.id
+    if not (is_owner or await can_user_edit_document(document_id, user.id)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+    try:
+        return await document_service.get_revision(document_id, revision)
+    except DocumentRevisionNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except DocumentHistoryCorruptedError as exc:
+        log_error(
+            logger,
+            "get_revision failed: history corrupted",
+            document_id=document_id,
+            revision=revision,
+            error=str(exc),
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"History for revision {revision} is corrupted",
+        ) from exc
+
+
 @router.delete(
     "/{document_id}",
     response_model=MessageResponse,
@@ -402,14 +466,12 @@ async def delete_document(
     # Owner or System Admin can delete
     try:
         token = auth_service.parse_bearer_token(authorization)
-        profile_payload = await auth_service.get_user_profile_from_token(token)
+        user = await auth_service.get_request_profile(token)
     except AuthenticationError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     except UserNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
-    user = UserProfile.model_validate(profile_payload)
-
     # Load document to verify ownership or admin status
     try:
         document = await document_service.get_document_by_id(document_id)
@@ -452,14 +514,12 @@ async def get_my_access(
     log_info(logger, "get_my_access called", document_id=document_id)
     try:
         token = auth_service.parse_bearer_token(authorization)
-        profile_payload = await auth_service.get_user_profile_from_token(token)
+        user = await auth_service.get_request_profile(token)
     except AuthenticationError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     except UserNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
-    user = UserProfile.model_validate(profile_payload)
-
     try:
         summary = await get_document_access_summary(document_id, user.id)
         log_debug(logger, "get_my_access resolved", document_id=document_id, user_id=user.id, summary=summary)
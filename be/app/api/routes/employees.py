@@ -10,9 +10,11 @@ from app.schemas import MessageResponse
 from app.schemas.employee import (
     Employee,
     EmployeeCreate,
+    EmployeeSearchPage,
     EmployeeUpdate,
     SaveChartPayload,
     SaveChartResult,
+    SpanOfControl,
 )
 from app.models.enums import ALLOWED_DIVISIONS
 from app.services import employee as employee_service
@@ -44,12 +46,13 @@ class SearchResult(BaseModel):
 )
 async def search_employees(
     q: str = Query(..., description="Search query for name, email, or division"),
+    limit: int = Query(50, ge=1, le=200),
 ) -> list[SearchResult]:
     """Search active users by name/email or divisions by name."""
     results: list[SearchResult] = []
 
     # Search users
-    employees = await employee_service.search_employees(q)
+    employees = await employee_service.search_employees(q, limit=limit)
     for employee in employees:
         results.append(
             SearchResult(
@@ -80,6 +83,35 @@ async def search_employees(
     return results
 
 
+@router.get(
+    "/search/page",
+    response_model=EmployeeSearchPage,
+    summary="Search the employee directory with a cursor",
+    response_description="One page of matching employees plus the cursor for the next page.",
+)
+async def search_employees_page(
+    q: str | None = Query(None, description="Words to match in name, email, ID, title or division"),
+    active: bool = Query(True, description="Search active (default) or inactive employees"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+) -> EmployeeSearchPage:
+    """
+    Ranked directory search, best matches first, then by name.
+    - Every word must match; the last word also matches as a prefix
+    - Without ``q`` every employee is listed in name order
+    """
+    try:
+        employees, next_cursor = await employee_service.search_employees_page(
+            q, active=active, limit=limit, cursor=cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return EmployeeSearchPage(
+        items=[Employee.model_validate(employee) for employee in employees],
+        next_cursor=next_cursor,
+    )
+
+
 @router.get(
     "/inactive",
     response_model=list[Employee],
@@ -161,6 +193,54 @@ async def get_subordinates(employee_id: str) -> list[Employee]:
     return [Employee.model_validate(employee) for employee in employees]
 
 
+@router.get(
+    "/{employee_id}/reports",
+    response_model=list[Employee],
+    summary="List all reports under an employee",
+    response_description="Active direct and indirect reports, nearest levels first.",
+)
+async def get_all_reports(
+    employee_id: str,
+    depth: int | None = Query(None, ge=1, description="Only this many levels down"),
+) -> list[Employee]:
+    """Return every active report under the employee, transitively."""
+    try:
+        employees = await employee_service.get_all_reports(employee_id, depth)
+    except EmployeeNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    return [Employee.model_validate(employee) for employee in employees]
+
+
+@router.get(
+    "/{employee_id}/chain",
+    response_model=list[Employee],
+    summary="List an employee's management chain",
+    response_description="Managers from the direct one up to the top of the hierarchy.",
+)
+async def get_management_chain(employee_id: str) -> list[Employee]:
+    """Return the employee's managers, nearest first."""
+    try:
+        employees = await employee_service.get_management_chain(employee_id)
+    except EmployeeNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    return [Employee.model_validate(employee) for employee in employees]
+
+
+@router.get(
+    "/{employee_id}/span",
+    response_model=SpanOfControl,
+    summary="Get an employee's span of control",
+    response_description="Direct and total report counts and the depth below the employee.",
+)
+async def get_span_of_control(employee_id: str) -> SpanOfControl:
+    """Return how many people report to the employee, directly and in total."""
+    try:
+        span = await employee_service.get_span_of_control(employee_id)
+    except EmployeeNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    return SpanOfControl.model_validate(span)
+
+
  
 
 
@@ -13,6 +13,7 @@ from app.schemas.project_mapping import (
     ProjectMappingResponse,
     UpdateProjectMappingRequest,
 )
+from app.services import workload_entries
 
 router = APIRouter(prefix="/project-mapping", tags=["Project Mappings"])
 
@@ -83,6 +84,7 @@ async def create_project_mapping(request: CreateProjectMappingRequest):
         mapped_names=request.mapped_names,
     )
     await mapping.insert()
+    await workload_entries.remap_projects()
     return serialize_mapping(mapping)
 
 
@@ -123,6 +125,7 @@ async def update_project_mapping(
     existing_mapping.mapped_names = request.mapped_names
     existing_mapping.updated_at = datetime.utcnow()
     await existing_mapping.save()
+    await workload_entries.remap_projects()
 
     return serialize_mapping(existing_mapping)
 
@@ -135,3 +138,4 @@ async def delete_project_mapping(mapping_id: PydanticObjectId):
         raise HTTPException(status_code=404, detail="Project mapping not found")
 
     await existing_mapping.delete()
+    await workload_entries.remap_projects()
@@ -0,0 +1,68 @@
+"""Role permission routes."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.routes.auth import get_current_user
+from app.models.enums import ALLOWED_POSITIONS
+from app.schemas import UserProfile
+from app.schemas.role_permission import RolePermissionsResponse, UpdateRolePermissionsRequest
+from app.services.identity import ADMIN_TITLES
+from app.services.permissions import permission_registry
+
+router = APIRouter(prefix="/roles", tags=["Role Permissions"])
+
+
+def _require_admin(user: UserProfile) -> None:
+    if (user.title or "").strip() not in ADMIN_TITLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only system administrators can manage role permissions",
+        )
+
+
+def _response() -> RolePermissionsResponse:
+    return RolePermissionsResponse(
+        version=permission_registry.version,
+        roles={role: sorted(perms) for role, perms in permission_registry.roles().items()},
+    )
+
+
+@router.get(
+    "/permissions",
+    response_model=RolePermissionsResponse,
+    summary="List role permissions",
+    response_description="Permissions granted to each role on v2 routes.",
+)
+async def list_role_permissions(
+    current_user: UserProfile = Depends(get_current_user),
+) -> RolePermissionsResponse:
+    """Return the role to permission mapping used by ``@allow``."""
+    _require_admin(current_user)
+    return _response()
+
+
+@router.put(
+    "/{role}/permissions",
+    response_model=RolePermissionsResponse,
+    summary="Replace a role's permissions",
+    response_description="The updated role to permission mapping.",
+)
+async def update_role_permissions(
+    role: str,
+    payload: UpdateRolePermissionsRequest,
+    current_user: UserProfile = Depends(get_current_user),
+) -> RolePermissionsResponse:
+    """Replace the permissions of one position; takes effect without a restart."""
+    _require_admin(current_user)
+    if role not in ALLOWED_POSITIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown role: {role}",
+        )
+    try:
+        await permission_registry.set_role_permissions(role, list(payload.permissions))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return _response()
@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 from fastapi import APIRouter
 
+from app.core.login_throttle import login_throttle
+from app.core.security import password_hasher
+
 router = APIRouter()
 
 
@@ -16,3 +21,14 @@ router = APIRouter()
 async def read_root() -> dict[str, str]:
     """Return a static heartbeat payload to confirm service availability."""
     return {"message": "Hello, World!"}
+
+
+@router.get(
+    "/health/auth",
+    tags=["Health"],
+    summary="Authentication load metrics",
+    response_description="Counters of this worker's password hashing pool and login throttle.",
+)
+async def read_auth_health() -> dict[str, Any]:
+    """Return this worker's password hashing and login throttling metrics."""
+    return {"password_hasher": password_hasher.stats(), "login_throttle": login_throttle.stats()}
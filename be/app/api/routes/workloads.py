@@ -3,7 +3,7 @@
 import io
 import os
 from datetime import UTC, date, datetime, timedelta
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 
 import pandas as pd
 from fastapi import APIRouter, HTTPException, Query
@@ -11,86 +11,20 @@ from fastapi.responses import StreamingResponse
 from slack_sdk.errors import SlackApiError
 
 from app.models.project_mapping import ProjectMapping
-from app.models.slack_message import SlackMessage
+from app.models.workload_entry import WorkloadEntryFact
+from app.services import workload_entries
 from app.services.slack_crawler_service import slack_crawler
 from app.schemas.workload import WorkloadEntriesResponse, WorkloadStandupSummary
 
 router = APIRouter(prefix="/workloads", tags=["Workloads"])
 
 
-def _normalize_project_name(project_name: str) -> str:
-    return project_name.strip().casefold()
-
-
-def _find_project_mapping(
-    project_name: str,
-    project_mappings: List[ProjectMapping],
-) -> ProjectMapping | None:
-    normalized_project_name = _normalize_project_name(project_name)
-    if not normalized_project_name:
-        return None
-
-    for mapping in project_mappings:
-        normalized_mapped_names = {
-            _normalize_project_name(mapped_name) for mapped_name in mapping.mapped_names
-        }
-        if normalized_project_name in normalized_mapped_names:
-            return mapping
-
-    return None
-
-
-def get_mapped_project_name(project_name: str, project_mappings: List[ProjectMapping]) -> str:
-    mapping = _find_project_mapping(project_name, project_mappings)
-    if mapping is not None:
-        return mapping.project_name
-    return project_name
-
-
 async def _load_project_mappings() -> List[ProjectMapping]:
     return await ProjectMapping.find_all().to_list()
 
 
-async def _fetch_workload_messages(
-    user_id: Optional[str] = None,
-    excluded_user_ids: Optional[str] = None,
-    since_timestamp: Optional[int] = None,
-) -> list[SlackMessage]:
-    excluded_users = set(excluded_user_ids.split(",")) if excluded_user_ids else set()
-
-    query_params: dict[str, Any] = {
-        "parsed_result": {"$ne": None},
-    }
-
-    if user_id:
-        query_params["user_id"] = user_id
-
-    if excluded_users:
-        query_params["user_id"] = {"$nin": list(excluded_users)}
-
-    if since_timestamp is not None:
-        query_params["timestamp"] = {"$gte": since_timestamp}
-
-    messages = await SlackMessage.find(query_params).sort(-SlackMessage.timestamp).to_list()
-    return messages
-
-def _extract_recent_mapped_project_names(
-    messages: list[SlackMessage],
-    project_mappings: list[ProjectMapping],
-) -> set[str]:
-    recent_project_names: set[str] = set()
-
-    for message in messages:
-        parsed_result = message.parsed_result or {}
-        workload_summary = parsed_result.get("workload_summary", [])
-
-        for summary in workload_summary:
-            original_project = (summary.get("project_name") or "").strip()
-            mapping = _find_project_mapping(original_project, project_mappings)
-            if mapping is not None:
-                recent_project_names.add(mapping.project_name)
-
-    return recent_project_names
+def _split_user_ids(excluded_user_ids: Optional[str]) -> list[str]:
+    return sorted(set(excluded_user_ids.split(","))) if excluded_user_ids else []
 
 
 def _resolve_date_range(
@@ -108,102 +42,6 @@ def _resolve_date_range(
     return start_dt, end_dt
 
 
-def _parse_entry_date(entry_date: str) -> date:
-    return datetime.strptime(entry_date, "%Y-%m-%d").date()
-
-
-def _classify_work_type(project: str, activity_description: str) -> str:
-    work_type = "Development"
-    lower_proj = project.lower()
-    lower_act = activity_description.lower()
-
-    if any(kw in lower_proj for kw in ["meeting", "standup", "review"]):
-        return "Meeting"
-    if any(kw in lower_act for kw in ["doc", "documentation", "guide", "readme"]):
-        return "Documentation"
-    if any(kw in lower_act for kw in ["test", "testing", "qa", "bug"]):
-        return "Testing"
-    if any(kw in lower_act for kw in ["support", "help", "issue", "troubleshoot"]):
-        return "Support"
-    return work_type
-
-
-def _is_billable_project(project: str) -> bool:
-    lower_proj = project.lower()
-    return not any(kw in lower_proj for kw in ["internal", "admin", "vacation", "sick"])
-
-
-def _build_workload_entries(
-    messages: list[SlackMessage],
-    project_mappings: list[ProjectMapping],
-    start_dt: date,
-    end_dt: date,
-    project_name: Optional[str] = None,
-) -> list[dict[str, Any]]:
-    workload_entries: list[dict[str, Any]] = []
-    entry_id = 1
-
-    for msg in messages:
-        uid = msg.user_id
-        name = msg.name
-        timestamp = msg.timestamp
-        default_date_str = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
-
-        parsed_result = msg.parsed_result or {}
-        workload_summary = parsed_result.get("workload_summary", [])
-
-        for summary in workload_summary:
-            original_project = summary.get("project_name", "")
-            mapped_project = get_mapped_project_name(original_project, project_mappings)
-            hours = summary.get("project_manhour", 0)
-            done_items = summary.get("done_items", [])
-            entry_date = summary.get("date") or default_date_str
-            try:
-                parsed_entry_date = _parse_entry_date(entry_date)
-            except ValueError:
-                continue
-
-            if not mapped_project or hours <= 0:
-                continue
-
-            if parsed_entry_date < start_dt or parsed_entry_date > end_dt:
-                continue
-
-            if project_name and mapped_project != project_name:
-                continue
-
-            activity_description = (
-                "; ".join(done_items) if done_items else "No specific tasks listed"
-            )
-
-            overtime_hours = max(0, hours - 8) if hours > 8 else 0
-            regular_hours = hours - overtime_hours
-            is_billable = _is_billable_project(mapped_project)
-            billable_hours = hours if is_billable else 0
-
-            workload_entries.append(
-                {
-                    "id": entry_id,
-                    "date": entry_date,
-                    "user_id": uid,
-                    "user": name,
-                    "project": mapped_project,
-                    "activity_description": activity_description,
-                    "hours_worked": round(regular_hours, 1),
-                    "overtime_hours": round(overtime_hours, 1),
-                    "total_hours": round(hours, 1),
-                    "work_type": _classify_work_type(mapped_project, activity_description),
-                    "is_billable": is_billable,
-                    "billable_hours": round(billable_hours, 1),
-                    "notes": f"Reported at {datetime.fromtimestamp(timestamp).strftime('%H:%M')}",
-                    "timestamp": timestamp,
-                }
-            )
-            entry_id += 1
-
-    return workload_entries
-
-
 def _autosize_worksheet(worksheet) -> None:
     for column in worksheet.columns:
         max_length = 0
@@ -346,19 +184,11 @@ async def get_standup_summary() -> WorkloadStandupSummary:
 @router.get("/ongoing-projects", response_model=list[str])
 async def get_ongoing_projects() -> list[str]:
     """Return ongoing projects that had workload activity in the past week."""
-    project_mappings = await _load_project_mappings()
     one_week_ago = datetime.now(UTC) - timedelta(days=7)
-    recent_messages = await _fetch_workload_messages(
-        since_timestamp=int(one_week_ago.timestamp())
-    )
-    recent_project_names = _extract_recent_mapped_project_names(
-        recent_messages,
-        project_mappings,
+    recent_project_names = await WorkloadEntryFact.get_pymongo_collection().distinct(
+        "project",
+        {"timestamp": {"$gte": int(one_week_ago.timestamp())}, "is_mapped": True},
     )
-
-    if not recent_project_names:
-        return []
-
     return sorted(recent_project_names)
 
 @router.get("/entries", response_model=WorkloadEntriesResponse)
@@ -370,31 +200,28 @@ async def get_workload_entries(
     excluded_user_ids: Optional[str] = Query(
         None, description="Comma-separated list of user IDs to exclude"
     ),
-    limit: int = Query(100, description="Max number of entries to return"),
-    offset: int = Query(0, description="Pagination offset"),
+    limit: int = Query(100, ge=1, le=1000, description="Max number of entries to return"),
+    offset: int = Query(0, ge=0, description="Pagination offset"),
+    mode: Literal["full", "summary"] = Query(
+        "full", description="'summary' returns the totals without entries"
+    ),
 ):
     try:
         start_dt, end_dt = _resolve_date_range(start_date, end_date)
-        messages = await _fetch_workload_messages(
-            user_id=user_id,
-            excluded_user_ids=excluded_user_ids,
-        )
-        project_mappings = await _load_project_mappings()
-        workload_entries = _build_workload_entries(
-            messages,
-            project_mappings,
+        query = workload_entries.build_filter(
             start_dt,
             end_dt,
-            project_name,
+            user_id=user_id,
+            excluded_user_ids=_split_user_ids(excluded_user_ids),
+            project_name=project_name,
         )
-
-        total_entries = len(workload_entries)
-        paginated_entries = workload_entries[offset : offset + limit]
-
-        total_hours = sum(e["total_hours"] for e in workload_entries)
-        total_overtime = sum(e["overtime_hours"] for e in workload_entries)
-        total_billable = sum(e["billable_hours"] for e in workload_entries)
-        unique_projects = len(set(e["project"] for e in workload_entries))
+        paginated_entries, summary = await workload_entries.query_entries(
+            query,
+            offset=offset,
+            limit=limit,
+            include_entries=mode == "full",
+        )
+        total_entries = summary["total_entries"]
 
         return {
             "entries": paginated_entries,
@@ -405,13 +232,7 @@ async def get_workload_entries(
                 "has_next": offset + limit < total_entries,
                 "has_prev": offset > 0,
             },
-            "summary": {
-                "total_hours": round(total_hours, 1),
-                "total_overtime": round(total_overtime, 1),
-                "total_billable": round(total_billable, 1),
-                "unique_projects": unique_projects,
-                "total_entries": total_entries,
-            },
+            "summary": summary,
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve workload entries: {e}")
@@ -427,25 +248,36 @@ async def export_workload_excel(
 ):
     try:
         start_dt, end_dt = _resolve_date_range(start_date, end_date)
-        messages = await _fetch_workload_messages(
-            excluded_user_ids=excluded_user_ids,
+        query = workload_entries.build_filter(
+            start_dt, end_dt, excluded_user_ids=_split_user_ids(excluded_user_ids)
         )
+        facts = await WorkloadEntryFact.get_pymongo_collection().find(
+            query, {"date": 1, "user": 1, "project": 1, "total_hours": 1}
+        ).to_list(None)
         project_mappings = await _load_project_mappings()
-        workload_entries = _build_workload_entries(messages, project_mappings, start_dt, end_dt)
+        entries = [
+            {
+                "date": fact["date"].strftime("%Y-%m-%d"),
+                "user": fact["user"],
+                "project": fact["project"],
+                "total_hours": fact["total_hours"],
+            }
+            for fact in facts
+        ]
 
-        if not workload_entries:
+        if not entries:
             raise HTTPException(
                 status_code=404, detail="No data found for the specified date range"
             )
 
         mapped_project_names = sorted(
             {mapping.project_name for mapping in project_mappings}
-            | {entry["project"] for entry in workload_entries}
+            | {entry["project"] for entry in entries}
         )
         grouped_rows: dict[tuple[str, str], dict[str, Any]] = {}
 
         for entry in sorted(
-            workload_entries, key=lambda item: (item["date"], item["user"], item["project"])
+            entries, key=lambda item: (item["date"], item["user"], item["project"])
         ):
             group_key = (entry["date"], entry["user"])
             if group_key not in grouped_rows:
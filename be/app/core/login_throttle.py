@@ -0,0 +1,204 @@
+"""Admission control for password logins.
+
+Every login attempt used to look the user up and run a full PBKDF2
+verification, so credential stuffing turned straight into hashing load.
+``LoginThrottle.admit`` runs before any of that work:
+
+* a token bucket per client IP and one per email bound the attempt rate;
+* consecutive failures for an email lock it out for an exponentially growing
+  delay (``base * 2 ** (failures - 1)``, capped), reset by a successful login.
+
+Buckets are per worker. Failure counts live in a ``FailureStore``: in memory by
+default, or shared between workers when one is attached (see
+``app.db.login_failures``). The client IP is whatever the ASGI server reports;
+run uvicorn with ``--proxy-headers`` behind a reverse proxy. Per-worker
+admission counters (``stats``) are served by ``GET /health/auth``.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+from app.logging_utils import get_logger, log_debug, log_warning
+from constants import (
+    LOGIN_BACKOFF_BASE_SECONDS,
+    LOGIN_BACKOFF_MAX_SECONDS,
+    LOGIN_FAILURE_WINDOW_SECONDS,
+    LOGIN_RATE_EMAIL_BURST,
+    LOGIN_RATE_EMAIL_PER_MINUTE,
+    LOGIN_RATE_IP_BURST,
+    LOGIN_RATE_IP_PER_MINUTE,
+    LOGIN_THROTTLE_MAX_KEYS,
+)
+
+logger = get_logger(__name__)
+
+
+@dataclass(slots=True)
+class _Bucket:
+    tokens: float
+    updated_at: float
+
+
+class TokenBuckets:
+    """Token buckets keyed by string, LRU-bounded to ``max_keys``."""
+
+    def __init__(self, capacity: int, per_minute: int, max_keys: int):
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0 and self.rate > 0
+
+    def take(self, key: str) -> float:
+        """Take one token; return 0 when admitted, else seconds until one is available."""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(tokens=float(self.capacity), updated_at=now)
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            bucket.tokens = min(
+                float(self.capacity), bucket.tokens + (now - bucket.updated_at) * self.rate
+            )
+            bucket.updated_at = now
+            self._buckets.move_to_end(key)
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            return 0.0
+        return (1.0 - bucket.tokens) / self.rate
+
+
+class FailureStore(Protocol):
+    """Consecutive login failures per key.
+
+    ``get`` returns ``(failures, last_failed_at)`` with ``last_failed_at`` in
+    epoch seconds, or ``None`` once the key has been quiet for the failure window.
+    """
+
+    async def get(self, key: str) -> tuple[int, float] | None: ...
+
+    async def record(self, key: str) -> int: ...
+
+    async def reset(self, key: str) -> None: ...
+
+
+class MemoryFailureStore:
+    """``FailureStore`` local to this worker."""
+
+    def __init__(self, window_seconds: float, max_keys: int):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._failures: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    async def get(self, key: str) -> tuple[int, float] | None:
+        entry = self._failures.get(key)
+        if entry is not None and entry[1] + self.window_seconds <= time.time():
+            del self._failures[key]
+            return None
+        return entry
+
+    async def record(self, key: str) -> int:
+        entry = await self.get(key)
+        failures = (entry[0] if entry else 0) + 1
+        self._failures[key] = (failures, time.time())
+        self._failures.move_to_end(key)
+        while len(self._failures) > self.max_keys:
+            self._failures.popitem(last=False)
+        return failures
+
+    async def reset(self, key: str) -> None:
+        self._failures.pop(key, None)
+
+
+class LoginThrottle:
+    """Decides whether a login attempt may reach the user lookup and hashing."""
+
+    def __init__(
+        self,
+        ip_buckets: TokenBuckets,
+        email_buckets: TokenBuckets,
+        store: FailureStore,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+    ):
+        self.ip_buckets = ip_buckets
+        self.email_buckets = email_buckets
+        self.store = store
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._counters = {
+            "admitted": 0,
+            "throttled_ip": 0,
+            "throttled_email": 0,
+            "backed_off": 0,
+            "failures": 0,
+        }
+
+    def backoff_seconds(self, failures: int) -> float:
+        if failures <= 0 or self.backoff_base_seconds <= 0:
+            return 0.0
+        # Cap the exponent too so a long failure streak cannot overflow
+        delay = self.backoff_base_seconds * 2 ** min(failures - 1, 32)
+        return min(delay, self.backoff_max_seconds)
+
+    async def admit(self, email: str, ip: str | None) -> float:
+        """Return 0 when the attempt may proceed, else the seconds to wait."""
+        if ip:
+            retry_after = self.ip_buckets.take(f"ip:{ip}")
+            if retry_after:
+                return self._reject("throttled_ip", retry_after, ip=ip)
+        retry_after = self.email_buckets.take(f"email:{email}")
+        if retry_after:
+            return self._reject("throttled_email", retry_after, email=email)
+
+        entry = await self.store.get(f"email:{email}")
+        if entry is not None:
+            failures, last_failed_at = entry
+            retry_after = last_failed_at + self.backoff_seconds(failures) - time.time()
+            if retry_after > 0:
+                return self._reject("backed_off", retry_after, email=email, failures=failures)
+
+        self._counters["admitted"] += 1
+        return 0.0
+
+    def _reject(self, reason: str, retry_after: float, **fields: object) -> float:
+        self._counters[reason] += 1
+        log_debug(logger, "login attempt throttled", reason=reason, **fields)
+        return retry_after
+
+    async def record_failure(self, email: str) -> None:
+        self._counters["failures"] += 1
+        failures = await self.store.record(f"email:{email}")
+        if self.backoff_seconds(failures) >= self.backoff_max_seconds > 0:
+            log_warning(logger, "login backoff at maximum", email=email, failures=failures)
+
+    async def record_success(self, email: str) -> None:
+        await self.store.reset(f"email:{email}")
+
+    def attach_store(self, store: FailureStore) -> None:
+        self.store = store
+
+    def stats(self) -> dict[str, int]:
+        return dict(self._counters)
+
+
+login_throttle = LoginThrottle(
+    ip_buckets=TokenBuckets(LOGIN_RATE_IP_BURST, LOGIN_RATE_IP_PER_MINUTE, LOGIN_THROTTLE_MAX_KEYS),
+    email_buckets=TokenBuckets(
+        LOGIN_RATE_EMAIL_BURST, LOGIN_RATE_EMAIL_PER_MINUTE, LOGIN_THROTTLE_MAX_KEYS
+    ),
+    store=MemoryFailureStore(LOGIN_FAILURE_WINDOW_SECONDS, LOGIN_THROTTLE_MAX_KEYS),
+    backoff_base_seconds=LOGIN_BACKOFF_BASE_SECONDS,
+    backoff_max_seconds=LOGIN_BACKOFF_MAX_SECONDS,
+)
@@ -5,7 +5,7 @@ from typing import Optional, TypedDict
 class RequestContextUser:
     id: str
     name: str
-    permissions: list[str]
+    permissions: frozenset[str]
     employee_id: str | None = None
 
 @dataclass(frozen=True)
@@ -2,16 +2,35 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
 import hashlib
 import hmac
+import json
 import secrets
 import string
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import TypeVar
 
-from constants import RESET_TOKEN_EXPIRE_MINUTES, SECRET_KEY
+from app.logging_utils import get_logger, log_warning
+from constants import (
+    PASSWORD_HASH_ITERATIONS,
+    PASSWORD_HASH_QUEUE_WARN_MS,
+    PASSWORD_HASH_WORKERS,
+    RESET_TOKEN_EXPIRE_MINUTES,
+    SECRET_KEY,
+)
 
-_PASSWORD_HASH_ITERATIONS = 390000
+logger = get_logger(__name__)
+
+_T = TypeVar("_T")
+
+_HASH_SCHEME = "pbkdf2_sha256"
+# Hashes stored as ``salt$key`` predate the scheme prefix and always used this count
+_LEGACY_ITERATIONS = 390000
 _SESSION_TTL_SECONDS = 2 * 60 * 60  # 2 hours
 _DEFAULT_PASSWORD_LENGTH = 8
 
@@ -22,42 +41,224 @@ def _require_secret_key() -> str:
     return SECRET_KEY
 
 
-def _derive_key(password: str, salt: str) -> str:
+def _derive_key(password: str, salt: str, iterations: int) -> str:
     secret_key = _require_secret_key()
     payload = f"{salt}{secret_key}".encode()
     digest = hashlib.pbkdf2_hmac(
         "sha256",
         password.encode(),
         payload,
-        _PASSWORD_HASH_ITERATIONS,
+        iterations,
     )
     return digest.hex()
 
 
+def _parse_hash(hashed_password: str) -> tuple[int, str, str] | None:
+    """Split a stored hash into ``(iterations, salt, key)``; None if malformed."""
+    parts = hashed_password.split("$")
+    if len(parts) == 2:
+        salt, key = parts
+        return _LEGACY_ITERATIONS, salt, key
+    if len(parts) == 4 and parts[0] == _HASH_SCHEME and parts[1].isdigit():
+        return int(parts[1]), parts[2], parts[3]
+    return None
+
+
 def hash_password(password: str, *, salt: str | None = None) -> str:
+    """Hash with the configured iteration count (CPU-bound; prefer ``hash_password_async``)."""
     if salt is None:
         salt = secrets.token_hex(16)
-    key = _derive_key(password, salt)
-    return f"{salt}${key}"
+    key = _derive_key(password, salt, PASSWORD_HASH_ITERATIONS)
+    return f"{_HASH_SCHEME}${PASSWORD_HASH_ITERATIONS}${salt}${key}"
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    try:
-        salt, key = hashed_password.split("$", 1)
-    except ValueError:
+    """Check a password against a stored hash (CPU-bound; prefer ``verify_password_async``)."""
+    parsed = _parse_hash(hashed_password)
+    if parsed is None:
         return False
-    candidate = _derive_key(password, salt)
+    iterations, salt, key = parsed
+    candidate = _derive_key(password, salt, iterations)
     return secrets.compare_digest(candidate, key)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with other parameters than the current ones."""
+    parsed = _parse_hash(hashed_password)
+    return parsed is not None and (
+        parsed[0] != PASSWORD_HASH_ITERATIONS or not hashed_password.startswith(_HASH_SCHEME)
+    )
+
+
+class PasswordHasher:
+    """Runs PBKDF2 on a dedicated thread pool with a fixed number of threads.
+
+    ``pbkdf2_hmac`` releases the GIL, so hashing on these threads keeps the
+    event loop responsive; at most ``workers`` hashes run at once and the rest
+    wait in the pool's queue, which is not bounded (its depth is ``pending`` in
+    ``stats``). Queue and run times are tracked for ``stats``, which is served
+    by ``GET /health/auth``.
+    """
+
+    def __init__(self, workers: int, queue_warn_ms: int):
+        self.workers = max(1, workers)
+        self.queue_warn_ms = queue_warn_ms
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+        self._completed = 0
+        self._queue_ms_total = 0.0
+        self._queue_ms_max = 0.0
+        self._run_ms_total = 0.0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable[..., _T], *args: str) -> _T:
+        submitted = time.perf_counter()
+        started: list[float] = []
+
+        def _timed() -> _T:
+            started.append(time.perf_counter())
+            return func(*args)
+
+        self._pending += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool(), _timed)
+        finally:
+            self._pending -= 1
+        finished = time.perf_counter()
+
+        queue_ms = (started[0] - submitted) * 1000 if started else 0.0
+        self._completed += 1
+        self._queue_ms_total += queue_ms
+        self._queue_ms_max = max(self._queue_ms_max, queue_ms)
+        self._run_ms_total += (finished - submitted) * 1000 - queue_ms
+        if queue_ms >= self.queue_warn_ms:
+            log_warning(
+                logger,
+                "password hashing queued",
+                operation=operation,
+                queue_ms=round(queue_ms, 1),
+                pending=self._pending,
+                workers=self.workers,
+            )
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, password, hashed_password)
+
+    def stats(self) -> dict[str, float | int]:
+        completed = self._completed or 1
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "completed": self._completed,
+            "queue_ms_avg": round(self._queue_ms_total / completed, 1),
+            "queue_ms_max": round(self._queue_ms_max, 1),
+            "run_ms_avg": round(self._run_ms_total / completed, 1),
+        }
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_WARN_MS)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(password, hashed_password)
+
+
+def session_expires_at() -> int:
+    """Expiry (epoch milliseconds) of a session issued or renewed now."""
+    return int((time.time() + _SESSION_TTL_SECONDS) * 1000)
+
+
 def generate_session_token(user_identifier: str) -> tuple[str, int]:
     nonce = secrets.token_urlsafe(32)
     secret_key = _require_secret_key()
     payload = f"{user_identifier}:{nonce}".encode()
     signature = hmac.new(secret_key.encode(), payload, hashlib.sha256).hexdigest()
     token = f"{nonce}.{signature}"
-    expires_at = int((time.time() + _SESSION_TTL_SECONDS) * 1000)
-    return token, expires_at
+    return token, session_expires_at()
+
+
+_SIGNED_TOKEN_PREFIX = "s1"
+
+
+@dataclass(frozen=True, slots=True)
+class SessionClaims:
+    """Payload of a signed session token (timestamps in epoch milliseconds)."""
+
+    user_id: str
+    issued_at: int
+    expires_at: int
+
+    @property
+    def is_expired(self) -> bool:
+        return time.time() * 1000 > self.expires_at
+
+
+def _sign(message: str) -> str:
+    secret_key = _require_secret_key()
+    return hmac.new(secret_key.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+
+def generate_signed_session_token(user_identifier: str) -> tuple[str, int]:
+    """Session token carrying its user and expiry, verifiable without a lookup.
+
+    Format: ``s1.<base64url JSON claims>.<HMAC-SHA256 hex>``.
+    """
+    issued_at = int(time.time() * 1000)
+    expires_at = issued_at + _SESSION_TTL_SECONDS * 1000
+    claims = {
+        "sub": user_identifier,
+        "iat": issued_at,
+        "exp": expires_at,
+        "jti": secrets.token_urlsafe(16),
+    }
+    encoded = base64.urlsafe_b64encode(
+        json.dumps(claims, separators=(",", ":")).encode()
+    ).decode().rstrip("=")
+    message = f"{_SIGNED_TOKEN_PREFIX}.{encoded}"
+    return f"{message}.{_sign(message)}", expires_at
+
+
+def is_signed_session_token(token: str) -> bool:
+    return token.startswith(f"{_SIGNED_TOKEN_PREFIX}.")
+
+
+def decode_signed_session_token(token: str) -> SessionClaims | None:
+    """Claims of a signed token; None if the format, signature or expiry is invalid."""
+    message, _, signature = token.rpartition(".")
+    prefix, _, encoded = message.partition(".")
+    if prefix != _SIGNED_TOKEN_PREFIX or not encoded:
+        return None
+    if not hmac.compare_digest(_sign(message), signature):
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+        claims = SessionClaims(
+            user_id=str(payload["sub"]),
+            issued_at=int(payload["iat"]),
+            expires_at=int(payload["exp"]),
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+    return None if claims.is_expired else claims
 
 
 @dataclass(slots=True)
@@ -0,0 +1,207 @@
+"""In-process cache of resolved session tokens.
+
+Every authenticated request used to look up its session by token hash and then
+load the user. ``SessionCache`` keeps the outcome per token hash for a short
+TTL: the session expiry plus a snapshot of the user document, or a negative
+entry for tokens that do not resolve (unknown, revoked, expired or inactive
+user) so replayed bad tokens do not reach MongoDB either.
+
+Entries are evicted by ``invalidate`` (logout, renew, ``SessionToken.revoke``)
+and ``invalidate_user`` / ``invalidate_users`` (any ``User.touch``, bulk saves).
+With several workers, attach an
+``InvalidationChannel`` so evictions are broadcast to every process.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, Protocol
+
+from app.logging_utils import get_logger, log_debug, log_warning
+from constants import (
+    SESSION_CACHE_MAX_ENTRIES,
+    SESSION_CACHE_NEGATIVE_TTL_SECONDS,
+    SESSION_CACHE_TTL_SECONDS,
+)
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedSession:
+    """A resolved session: its expiry and the user document it belongs to."""
+
+    session_id: str
+    user_id: str
+    expires_at: datetime
+    user: dict[str, Any]
+
+    @classmethod
+    def from_documents(cls, session: Any, user: Any) -> CachedSession:
+        """Snapshot a session token and the user it belongs to."""
+        expires_at = session.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=UTC)
+        return cls(
+            session_id=str(session.id),
+            user_id=str(user.id),
+            expires_at=expires_at,
+            user=user.model_dump(),
+        )
+
+    @property
+    def is_expired(self) -> bool:
+        return datetime.now(UTC) > self.expires_at
+
+
+@dataclass(slots=True)
+class _Entry:
+    session: CachedSession | None  # None caches a token that does not resolve
+    stale_at: float
+
+
+class InvalidationChannel(Protocol):
+    """Broadcasts evictions between workers.
+
+    ``publish`` sends a message (``{"token_hash": ...}``, ``{"user_id": ...}`` or
+    ``{"user_ids": [...]}``); ``start`` delivers messages published by other
+    workers to ``handler``.
+    """
+
+    async def publish(self, message: dict[str, Any]) -> None: ...
+
+    async def start(self, handler: Callable[[dict[str, Any]], Awaitable[None]]) -> None: ...
+
+    async def stop(self) -> None: ...
+
+
+class SessionCache:
+    """TTL/LRU map from token hash to ``CachedSession`` (or a cached miss)."""
+
+    def __init__(self, ttl_seconds: float, negative_ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.origin = uuid.uuid4().hex
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._by_user: dict[str, set[str]] = {}
+        # Bumped on every eviction; a lookup started before one must not store its result
+        self._epoch = 0
+        self._channel: InvalidationChannel | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def get(self, token_hash: str) -> tuple[bool, CachedSession | None]:
+        """Return ``(hit, session)``; a hit with ``None`` is a cached miss."""
+        entry = self._entries.get(token_hash)
+        if entry is None:
+            return False, None
+        if entry.stale_at <= time.monotonic() or (entry.session and entry.session.is_expired):
+            self._drop(token_hash)
+            return False, None
+        self._entries.move_to_end(token_hash)
+        return True, entry.session
+
+    def put(self, token_hash: str, session: CachedSession | None, epoch: int) -> None:
+        """Store a lookup result unless an eviction happened since ``epoch`` was read."""
+        if not self.enabled or epoch != self._epoch:
+            return
+        ttl = self.ttl_seconds if session is not None else self.negative_ttl_seconds
+        if ttl <= 0:
+            return
+        self._drop(token_hash)
+        self._entries[token_hash] = _Entry(session=session, stale_at=time.monotonic() + ttl)
+        if session is not None:
+            self._by_user.setdefault(session.user_id, set()).add(token_hash)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, token_hash: str) -> None:
+        entry = self._entries.pop(token_hash, None)
+        if entry is None or entry.session is None:
+            return
+        hashes = self._by_user.get(entry.session.user_id)
+        if hashes is not None:
+            hashes.discard(token_hash)
+            if not hashes:
+                del self._by_user[entry.session.user_id]
+
+    def evict(self, token_hash: str) -> None:
+        self._epoch += 1
+        self._drop(token_hash)
+
+    def evict_user(self, user_id: str) -> None:
+        self._epoch += 1
+        for token_hash in list(self._by_user.get(user_id, ())):
+            self._drop(token_hash)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+        self._by_user.clear()
+
+    async def invalidate(self, token_hash: str) -> None:
+        """Evict one token here and on every other worker."""
+        self.evict(token_hash)
+        await self._publish({"token_hash": token_hash})
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """Evict every cached token of a user (its snapshot changed) everywhere."""
+        self.evict_user(user_id)
+        await self._publish({"user_id": user_id})
+
+    async def invalidate_users(self, user_ids: list[str]) -> None:
+        """``invalidate_user`` for many users with a single broadcast message."""
+        if not user_ids:
+            return
+        for user_id in user_ids:
+            self.evict_user(user_id)
+        await self._publish({"user_ids": list(user_ids)})
+
+    async def _publish(self, message: dict[str, Any]) -> None:
+        if self._channel is None:
+            return
+        # A broken channel must not fail the request that triggered the eviction
+        try:
+            await self._channel.publish({**message, "origin": self.origin})
+        except Exception as exc:
+            log_warning(logger, "session invalidation publish failed", error=str(exc))
+
+    async def _receive(self, message: dict[str, Any]) -> None:
+        if message.get("origin") == self.origin:
+            return
+        if "token_hash" in message:
+            self.evict(message["token_hash"])
+        elif "user_id" in message:
+            self.evict_user(message["user_id"])
+        elif "user_ids" in message:
+            for user_id in message["user_ids"]:
+                self.evict_user(user_id)
+        log_debug(logger, "session invalidation received", message=message)
+
+    async def attach_channel(self, channel: InvalidationChannel) -> None:
+        self._channel = channel
+        await channel.start(self._receive)
+
+    async def detach_channel(self) -> None:
+        channel, self._channel = self._channel, None
+        if channel is not None:
+            await channel.stop()
+
+
+session_cache = SessionCache(
+    ttl_seconds=SESSION_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=SESSION_CACHE_NEGATIVE_TTL_SECONDS,
+    max_entries=SESSION_CACHE_MAX_ENTRIES,
+)
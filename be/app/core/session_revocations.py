@@ -0,0 +1,112 @@
+"""In-memory list of revoked session tokens.
+
+Signed session tokens (see ``generate_signed_session_token``) are validated
+from their own claims, so the only state a worker needs is which unexpired
+tokens were revoked. ``SessionRevocations`` keeps their hashes in a set plus a
+heap ordered by expiry, so entries fall out once the token would have expired
+anyway. It is loaded from ``session_tokens`` at start-up and refreshed
+incrementally by ``revoked_at``; local revocations are added immediately.
+
+Until ``load`` has run, ``ready`` is False and callers must fall back to the
+session lookup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+from datetime import UTC, datetime, timedelta
+
+from app.logging_utils import get_logger, log_error, log_info
+from constants import SESSION_REVOCATION_REFRESH_SECONDS
+
+logger = get_logger(__name__)
+
+# Re-read this far behind the watermark to absorb clock skew between workers
+_REFRESH_OVERLAP = timedelta(seconds=5)
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
+
+
+class SessionRevocations:
+    """Revoked, still-unexpired token hashes with periodic incremental refresh."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.ready = False
+        self.task: asyncio.Task[None] | None = None
+        self._revoked: set[str] = set()
+        self._expiry_heap: list[tuple[datetime, str]] = []
+        self._watermark: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, token_hash: str) -> bool:
+        return token_hash in self._revoked
+
+    def add(self, token_hash: str, expires_at: datetime) -> None:
+        if token_hash in self._revoked:
+            return
+        self._revoked.add(token_hash)
+        heapq.heappush(self._expiry_heap, (_aware(expires_at), token_hash))
+
+    def prune(self) -> None:
+        now = datetime.now(UTC)
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, token_hash = heapq.heappop(self._expiry_heap)
+            self._revoked.discard(token_hash)
+
+    async def _fetch(self, since: datetime | None) -> None:
+        from app.models.session_token import SessionToken
+
+        query: dict[str, object] = {"revoked": True, "expires_at": {"$gt": datetime.now(UTC)}}
+        if since is not None:
+            query["revoked_at"] = {"$gt": since - _REFRESH_OVERLAP}
+        cursor = SessionToken.get_pymongo_collection().find(
+            query, {"token_hash": 1, "expires_at": 1, "revoked_at": 1}
+        )
+        async for row in cursor:
+            self.add(row["token_hash"], row["expires_at"])
+            revoked_at = row.get("revoked_at")
+            if revoked_at is not None and (
+                self._watermark is None or _aware(revoked_at) > self._watermark
+            ):
+                self._watermark = _aware(revoked_at)
+
+    async def load(self) -> None:
+        """Read every unexpired revocation (legacy rows without ``revoked_at`` included)."""
+        await self._fetch(None)
+        if self._watermark is None:
+            self._watermark = datetime.now(UTC)
+        self.ready = True
+        log_info(logger, "session revocations loaded", revoked=len(self._revoked))
+
+    async def refresh(self) -> None:
+        await self._fetch(self._watermark)
+        self.prune()
+
+    def start(self) -> None:
+        if self.task is not None or self.interval <= 0:
+            return
+        self.task = asyncio.create_task(self._run_loop())
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _run_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                log_error(logger, "session revocation refresh failed", error=str(exc))
+
+
+session_revocations = SessionRevocations(SESSION_REVOCATION_REFRESH_SECONDS)
@@ -11,16 +11,30 @@ from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.models import (
     DocumentHistory,
+    DocumentHistoryHead,
     DocumentItem,
+    DocumentShareRoot,
     EditHistoryEvent,
     PasswordResetToken,
+    PermissionRegistry,
     Project,
     ProjectMapping,
     SessionToken,
     SlackMessage,
     SystemStatus,
     User,
+    WorkloadEntryFact,
 )
+from app.core.login_throttle import login_throttle
+from app.core.security import password_hasher
+from app.core.session_cache import session_cache
+from app.core.session_revocations import session_revocations
+from app.db.login_failures import MongoLoginFailureStore
+from app.db.session_invalidation import MongoInvalidationChannel
+from app.services.document_autosave import edit_coalescer
+from app.services.document_item_count import item_count_reconciler
+from app.services.permissions import permission_registry
+from app.services.token_maintenance import token_compactor
 from app.submodules.workspace.models import WorkspaceMetadata
 from app.submodules.workspace_v2.documents import WorkspaceChat, WorkspaceAiContext
 from app.submodules.blocks.models import Block, BlockHistory, Comment as BlockComment
@@ -28,10 +42,15 @@ from app.submodules.chat.documents import ChatThread
 
 from app.submodules.daily_standup.models import StandupEntry
 from app.submodules.dashboard.models import DynamicDashboard
-from constants import MONGODB_DATABASE, MONGODB_URI
+from constants import (
+    LOGIN_FAILURE_WINDOW_SECONDS,
+    LOGIN_THROTTLE_BACKEND,
+    MONGODB_DATABASE,
+    MONGODB_URI,
+    SESSION_CACHE_INVALIDATION_CHANNEL,
+    SESSION_TOKEN_STATELESS,
+)
 
-from app.submodules.session import SessionToken as SessionTokenV2
-from app.submodules.user import User as UserV2
 from app.submodules.workspace_v2 import WorkspaceMetadata as WorkspaceMetadataV2
 from app.submodules.drive import Documents, DocumentEditHistoryEvent, DocumentHistory as DocumentHistoryV2
 
@@ -54,6 +73,8 @@ async def init_database() -> None:
             Project,
             DocumentItem,
             DocumentHistory,
+            DocumentHistoryHead,
+            DocumentShareRoot,
             EditHistoryEvent,
             ProjectMapping,
             SlackMessage,
@@ -66,13 +87,13 @@ async def init_database() -> None:
             WorkspaceChat,
             WorkspaceAiContext,
             SessionToken,
-            SessionTokenV2,
             WorkspaceMetadataV2,
-            UserV2,
             ChatThread,
             Documents,
             DocumentEditHistoryEvent,
             DocumentHistoryV2,
+            PermissionRegistry,
+            WorkloadEntryFact,
         ],
     )
 
@@ -101,7 +122,32 @@ async def close_database() -> None:
 async def lifespan_context(_: Any) -> AsyncIterator[None]:
     await init_database()
     await ensure_default_data()
+    await permission_registry.load()
+    permission_registry.start()
+    item_count_reconciler.start()
+    token_compactor.start()
+    if SESSION_CACHE_INVALIDATION_CHANNEL == "mongo" and _motor_client is not None:
+        await session_cache.attach_channel(
+            MongoInvalidationChannel(_motor_client[MONGODB_DATABASE])
+        )
+    if LOGIN_THROTTLE_BACKEND == "mongo" and _motor_client is not None:
+        failure_store = MongoLoginFailureStore(
+            _motor_client[MONGODB_DATABASE], LOGIN_FAILURE_WINDOW_SECONDS
+        )
+        await failure_store.ensure_indexes()
+        login_throttle.attach_store(failure_store)
+    if SESSION_TOKEN_STATELESS:
+        await session_revocations.load()
+        session_revocations.start()
     try:
         yield
     finally:
+        session_revocations.stop()
+        permission_registry.stop()
+        await session_cache.detach_channel()
+        item_count_reconciler.stop()
+        token_compactor.stop()
+        # Buffered autosave revisions must reach the database before the client closes
+        await edit_coalescer.flush_all()
         await close_database()
+        password_hasher.shutdown()
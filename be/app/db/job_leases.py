@@ -0,0 +1,41 @@
+"""Leases that keep a periodic background job to one worker at a time.
+
+Every worker starts the same background loops. Before each pass a loop calls
+``try_acquire``; only the worker holding the job's row in ``job_leases``
+(or the first one to find it expired) runs the pass. The holder renews the
+lease on every pass, and another worker takes over once it lapses.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+from datetime import UTC, datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+COLLECTION_NAME = "job_leases"
+
+# Identifies this worker process as a lease holder
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def try_acquire(database: AsyncIOMotorDatabase, job: str, duration_seconds: float) -> bool:
+    """Claim or renew the lease on ``job``; ``False`` while another worker holds it."""
+    now = datetime.now(UTC)
+    try:
+        await database[COLLECTION_NAME].update_one(
+            {"_id": job, "$or": [{"holder": WORKER_ID}, {"expires_at": {"$lte": now}}]},
+            {
+                "$set": {
+                    "holder": WORKER_ID,
+                    "expires_at": now + timedelta(seconds=duration_seconds),
+                }
+            },
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # The row exists and is held by someone else, so the upsert tried to insert a second one
+        return False
+    return True
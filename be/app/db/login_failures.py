@@ -0,0 +1,68 @@
+"""Login failure counts shared between workers.
+
+One document per throttle key in ``login_failures``; a TTL index on
+``expires_at`` drops keys once they have been quiet for the failure window, so
+the collection only holds recent failure streaks.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+COLLECTION_NAME = "login_failures"
+
+
+class MongoLoginFailureStore:
+    """``FailureStore`` backed by a TTL-indexed collection."""
+
+    def __init__(self, database: AsyncIOMotorDatabase, window_seconds: float):
+        self._collection = database[COLLECTION_NAME]
+        self.window = timedelta(seconds=window_seconds)
+
+    async def ensure_indexes(self) -> None:
+        await self._collection.create_index(
+            "expires_at", expireAfterSeconds=0, name="expires_at_ttl"
+        )
+
+    async def get(self, key: str) -> tuple[int, float] | None:
+        # The TTL monitor runs about once a minute, so filter on expiry as well
+        row = await self._collection.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.now(UTC)}},
+            {"count": 1, "last_failed_at": 1},
+        )
+        if row is None:
+            return None
+        last_failed_at = row["last_failed_at"].replace(tzinfo=UTC)
+        return row["count"], last_failed_at.timestamp()
+
+    async def record(self, key: str) -> int:
+        now = datetime.now(UTC)
+        # A streak whose window lapsed but which the TTL monitor has not removed yet restarts at 1
+        row = await self._collection.find_one_and_update(
+            {"_id": key},
+            [
+                {
+                    "$set": {
+                        "count": {
+                            "$cond": [
+                                {"$gt": ["$expires_at", now]},
+                                {"$add": [{"$ifNull": ["$count", 0]}, 1]},
+                                1,
+                            ]
+                        },
+                        "last_failed_at": now,
+                        "expires_at": now + self.window,
+                    }
+                }
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            projection={"count": 1},
+        )
+        return row["count"]
+
+    async def reset(self, key: str) -> None:
+        await self._collection.delete_one({"_id": key})
@@ -0,0 +1,89 @@
+"""Cross-worker session cache invalidation over a capped MongoDB collection.
+
+Each worker appends its evictions to ``session_invalidations`` and tails the
+collection with a tailable cursor, applying the evictions of the others. The
+collection is capped, so it never needs cleaning up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+
+from app.logging_utils import get_logger, log_info, log_warning
+
+logger = get_logger(__name__)
+
+COLLECTION_NAME = "session_invalidations"
+_CAPPED_SIZE_BYTES = 1024 * 1024
+_RETRY_SECONDS = 1.0
+
+
+class MongoInvalidationChannel:
+    """``InvalidationChannel`` backed by a capped collection."""
+
+    def __init__(self, database: AsyncIOMotorDatabase):
+        self._database = database
+        self._collection = database[COLLECTION_NAME]
+        self._task: asyncio.Task[None] | None = None
+
+    async def _ensure_collection(self) -> None:
+        try:
+            await self._database.create_collection(
+                COLLECTION_NAME, capped=True, size=_CAPPED_SIZE_BYTES
+            )
+        except CollectionInvalid:
+            pass
+        # Tailable cursors die on an empty collection, so keep one marker document around
+        if await self._collection.estimated_document_count() == 0:
+            await self._collection.insert_one({"marker": True, "at": datetime.now(UTC)})
+
+    async def publish(self, message: dict[str, Any]) -> None:
+        await self._collection.insert_one({**message, "at": datetime.now(UTC)})
+
+    async def start(self, handler: Callable[[dict[str, Any]], Awaitable[None]]) -> None:
+        await self._ensure_collection()
+        if self._task is None:
+            self._task = asyncio.create_task(self._tail(handler))
+            log_info(logger, "session invalidation channel started", collection=COLLECTION_NAME)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _tail(self, handler: Callable[[dict[str, Any]], Awaitable[None]]) -> None:
+        # Only messages published after start-up matter; older evictions predate this cache
+        latest = await self._collection.find_one(sort=[("$natural", -1)])
+        last_id = latest["_id"] if latest else None
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            cursor = self._collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+            try:
+                while cursor.alive:
+                    async for document in cursor:
+                        last_id = document["_id"]
+                        if document.get("marker"):
+                            continue
+                        message = {
+                            key: value
+                            for key, value in document.items()
+                            if key in {"token_hash", "user_id", "user_ids", "origin"}
+                        }
+                        await handler(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                log_warning(logger, "session invalidation tail failed", error=str(exc))
+            await asyncio.sleep(_RETRY_SECONDS)
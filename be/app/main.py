@@ -15,6 +15,7 @@ from scalar_doc import ScalarDoc
 
 from app.api.routes import router as api_router
 from app.db.beanie import lifespan_context
+from app.services.identity import identity_scope
 from app.submodules.workspace_v2 import WorkspaceModule
 from app.submodules.ai import AIModule
 from app.submodules.chat import ChatModule
@@ -127,6 +128,12 @@ def get_docs():
     docs_html = docs.to_html()
     return responses.HTMLResponse(docs_html)
 
+@app.middleware("http")
+async def scope_identity_cache(request: Request, call_next):
+    # Users resolved while serving this request are cached until it completes
+    with identity_scope():
+        return await call_next(request)
+
 @app.middleware("http")
 async def add_request_logging(request: Request, call_next):
     logger = logging.getLogger("app.request")
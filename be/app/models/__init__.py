@@ -1,6 +1,13 @@
 """App models package."""
 
-from .document import DocumentHistory, DocumentItem, EditHistoryEvent
+from .document import (
+    DocumentHistory,
+    DocumentHistoryHead,
+    DocumentItem,
+    DocumentShareRoot,
+    DocumentSummary,
+    EditHistoryEvent,
+)
 from .enums import (
     ALLOWED_EMPLOYMENT_TYPES,
     ALLOWED_POSITIONS,
@@ -9,11 +16,13 @@ from .enums import (
 )
 from .health import SystemStatus
 from .password_reset_token import PasswordResetToken
+from .permission_registry import PermissionRegistry
 from .project import Project
 from .project_mapping import ProjectMapping
 from .session_token import SessionToken
 from .slack_message import SlackMessage
-from .user import User
+from .user import User, UserSummary
+from .workload_entry import WorkloadEntryFact
 
 __all__ = [
     "ALLOWED_EMPLOYMENT_TYPES",
@@ -21,13 +30,19 @@ __all__ = [
     "EmploymentTypeLiteral",
     "PositionLiteral",
     "PasswordResetToken",
+    "PermissionRegistry",
     "SessionToken",
     "User",
+    "UserSummary",
     "DocumentItem",
     "DocumentHistory",
+    "DocumentHistoryHead",
+    "DocumentShareRoot",
+    "DocumentSummary",
     "EditHistoryEvent",
     "Project",
     "ProjectMapping",
     "SystemStatus",
     "SlackMessage",
+    "WorkloadEntryFact",
 ]
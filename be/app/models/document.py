@@ -5,7 +5,8 @@ from __future__ import annotations
 from datetime import datetime, UTC
 from typing import Any, Literal
 
-from beanie import Document
+from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
@@ -108,6 +109,14 @@ class DivisionPermission(BaseModel):
     permission: Literal["viewer", "editor"]
 
 
+class InheritedGrant(BaseModel):
+    """A direct grant of ancestor folder ``source`` that applies to this document."""
+
+    grantee: str  # "user:<id>" or "division:<name>"
+    level: Literal["viewer", "editor"]
+    source: str
+
+
 class DocumentItem(Document):
     document_id: str = Field(alias="id")
     name: str
@@ -122,10 +131,15 @@ class DocumentItem(Document):
     item_count: int | None = None
     parent_id: str | None = None
     path: list[str] = Field(default_factory=list)
+    # Ids of every ancestor folder, root first; index-aligned with ``path``
+    ancestor_ids: list[str] = Field(default_factory=list)
     shared: bool = False
     share_url: str | None = None
     content: list[DocumentBlock] | None = Field(default_factory=list)  # Legacy block-based format
     content_html: str | None = None  # New HTML-based format (TipTap)
+    # Search index fields, maintained by app.services.document_search
+    content_text: str | None = None
+    search_terms: list[str] = Field(default_factory=list)
     is_deleted: bool = False
     deleted_at: datetime | None = None
     created_at: datetime = Field(default_factory=_utcnow)
@@ -133,12 +147,24 @@ class DocumentItem(Document):
     # Permission fields
     user_permissions: list[DocumentPermission] = Field(default_factory=list)
     division_permissions: list[DivisionPermission] = Field(default_factory=list)
+    # Grants inherited from ancestor folders, one entry per (grantee, source folder);
+    # maintained by app.services.document_acl
+    inherited_grants: list[InheritedGrant] = Field(default_factory=list)
 
     model_config = ConfigDict(populate_by_name=True)
 
     class Settings:
         name = "documents"
-        indexes = ["document_id", "parent_id", "category", "type", "is_deleted"]
+        indexes = [
+            "document_id",
+            "parent_id",
+            "ancestor_ids",
+            "category",
+            "type",
+            "is_deleted",
+            "search_terms",
+            "inherited_grants.grantee",
+        ]
 
     async def touch(self) -> None:
         self.updated_at = _utcnow()
@@ -146,18 +172,90 @@ class DocumentItem(Document):
         await self.save()
 
 
+class DocumentSummary(BaseModel):
+    """Listing projection of ``DocumentItem``: metadata and ACL fields, no bodies.
+
+    Used with ``projection_model=`` so folder listings and search never fetch or
+    validate ``content``/``content_html``.
+    """
+
+    object_id: PydanticObjectId = Field(alias="_id")
+    document_id: str = Field(alias="id")
+    name: str
+    type: Literal["folder", "file"]
+    owned_by: DocumentOwner
+    category: str | None = None
+    status: Literal["active", "archived", "shared", "private"] = "active"
+    date_created: datetime = Field(default_factory=_utcnow)
+    last_modified: datetime = Field(default_factory=_utcnow)
+    last_modified_by: DocumentUserRef | None = None
+    size: str | None = None
+    item_count: int | None = None
+    parent_id: str | None = None
+    path: list[str] = Field(default_factory=list)
+    ancestor_ids: list[str] = Field(default_factory=list)
+    shared: bool = False
+    share_url: str | None = None
+    user_permissions: list[DocumentPermission] = Field(default_factory=list)
+    division_permissions: list[DivisionPermission] = Field(default_factory=list)
+    inherited_grants: list[InheritedGrant] = Field(default_factory=list)
+
+
 class DocumentHistory(Document):
     document_id: str
     revision: int
     action: Literal["created", "updated", "deleted"]
     changes: dict[str, Any] = Field(default_factory=dict)
+    # Keyframes carry the full ``snapshot``; deltas carry a ``patch`` against the previous revision
+    kind: Literal["keyframe", "delta"] = "keyframe"
     snapshot: dict[str, Any] = Field(default_factory=dict)
+    patch: dict[str, Any] | None = None
     editor_id: str | None = None
     created_at: datetime = Field(default_factory=_utcnow)
 
     class Settings:
         name = "document_history"
-        indexes = ["document_id", "revision"]
+        indexes = [
+            "document_id",
+            "revision",
+            IndexModel([("document_id", ASCENDING), ("revision", DESCENDING)]),
+        ]
+
+
+class DocumentHistoryHead(Document):
+    """Latest revision number and snapshot per document, the base for the next delta."""
+
+    document_id: str
+    revision: int = 0
+    snapshot: dict[str, Any] = Field(default_factory=dict)
+    updated_at: datetime = Field(default_factory=_utcnow)
+
+    class Settings:
+        name = "document_history_heads"
+        indexes = [IndexModel([("document_id", ASCENDING)], unique=True)]
+
+
+class DocumentShareRoot(Document):
+    """Topmost document directly granted to a grantee (owner, user or division permission).
+
+    ``grantee`` is ``"user:<id>"`` or ``"division:<name>"``. Documents below a
+    row are reachable through inheritance, so they never get a row of their own.
+    Maintained by ``app.services.document_share_roots``.
+    """
+
+    grantee: str
+    document_object_id: PydanticObjectId
+    document_id: str
+    parent_id: str | None = None
+    ancestor_ids: list[str] = Field(default_factory=list)
+
+    class Settings:
+        name = "document_share_roots"
+        indexes = [
+            IndexModel([("grantee", ASCENDING), ("document_object_id", ASCENDING)], unique=True),
+            "document_object_id",
+            "ancestor_ids",
+        ]
 
 
 class EditHistoryEvent(Document):
@@ -28,6 +28,8 @@ PositionLiteral = Literal[
 
 EmploymentTypeLiteral = Literal["full-time", "part-time", "intern"]
 
+PermissionLiteral = Literal["read:all", "write:all"]
+
 ALLOWED_DIVISIONS: Final[set[str]] = {
     "Internal Ops",
     "Business Development",
@@ -56,12 +58,19 @@ ALLOWED_EMPLOYMENT_TYPES: Final[set[str]] = {
     "intern",
 }
 
+ALLOWED_PERMISSIONS: Final[set[str]] = {
+    "read:all",
+    "write:all",
+}
+
 
 __all__ = [
     "ALLOWED_DIVISIONS",
     "ALLOWED_EMPLOYMENT_TYPES",
+    "ALLOWED_PERMISSIONS",
     "ALLOWED_POSITIONS",
     "DivisionLiteral",
     "EmploymentTypeLiteral",
+    "PermissionLiteral",
     "PositionLiteral",
 ]
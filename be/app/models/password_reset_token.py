@@ -6,6 +6,7 @@ from datetime import datetime, UTC
 
 from beanie import Document
 from pydantic import EmailStr, Field
+from pymongo import ASCENDING, IndexModel
 
 
 def _utcnow() -> datetime:
@@ -21,7 +22,12 @@ class PasswordResetToken(Document):
 
     class Settings:
         name = "password_reset_tokens"
-        indexes = ["email", "token"]
+        indexes = [
+            "email",
+            "token",
+            # MongoDB deletes each row once its expires_at has passed
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+        ]
 
     @property
     def is_expired(self) -> bool:
@@ -0,0 +1,27 @@
+"""Role to permission registry model definitions."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from beanie import Document
+from pydantic import Field
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC)
+
+
+class PermissionRegistry(Document):
+    """Singleton document mapping user positions (roles) to permission strings.
+
+    ``version`` is incremented on every change; workers compare it with the
+    version they loaded to know when to reload.
+    """
+
+    roles: dict[str, list[str]] = Field(default_factory=dict)
+    version: int = 0
+    updated_at: datetime = Field(default_factory=_utcnow)
+
+    class Settings:
+        name = "permission_registry"
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
-from datetime import datetime, UTC
+from datetime import UTC, datetime
 
 from beanie import Document, PydanticObjectId
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+from app.core.session_cache import session_cache
+from app.core.session_revocations import session_revocations
 
 
 class SessionToken(Document):
@@ -14,10 +18,17 @@ class SessionToken(Document):
     issued_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     expires_at: datetime
     revoked: bool = False
+    revoked_at: datetime | None = None
 
     class Settings:
         name = "session_tokens"
-        indexes = ["token_hash", "user_id"]  # type: ignore[assignment]
+        indexes = [  # type: ignore[assignment]
+            "token_hash",
+            "user_id",
+            "revoked_at",
+            # MongoDB deletes each row once its expires_at has passed
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+        ]
 
     @property
     def is_expired(self) -> bool:
@@ -30,4 +41,7 @@ class SessionToken(Document):
         if self.revoked:
             return
         self.revoked = True
+        self.revoked_at = datetime.now(UTC)
         await self.save()
+        session_revocations.add(self.token_hash, self.expires_at)
+        await session_cache.invalidate(self.token_hash)
@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+import re
 from datetime import datetime, UTC
 
-from beanie import Document
-from pydantic import EmailStr, Field, HttpUrl
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, EmailStr, Field, HttpUrl
+from pymongo import ASCENDING, IndexModel
 
+from app.core.session_cache import session_cache
 from app.models.enums import EmploymentTypeLiteral, PositionLiteral
 
 
@@ -14,6 +17,18 @@ def _utcnow() -> datetime:
     return datetime.now(UTC)
 
 
+_SEARCH_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_user_search_terms(*values: str | None) -> list[str]:
+    """Distinct lower-cased word tokens of ``values`` in first-seen order."""
+    terms: dict[str, None] = {}
+    for value in values:
+        for token in _SEARCH_TOKEN_PATTERN.findall((value or "").lower()):
+            terms.setdefault(token, None)
+    return list(terms)
+
+
 class User(Document):
     employee_id: str | None = None
     name: str
@@ -30,11 +45,57 @@ class User(Document):
     is_active: bool = True
     created_at: datetime = Field(default_factory=_utcnow)
     updated_at: datetime = Field(default_factory=_utcnow)
+    # Directory search terms, maintained by refresh_search_terms (see app.services.employee_search)
+    search_terms: list[str] = Field(default_factory=list)
 
     class Settings:
         name = "users"
-        indexes = ["email", "employee_id"]
+        indexes = [  # type: ignore[assignment]
+            "email",
+            "employee_id",
+            IndexModel(
+                [("is_active", ASCENDING), ("search_terms", ASCENDING)],
+                name="is_active_search_terms",
+            ),
+            IndexModel([("is_active", ASCENDING), ("name", ASCENDING)], name="is_active_name"),
+        ]
+
+    def refresh_search_terms(self) -> None:
+        self.search_terms = build_user_search_terms(
+            self.name,
+            str(self.email),
+            self.employee_id,
+            self.title,
+            self.division,
+            self.level,
+            self.position,
+        )
 
     async def touch(self) -> None:
         self.updated_at = _utcnow()
+        self.refresh_search_terms()
         await self.save()
+        # Cached sessions hold a snapshot of this user
+        await session_cache.invalidate_user(str(self.id))
+
+
+class UserSummary(BaseModel):
+    """Directory projection of ``User``: no password hash or search terms.
+
+    Used with ``projection_model=`` and by directory search so employee listings
+    never fetch ``hashed_password``.
+    """
+
+    id: PydanticObjectId = Field(alias="_id")
+    employee_id: str | None = None
+    name: str
+    email: str
+    title: str | None = None
+    division: str | None = None
+    level: str | None = None
+    position: PositionLiteral | None = None
+    employment_type: EmploymentTypeLiteral = Field(default="full-time")
+    subordinates: list[str] = Field(default_factory=list)
+    projects: list[str] = Field(default_factory=list)
+    avatar: HttpUrl | None = None
+    is_active: bool = True
@@ -0,0 +1,43 @@
+"""Workload entry fact model."""
+
+from datetime import datetime
+
+from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+
+class WorkloadEntryFact(Document):
+    """One workload summary item of a parsed Slack standup message.
+
+    Derived from ``SlackMessage.parsed_result`` by ``app.services.workload_entries``
+    with the project mapping, hour split, billable flag and work type precomputed.
+    """
+
+    message_id: PydanticObjectId
+    seq: int  # Position of the item within the message's workload summary
+    date: datetime  # Midnight (UTC) of the day the work was reported for
+    timestamp: int  # Slack message time, epoch seconds
+    user_id: str
+    user: str
+    original_project: str
+    project: str
+    is_mapped: bool = False
+    activity_description: str
+    hours_worked: float
+    overtime_hours: float
+    total_hours: float
+    billable_hours: float
+    is_billable: bool
+    work_type: str
+    notes: str
+
+    class Settings:
+        name = "workload_entries"
+        indexes = [
+            IndexModel([("message_id", ASCENDING), ("seq", ASCENDING)], unique=True),
+            IndexModel([("date", ASCENDING), ("timestamp", DESCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("date", ASCENDING)]),
+            IndexModel([("project", ASCENDING), ("date", ASCENDING)]),
+            # Entry listing order (``workload_entries.ENTRY_SORT``)
+            IndexModel([("timestamp", DESCENDING), ("message_id", ASCENDING), ("seq", ASCENDING)]),
+        ]
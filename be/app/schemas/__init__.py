@@ -15,6 +15,9 @@ from .document import (
     DocumentBreadcrumbSchema,
     DocumentCreate,
     DocumentResponse,
+    DocumentSearchPage,
+    DocumentSearchResult,
+    DocumentSummaryResponse,
     DocumentUpdate,
     ItemCountResponse,
 )
@@ -24,6 +27,9 @@ __all__ = [
     "DocumentBreadcrumbSchema",
     "DocumentCreate",
     "DocumentResponse",
+    "DocumentSearchPage",
+    "DocumentSearchResult",
+    "DocumentSummaryResponse",
     "DocumentUpdate",
     "DistinctValuesResponse",
     "ItemCountResponse",
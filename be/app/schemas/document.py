@@ -44,7 +44,9 @@ class DocumentUpdate(BaseModel):
     content_html: str | None = None  # New HTML-based format (TipTap)
 
 
-class DocumentResponse(DocumentBase):
+class DocumentSummaryResponse(DocumentBase):
+    """Document metadata without the body, used by listings and search."""
+
     id: str
     owned_by: DocumentOwnerSchema
     date_created: datetime
@@ -53,8 +55,6 @@ class DocumentResponse(DocumentBase):
     size: str | None = None
     item_count: int | None = None
     path: list[str] = Field(default_factory=list)
-    content: list[DocumentBlock] = Field(default_factory=list)  # Legacy block-based format
-    content_html: str | None = None  # New HTML-based format (TipTap)
 
     class Config:
         json_encoders = {
@@ -62,6 +62,21 @@ class DocumentResponse(DocumentBase):
         }
 
 
+class DocumentResponse(DocumentSummaryResponse):
+    content: list[DocumentBlock] = Field(default_factory=list)  # Legacy block-based format
+    content_html: str | None = None  # New HTML-based format (TipTap)
+
+
+class DocumentSearchResult(DocumentSummaryResponse):
+    score: int = 0
+    snippet: str | None = None  # Excerpt of the content around the first matched term
+
+
+class DocumentSearchPage(BaseModel):
+    items: list[DocumentSearchResult] = Field(default_factory=list)
+    next_cursor: str | None = None
+
+
 class DocumentBreadcrumbSchema(BaseModel):
     id: str
     name: str
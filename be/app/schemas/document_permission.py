@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 from typing import Literal
-from pydantic import BaseModel
+
+from pydantic import BaseModel, Field, model_validator
 
 
 class DocumentPermissionSchema(BaseModel):
@@ -44,3 +45,46 @@ class UpdatePermissionRequest(BaseModel):
     """Request schema for updating permission."""
     permission: Literal["viewer", "editor"]
 
+
+
+class PermissionOperation(BaseModel):
+    """One grant or revoke of a user or division permission in a bulk request."""
+    action: Literal["grant", "revoke"]
+    document_id: str
+    user_id: str | None = None
+    user_name: str | None = None
+    user_email: str | None = None
+    division: str | None = None
+    permission: Literal["viewer", "editor"] | None = None
+
+    @model_validator(mode="after")
+    def _check_target(self) -> PermissionOperation:
+        if (self.user_id is None) == (self.division is None):
+            raise ValueError("Exactly one of user_id or division is required")
+        if self.action == "grant":
+            if self.permission is None:
+                raise ValueError("permission is required to grant access")
+            if self.user_id is not None and (self.user_name is None or self.user_email is None):
+                raise ValueError("user_name and user_email are required to grant a user")
+        return self
+
+
+class BulkPermissionRequest(BaseModel):
+    """Request schema for applying many permission changes at once."""
+    operations: list[PermissionOperation] = Field(min_length=1, max_length=500)
+
+
+class PermissionOperationResult(BaseModel):
+    """Outcome of one operation of a bulk request, in request order."""
+    index: int
+    document_id: str
+    action: Literal["grant", "revoke"]
+    status: Literal["applied", "unchanged", "not_found", "forbidden"]
+    detail: str | None = None
+
+
+class BulkPermissionResponse(BaseModel):
+    """Response schema for bulk permission changes."""
+    results: list[PermissionOperationResult]
+    applied: int
+    failed: int
@@ -28,6 +28,18 @@ class Employee(EmployeeBase):
     id: str
 
 
+class EmployeeSearchPage(BaseModel):
+    items: list[Employee] = Field(default_factory=list)
+    next_cursor: str | None = None
+
+
+class SpanOfControl(BaseModel):
+    employee_id: str
+    direct_reports: int = 0
+    total_reports: int = 0
+    depth: int = 0  # Levels of reports below the employee
+
+
 class EmployeeUpdate(BaseModel):
     name: str | None = None
     email: EmailStr | None = None
@@ -70,5 +82,8 @@ class SaveChartPayload(BaseModel):
 class SaveChartResult(BaseModel):
     created: int = 0
     updated: int = 0
+    unchanged: int = 0  # Matched users whose chart state was already stored
     deactivated: int = 0
     skipped: int = 0
+    # Per-phase durations: load_ms, conflict_check_ms, hash_ms, diff_ms, write_ms, total_ms
+    timings_ms: dict[str, float] = Field(default_factory=dict)
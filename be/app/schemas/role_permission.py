@@ -0,0 +1,20 @@
+"""Role permission schemas."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+from app.models.enums import PermissionLiteral
+
+
+class RolePermissionsResponse(BaseModel):
+    """Current role to permission mapping."""
+
+    version: int = Field(..., description="Registry version, incremented on every change")
+    roles: dict[str, list[str]] = Field(default_factory=dict)
+
+
+class UpdateRolePermissionsRequest(BaseModel):
+    """Replace the permissions of one role; an empty list removes the role."""
+
+    permissions: list[PermissionLiteral] = Field(default_factory=list)
@@ -6,8 +6,10 @@ from typing import Optional, Dict, Any
 from app.schemas.employee import EmployeeCreate, EmployeeUpdate
 
 from app.services.employee import (
-    search_employees,
-    list_employees,
+    search_employees_page,
+    get_all_reports,
+    get_management_chain,
+    get_span_of_control,
     create_employee,
     update_employee,
     deactivate_employee
@@ -19,9 +21,17 @@ class EmptyArgs(BaseModel):
 
 class EmployeeSearchArgs(BaseModel):
     query: str = Field(description="Search active employees by name, email, division, or employee ID. Pass an empty string to get all active employees.")
+    limit: int = Field(default=20, ge=1, le=100, description="Maximum number of employees to return")
+    cursor: Optional[str] = Field(default=None, description="next_cursor from a previous call to fetch the next page")
 
 class ListEmployeesArgs(BaseModel):
     search: Optional[str] = Field(default=None, description="Optional search term to filter employees by name, email, title, or ID")
+    limit: int = Field(default=50, ge=1, le=200, description="Maximum number of employees to return")
+    cursor: Optional[str] = Field(default=None, description="next_cursor from a previous call to fetch the next page")
+
+class ReportingLineArgs(BaseModel):
+    employee_id: str = Field(description="The ID of the employee")
+    depth: Optional[int] = Field(default=None, ge=1, description="Only include reports this many levels down (default: all levels)")
 
 class CreateEmployeeArgs(BaseModel):
     payload: EmployeeCreate = Field(description="Employee details (e.g. name, email, division, position, level, title)")
@@ -52,8 +62,10 @@ def format_success(result: Any) -> dict:
 async def search_employees_tool(args: dict) -> dict:
     try:
         validated = EmployeeSearchArgs(**args)
-        results = await search_employees(validated.query)
-        return format_success(results)
+        results, next_cursor = await search_employees_page(
+            validated.query, limit=validated.limit, cursor=validated.cursor
+        )
+        return format_success({"employees": results, "next_cursor": next_cursor})
     except Exception as e:
         return format_error(e)
 
@@ -65,8 +77,26 @@ async def search_employees_tool(args: dict) -> dict:
 async def list_employees_tool(args: dict) -> dict:
     try:
         validated = ListEmployeesArgs(**args)
-        results = await list_employees(validated.search)
-        return format_success(results)
+        results, next_cursor = await search_employees_page(
+            validated.search, limit=validated.limit, cursor=validated.cursor
+        )
+        return format_success({"employees": results, "next_cursor": next_cursor})
+    except Exception as e:
+        return format_error(e)
+
+@tool(
+    name="get_reporting_line",
+    description="Get an employee's management chain (nearest manager first), everyone reporting to them (directly or indirectly), and their span of control",
+    input_schema=ReportingLineArgs.model_json_schema()
+)
+async def get_reporting_line_tool(args: dict) -> dict:
+    try:
+        validated = ReportingLineArgs(**args)
+        return format_success({
+            "management_chain": await get_management_chain(validated.employee_id),
+            "reports": await get_all_reports(validated.employee_id, validated.depth),
+            "span_of_control": await get_span_of_control(validated.employee_id),
+        })
     except Exception as e:
         return format_error(e)
 
@@ -148,6 +178,7 @@ employee_tools_server = create_sdk_mcp_server(
     tools=[
         search_employees_tool,
         list_employees_tool,
+        get_reporting_line_tool,
         create_employee_tool,
         update_employee_tool,
         deactivate_employee_tool,
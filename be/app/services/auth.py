@@ -3,19 +3,39 @@
 from __future__ import annotations
 
 import hashlib
-from datetime import UTC, datetime
+import math
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument
+
+from app.core.login_throttle import login_throttle
 from app.core.security import (
     ResetToken,
+    decode_signed_session_token,
     generate_reset_token,
     generate_session_token,
-    hash_password,
-    verify_password,
+    generate_signed_session_token,
+    hash_password_async,
+    is_signed_session_token,
+    password_needs_rehash,
+    session_expires_at,
+    verify_password_async,
 )
+from app.core.session_cache import CachedSession, session_cache
+from app.core.session_revocations import session_revocations
 from app.models import PasswordResetToken, SessionToken, User
+from app.schemas.auth import UserProfile
 from app.services.email import EmailConfigurationError, send_email
-from constants import APP_NAME
+from app.services.identity import Identity, session_identity_for, set_session_identity
+from constants import (
+    APP_NAME,
+    SESSION_MAX_LIFETIME_SECONDS,
+    SESSION_RENEWAL_ROTATE,
+    SESSION_SLIDING_RENEWAL,
+    SESSION_TOKEN_STATELESS,
+)
 
 DEFAULT_ADMIN_EMAIL = "admin@quantumteknologi.com"
 
@@ -24,6 +44,14 @@ class AuthenticationError(ValueError):
     pass
 
 
+class LoginThrottledError(AuthenticationError):
+    """Raised when a login attempt is rejected before checking credentials."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__("Too many login attempts, please try again later")
+
+
 class PasswordResetError(ValueError):
     pass
 
@@ -33,19 +61,7 @@ class UserNotFoundError(LookupError):
 
 
 def _serialize_user(user: User) -> dict[str, Any]:
-    return {
-        "id": user.employee_id or str(user.id),
-        "name": user.name,
-        "email": user.email,
-        "title": user.title,
-        "division": user.division,
-        "level": user.level,
-        "position": user.position,
-        "subordinates": user.subordinates,
-        "projects": user.projects,
-        "avatar": user.avatar,
-        "employment_type": user.employment_type,
-    }
+    return Identity.from_user(user).profile.model_dump()
 
 
 async def ensure_default_admin() -> None:
@@ -62,30 +78,42 @@ async def ensure_default_admin() -> None:
         division="Administration",
         level="Admin",
         position="Internal Ops",
-        hashed_password=hash_password("admin"),
+        hashed_password=await hash_password_async("admin"),
         subordinates=[],
         projects=[],
         avatar=None,
         employment_type="full-time",
         is_active=True,
     )
+    admin_user.refresh_search_terms()
     await admin_user.insert()
 
 
-async def authenticate_user(email: str, password: str) -> User:
+async def authenticate_user(email: str, password: str, client_ip: str | None = None) -> User:
     normalized_email = email.strip().lower()
+    # Throttled attempts stop here, before the user lookup and the password hash
+    retry_after = await login_throttle.admit(normalized_email, client_ip)
+    if retry_after:
+        raise LoginThrottledError(retry_after)
+
     user = await User.find_one(User.email == normalized_email)
     if user is None or not user.is_active:
+        await login_throttle.record_failure(normalized_email)
         raise AuthenticationError("Invalid email or password")
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
+        await login_throttle.record_failure(normalized_email)
         raise AuthenticationError("Invalid email or password")
+    await login_throttle.record_success(normalized_email)
+    if password_needs_rehash(user.hashed_password):
+        # Upgrade to the current hashing parameters while the plaintext is at hand
+        user.hashed_password = await hash_password_async(password)
+        await user.touch()
     return user
 
 
-async def login(email: str, password: str) -> dict[str, Any]:
-    user = await authenticate_user(email, password)
-    token, expires_at = generate_session_token(user_identifier=str(user.id))
-    await _persist_session_token(user, token, expires_at)
+async def login(email: str, password: str, client_ip: str | None = None) -> dict[str, Any]:
+    user = await authenticate_user(email, password, client_ip)
+    token, expires_at = await _issue_session_token(user)
     return {
         "token": token,
         "expires_at": expires_at,
@@ -108,22 +136,94 @@ async def _persist_session_token(user: User, token: str, expires_at: int) -> Ses
     return session
 
 
+async def _issue_session_token(user: User) -> tuple[str, int]:
+    """Create and persist a session token (signed when stateless sessions are enabled)."""
+    if SESSION_TOKEN_STATELESS:
+        token, expires_at = generate_signed_session_token(user_identifier=str(user.id))
+    else:
+        token, expires_at = generate_session_token(user_identifier=str(user.id))
+    # Signed tokens are stored too: logout, renew and the revocation list work off this row
+    await _persist_session_token(user, token, expires_at)
+    return token, expires_at
+
+
 async def _load_session(token: str) -> SessionToken | None:
     token_hash = _hash_token(token)
     return await SessionToken.find_one(SessionToken.token_hash == token_hash)
 
 
-async def _resolve_session(token: str) -> tuple[SessionToken, User]:
+async def _load_active_user(user_id: PydanticObjectId) -> User:
+    user = await User.get(user_id)
+    if user is None:
+        raise UserNotFoundError("User associated with the token no longer exists")
+    if not user.is_active:
+        raise AuthenticationError("Invalid or expired session token")
+    return user
+
+
+async def _load_active_session(token: str) -> tuple[SessionToken, User]:
     session = await _load_session(token)
     if session is None or session.revoked or session.is_expired:
         raise AuthenticationError("Invalid or expired session token")
+    return session, await _load_active_user(session.user_id)
 
-    user = await User.get(session.user_id)
-    if user is None:
-        raise UserNotFoundError("User associated with the token no longer exists")
-    if not user.is_active:
+
+async def _load_stateless_session(token: str, token_hash: str) -> tuple[CachedSession, User]:
+    """Validate a signed token from its claims alone (no session read)."""
+    claims = decode_signed_session_token(token)
+    if claims is None:
         raise AuthenticationError("Invalid or expired session token")
-    return session, user
+    try:
+        user_id = PydanticObjectId(claims.user_id)
+    except Exception as exc:
+        raise AuthenticationError("Invalid or expired session token") from exc
+    user = await _load_active_user(user_id)
+    cached = CachedSession(
+        session_id=token_hash,
+        user_id=str(user.id),
+        expires_at=datetime.fromtimestamp(claims.expires_at / 1000, tz=UTC),
+        user=user.model_dump(),
+    )
+    return cached, user
+
+
+async def resolve_request_identity(token: str) -> Identity:
+    """Resolve a bearer token to the request's identity.
+
+    This is the single resolution path for v1 routes and v2 submodules: repeated
+    calls within a request return the same ``Identity``, and across requests the
+    session cache spares the session and user queries. Signed tokens (stateless
+    sessions) skip the session query altogether once the revocation list is loaded.
+    """
+    token_hash = _hash_token(token)
+    identity = session_identity_for(token_hash)
+    if identity is not None:
+        return identity
+
+    # Revocations from other workers reach this list before the cache entry expires
+    stateless = session_revocations.ready and is_signed_session_token(token)
+    if stateless and session_revocations.is_revoked(token_hash):
+        raise AuthenticationError("Invalid or expired session token")
+
+    hit, cached = session_cache.get(token_hash)
+    if hit:
+        if cached is None:
+            raise AuthenticationError("Invalid or expired session token")
+        user = User.model_validate(cached.user)
+    else:
+        epoch = session_cache.epoch
+        try:
+            if stateless:
+                cached, user = await _load_stateless_session(token, token_hash)
+            else:
+                session, user = await _load_active_session(token)
+                cached = CachedSession.from_documents(session, user)
+        except AuthenticationError:
+            session_cache.put(token_hash, None, epoch)
+            raise
+        session_cache.put(token_hash, cached, epoch)
+    # Later lookups of this user within the request are served from the identity cache
+    return set_session_identity(user, token_hash)
 
 
 async def _store_reset_token(email: str, token: ResetToken) -> PasswordResetToken:
@@ -175,7 +275,7 @@ async def reset_password(token_value: str, new_password: str) -> None:
     if user is None:
         raise PasswordResetError("Associated user account not found")
 
-    user.hashed_password = hash_password(new_password)
+    user.hashed_password = await hash_password_async(new_password)
     await user.touch()
 
     token_document.used = True
@@ -190,10 +290,10 @@ async def change_password(identifier: str, current_password: str, new_password:
     if user is None:
         raise AuthenticationError("User not found")
 
-    if not verify_password(current_password, user.hashed_password):
+    if not await verify_password_async(current_password, user.hashed_password):
         raise AuthenticationError("Invalid current password")
 
-    user.hashed_password = hash_password(new_password)
+    user.hashed_password = await hash_password_async(new_password)
     await user.touch()
 
 
@@ -214,12 +314,60 @@ def parse_bearer_token(authorization_header: str | None) -> str:
     return token
 
 
+async def _slide_session(token: str) -> dict[str, Any]:
+    """Extend (and optionally rotate) a session row in place with one atomic update.
+
+    The filter re-checks revocation, expiry and the absolute lifetime in the
+    database, so a token revoked on another worker is still refused.
+    """
+    identity = await resolve_request_identity(token)
+    token_hash = _hash_token(token)
+    now = datetime.now(UTC)
+
+    if SESSION_RENEWAL_ROTATE:
+        new_token, expires_at = generate_session_token(user_identifier=identity.object_id)
+    else:
+        new_token, expires_at = token, session_expires_at()
+    new_expiry: Any = datetime.fromtimestamp(expires_at / 1000, tz=UTC)
+
+    query: dict[str, Any] = {"token_hash": token_hash, "revoked": False, "expires_at": {"$gt": now}}
+    if SESSION_MAX_LIFETIME_SECONDS > 0:
+        query["issued_at"] = {"$gt": now - timedelta(seconds=SESSION_MAX_LIFETIME_SECONDS)}
+        # Never slide past issued_at + the absolute lifetime
+        new_expiry = {
+            "$min": [new_expiry, {"$add": ["$issued_at", SESSION_MAX_LIFETIME_SECONDS * 1000]}]
+        }
+
+    row = await SessionToken.get_pymongo_collection().find_one_and_update(
+        query,
+        [{"$set": {"token_hash": _hash_token(new_token), "expires_at": new_expiry}}],
+        projection={"expires_at": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if row is None:
+        raise AuthenticationError("Invalid or expired session token")
+    if new_token != token:
+        # The old token must stop resolving on every worker
+        await session_cache.invalidate(token_hash)
+
+    expires_at_dt = row["expires_at"].replace(tzinfo=UTC)
+    return {
+        "token": new_token,
+        "expires_at": int(expires_at_dt.timestamp() * 1000),
+        "user": identity.profile.model_dump(),
+    }
+
+
 async def renew_session(token: str) -> dict[str, Any]:
-    session, user = await _resolve_session(token)
+    # Signed tokens carry their expiry in the claims, so they are always reissued
+    if SESSION_SLIDING_RENEWAL and not is_signed_session_token(token):
+        return await _slide_session(token)
+
+    # Read through to the database: a token revoked on another worker must not be renewed
+    session, user = await _load_active_session(token)
     await session.revoke()
 
-    new_token, expires_at = generate_session_token(user_identifier=str(user.id))
-    await _persist_session_token(user, new_token, expires_at)
+    new_token, expires_at = await _issue_session_token(user)
     return {
         "token": new_token,
         "expires_at": expires_at,
@@ -227,9 +375,15 @@ async def renew_session(token: str) -> dict[str, Any]:
     }
 
 
+async def get_request_profile(token: str) -> UserProfile:
+    """``UserProfile`` of the request's identity (see ``resolve_request_identity``)."""
+    identity = await resolve_request_identity(token)
+    return identity.profile
+
+
 async def get_user_profile_from_token(token: str) -> dict[str, Any]:
-    _, user = await _resolve_session(token)
-    return _serialize_user(user)
+    identity = await resolve_request_identity(token)
+    return identity.profile.model_dump()
 
 
 async def logout(token: str) -> None:
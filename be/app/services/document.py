@@ -5,15 +5,26 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from typing import Any, Iterable, Literal
 
+from beanie.operators import In
+
 from app.logging_utils import get_logger, log_debug, log_info, log_warning
 from app.models.document import (
-    DocumentHistory,
     DocumentItem,
     DocumentOwner,
+    DocumentSummary,
     DocumentUserRef,
     EditHistoryEvent,
 )
 from app.schemas.document import DocumentCreate
+from app.services import document_history, document_search
+from app.services.document_acl import grants_for_children, rebase_subtree_grants
+from app.services.document_autosave import edit_coalescer
+from app.services.document_item_count import adjust_item_count, get_stored_item_count
+from app.services.document_share_roots import (
+    drop_share_roots,
+    refresh_share_roots,
+    share_root_documents,
+)
 
 
 class DocumentAlreadyExistsError(ValueError):
@@ -39,7 +50,8 @@ def _normalize_content(document: DocumentItem) -> None:
         document.content = []
 
 
-def _serialize_document(document: DocumentItem) -> dict[str, Any]:
+def _serialize_summary(document: DocumentItem | DocumentSummary) -> dict[str, Any]:
+    """Listing payload: everything but the document body."""
     return {
         "id": document.document_id,
         "name": document.name,
@@ -60,55 +72,40 @@ def _serialize_document(document: DocumentItem) -> dict[str, Any]:
         "path": document.path,
         "shared": document.shared,
         "share_url": document.share_url,
-        "content": document.content if document.content is not None else [],
-        "content_html": document.content_html,
         "user_permissions": [perm.model_dump() for perm in document.user_permissions],
         "division_permissions": [perm.model_dump() for perm in document.division_permissions],
     }
 
 
+def _serialize_document(document: DocumentItem) -> dict[str, Any]:
+    return {
+        **_serialize_summary(document),
+        "content": document.content if document.content is not None else [],
+        "content_html": document.content_html,
+    }
+
+
 async def _record_history(
     document: DocumentItem,
     action: Literal["created", "updated", "deleted"],
     changes: dict[str, Any],
     editor_id: str | None = None,
 ) -> None:
-    revision = await DocumentHistory.find(
-        DocumentHistory.document_id == document.document_id
-    ).count()
-    history_entry = DocumentHistory(
-        document_id=document.document_id,
-        revision=revision + 1,
-        action=action,
-        changes=changes,
-        snapshot=_serialize_document(document),
+    await document_history.record_revision(
+        document.document_id,
+        _serialize_document(document),
+        action,
+        changes,
         editor_id=editor_id,
     )
-    await history_entry.insert()
-
 
-async def _purge_document_audit_trail(document_id: str) -> None:
-    """Remove historical audit records for the provided document id."""
-    await DocumentHistory.find(DocumentHistory.document_id == document_id).delete()
-    await EditHistoryEvent.find(EditHistoryEvent.document_id == document_id).delete()
 
-
-async def _refresh_item_count(folder_id: str | None) -> None:
-    if not folder_id:
-        return
-    folder = await DocumentItem.find_one(
-        DocumentItem.document_id == folder_id,
-        ACTIVE_DOCUMENT,
-    )
-    if folder is None:
+async def _purge_document_audit_trail(document_ids: list[str]) -> None:
+    """Remove historical audit records for the provided document ids."""
+    if not document_ids:
         return
-    count = await DocumentItem.find(
-        DocumentItem.parent_id == folder_id,
-        ACTIVE_DOCUMENT,
-    ).count()
-    folder.item_count = count
-    folder.updated_at = _utcnow()
-    await folder.save()
+    await document_history.purge_history(document_ids)
+    await EditHistoryEvent.find(In(EditHistoryEvent.document_id, document_ids)).delete()
 
 
 async def _apply_path(document: DocumentItem) -> None:
@@ -119,25 +116,60 @@ async def _apply_path(document: DocumentItem) -> None:
         )
         if parent is None:
             raise DocumentNotFoundError(f"Parent '{document.parent_id}' not found")
+        if document.document_id in parent.ancestor_ids:
+            raise ValueError("Document cannot be moved into one of its descendants")
         document.path = parent.path + [parent.name]
+        document.ancestor_ids = parent.ancestor_ids + [parent.document_id]
+        document.inherited_grants = grants_for_children(parent)
     else:
         document.path = []
+        document.ancestor_ids = []
+        document.inherited_grants = []
 
 
-async def _refresh_descendant_paths(document: DocumentItem) -> None:
-    children = await DocumentItem.find(
-        DocumentItem.parent_id == document.document_id,
-        ACTIVE_DOCUMENT,
-    ).to_list()
-    for child in children:
-        child.path = document.path + [document.name]
-        await child.save()
-        await _refresh_descendant_paths(child)
+def _descendants_filter(document_id: str, depth: int) -> dict[str, Any]:
+    """Match descendants of the folder sitting at ``depth`` in the tree.
+
+    Document ids are only unique per parent, so the positional clause keeps
+    same-named folders elsewhere in the tree out of the match.
+    """
+    return {"ancestor_ids": document_id, f"ancestor_ids.{depth}": document_id}
+
+
+async def _refresh_descendant_paths(document: DocumentItem, previous_depth: int) -> None:
+    """Rebase ``path``/``ancestor_ids`` of every descendant in a single update.
+
+    ``previous_depth`` is the folder's depth before the change, i.e. the index
+    at which descendants currently store its id.
+    """
+    keep_from = previous_depth + 1
+    tail_length = {"$max": [{"$size": "$ancestor_ids"}, 1]}
+    await DocumentItem.get_pymongo_collection().update_many(
+        {**_descendants_filter(document.document_id, previous_depth), **ACTIVE_DOCUMENT},
+        [
+            {
+                "$set": {
+                    "ancestor_ids": {
+                        "$concatArrays": [
+                            document.ancestor_ids + [document.document_id],
+                            {"$slice": ["$ancestor_ids", keep_from, tail_length]},
+                        ]
+                    },
+                    "path": {
+                        "$concatArrays": [
+                            document.path + [document.name],
+                            {"$slice": ["$path", keep_from, tail_length]},
+                        ]
+                    },
+                }
+            }
+        ],
+    )
 
 
-def _uniq_by_id(items: Iterable[DocumentItem]) -> list[DocumentItem]:
+def _uniq_by_id(items: Iterable[DocumentSummary]) -> list[DocumentSummary]:
     seen: set[str] = set()
-    out: list[DocumentItem] = []
+    out: list[DocumentSummary] = []
     for it in items:
         if it.document_id not in seen:
             seen.add(it.document_id)
@@ -155,10 +187,9 @@ async def get_documents_by_parent(
     - Jika parent_id ada: tampilkan anak-anak folder itu seperti biasa, disaring oleh access checker.
     """
     from app.services.document_permission import (
+        _is_admin,
         _resolve_user,
-        check_document_access,
-        has_ancestor_folder_access,
-        has_direct_document_access,
+        filter_accessible,
     )
 
     log_debug(
@@ -168,28 +199,27 @@ async def get_documents_by_parent(
         user_id=user_id,
     )
 
-    # Check if user is admin for special handling
-    is_admin = False
-    if user_id:
-        user = await _resolve_user(user_id)
-        if user and user.is_active:
-            from app.services.document_permission import _is_admin
-            is_admin = _is_admin(user)
+    # Resolve the viewer once; every access decision below reuses it
+    user = await _resolve_user(user_id) if user_id else None
+    is_admin = bool(user and user.is_active and _is_admin(user))
 
     # Base query: children of the requested parent (or root children)
     # For System Administrators viewing root, return ALL documents globally
+    # Listings only need metadata, so bodies are projected away
     if parent_id is None and is_admin:
-        query = DocumentItem.find(ACTIVE_DOCUMENT)
+        query = DocumentItem.find(ACTIVE_DOCUMENT, projection_model=DocumentSummary)
         log_debug(logger, "admin root view: fetching all documents globally", user_id=user_id)
     elif parent_id is None:
         query = DocumentItem.find(
             DocumentItem.parent_id == None,  # noqa: E711
             ACTIVE_DOCUMENT,
+            projection_model=DocumentSummary,
         )
     else:
         query = DocumentItem.find(
             DocumentItem.parent_id == parent_id,
             ACTIVE_DOCUMENT,
+            projection_model=DocumentSummary,
         )
 
     documents = await query.sort(DocumentItem.name).to_list()
@@ -197,18 +227,9 @@ async def get_documents_by_parent(
 
     # Access-filter untuk listing normal
     if user_id:
-        from app.services.document_permission import (
-            check_document_access,
-            has_ancestor_folder_access,
-            has_direct_document_access,
-        )
-
         # For admins, skip access filtering as they have access to all documents
         if not is_admin:
-            filtered: list[DocumentItem] = []
-            for document in documents:
-                if await check_document_access(document.document_id, user_id, "viewer"):
-                    filtered.append(document)
+            filtered = await filter_accessible(documents, user, "viewer")
             log_debug(logger, "filtered accessible documents", original=len(documents), accessible=len(filtered), user_id=user_id)
             documents = filtered
         else:
@@ -217,77 +238,27 @@ async def get_documents_by_parent(
         # === Virtual root injection (hanya saat root listing dan bukan admin) ===
         # Admins already see all documents, so skip virtual injection
         if parent_id is None and not is_admin:
-            user = await _resolve_user(user_id)
             if user and user.is_active:
-                virtuals: list[DocumentItem] = []
-
-                # Build list of possible user identifiers (employee_id and/or MongoDB ObjectId)
-                # This ensures we find documents regardless of which ID was used when sharing
-                user_identifiers = [str(user.id)]
-                if user.employee_id:
-                    user_identifiers.append(user.employee_id)
-
-                # Cari dokumen/folder non-root yang user adalah owner OR
-                # punya direct user permission OR punya division permission.
-                # (Kami mencari parent_id != None agar memang bukan already-root)
-                candidates = await DocumentItem.find(
-                    {
-                        "is_deleted": False,
-                        "parent_id": {"$ne": None},
-                        "$or": [
-                            {"owned_by.id": {"$in": user_identifiers}},
-                            {"user_permissions": {"$elemMatch": {"user_id": {"$in": user_identifiers}}}},
-                            {
-                                "division_permissions": {
-                                    "$elemMatch": {
-                                        "division": user.division if user.division else "__NO_DIV__"
-                                    }
-                                }
-                            },
-                        ],
-                    }
-                ).to_list()
-
-                # Dedup candidates (by document_id)
-                unique_candidates = _uniq_by_id(candidates)
-
-                # print(unique_candidates)
-
-                # Keep only those with *direct* access and WITHOUT ancestor-folder inheritance.
-                # This selects both files and folders that were shared directly to the user.
-                for doc in unique_candidates:
-                    direct_ok = await has_direct_document_access(doc.document_id, user_id, "viewer")
-                    if not direct_ok:
-                        continue
-                    # if the doc is already visible via some shared ancestor folder, skip it
-                    inherited_ok = await has_ancestor_folder_access(
-                        doc.document_id, user_id, "viewer"
-                    )
-                    if inherited_ok:
-                        continue
-                    # dedupe against documents already in the listing
-                    if all(d.document_id != doc.document_id for d in documents):
-                        virtuals.append(doc)
+                # Topmost documents shared directly with the user (owner/user/division
+                # grant) that no ancestor folder already grants, from the share-roots index
+                listed_ids = {d.document_id for d in documents}
+                virtuals = [
+                    doc for doc in await share_root_documents(user) if doc.document_id not in listed_ids
+                ]
 
                 if virtuals:
                     documents = _uniq_by_id(documents + virtuals)
                     log_debug(logger, "virtual documents injected", user_id=user_id, count=len(virtuals))
 
-    # Normalize & serialize
-    for document in documents:
-        _normalize_content(document)
     # Sort by name for stable order
     documents.sort(key=lambda d: (d.name or "").lower())
-    result = [_serialize_document(document) for document in documents]
+    result = [_serialize_summary(document) for document in documents]
     log_debug(logger, "document listing completed", parent_id=parent_id, user_id=user_id, result_count=len(result))
     return result
 
 
 async def get_item_count(folder_id: str) -> int:
-    return await DocumentItem.find(
-        DocumentItem.parent_id == folder_id,
-        ACTIVE_DOCUMENT,
-    ).count()
+    return await get_stored_item_count(folder_id)
 
 
 async def get_document_by_id(document_id: str) -> DocumentItem:
@@ -311,13 +282,7 @@ async def get_document_payload(document_id: str) -> dict[str, Any]:
 
 async def get_folder_path_ids(folder_id: str) -> list[str]:
     document = await get_document_by_id(folder_id)
-    path: list[str] = []
-    current = document
-    while current.parent_id:
-        path.insert(0, current.parent_id)
-        current = await get_document_by_id(current.parent_id)
-    path.append(folder_id)
-    return path
+    return document.ancestor_ids + [folder_id]
 
 
 async def build_breadcrumbs(current_folder_id: str | None) -> list[dict[str, Any]]:
@@ -330,16 +295,18 @@ async def build_breadcrumbs(current_folder_id: str | None) -> list[dict[str, Any
         return breadcrumbs
 
     ancestors: list[DocumentItem] = []
-    walker = current
-    while walker.parent_id:
-        parent = await DocumentItem.find_one(
-            DocumentItem.document_id == walker.parent_id,
+    if current.ancestor_ids:
+        found = await DocumentItem.find(
+            In(DocumentItem.document_id, current.ancestor_ids),
             ACTIVE_DOCUMENT,
-        )
-        if parent is None:
-            break
-        ancestors.insert(0, parent)
-        walker = parent
+        ).to_list()
+        by_id = {doc.document_id: doc for doc in found}
+        # Walk upwards so a missing ancestor cuts the trail like the parent chain would
+        for ancestor_id in reversed(current.ancestor_ids):
+            parent = by_id.get(ancestor_id)
+            if parent is None:
+                break
+            ancestors.insert(0, parent)
 
     for ancestor in ancestors + [current]:
         breadcrumbs.append(
@@ -352,6 +319,44 @@ async def build_breadcrumbs(current_folder_id: str | None) -> list[dict[str, Any
     return breadcrumbs
 
 
+async def search_documents(
+    query_text: str,
+    access_filter: dict[str, Any] | None,
+    *,
+    types: list[str] | None = None,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> tuple[list[tuple[DocumentSummary, document_search.SearchHit]], str | None]:
+    """Ranked search over name, category and content, best matches first.
+
+    ``access_filter`` comes from ``build_access_predicate`` so access checks,
+    ranking and pagination all run inside MongoDB. Pages are addressed either by
+    ``offset`` or by the keyset ``cursor`` returned with the previous page.
+    """
+    filters: list[dict[str, Any]] = [ACTIVE_DOCUMENT]
+    if types:
+        filters.append({"type": {"$in": types}})
+    if access_filter:
+        filters.append(access_filter)
+
+    hits, next_cursor = await document_search.search(
+        query_text, filters, limit=limit, offset=offset, cursor=cursor
+    )
+    if not hits:
+        return [], next_cursor
+
+    documents = await DocumentItem.find(
+        In(DocumentItem.id, [hit.object_id for hit in hits]),
+        projection_model=DocumentSummary,
+    ).to_list()
+    by_object_id = {document.object_id: document for document in documents}
+    results = [
+        (by_object_id[hit.object_id], hit) for hit in hits if hit.object_id in by_object_id
+    ]
+    return results, next_cursor
+
+
 async def get_distinct_types(search: str | None = None) -> list[str]:
     values = await DocumentItem.find(ACTIVE_DOCUMENT).distinct("type")
     filtered = [value for value in values if isinstance(value, str)]
@@ -390,14 +395,15 @@ async def create_document(payload: DocumentCreate, owner: dict[str, Any]) -> dic
         type=payload.type,
         owned_by=DocumentOwner(**owner),
         parent_id=payload.parent_id,
+        # initialize last_modified_by as owner on create
+        last_modified_by=DocumentUserRef(id=owner["id"], name=owner["name"]),
+        item_count=0 if payload.type == "folder" else None,
     )
 
     await _apply_path(document)
+    document_search.apply_search_fields(document)
     await document.insert()
-
-    # initialize last_modified_by as owner on create
-    document.last_modified_by = DocumentUserRef(id=owner["id"], name=owner["name"])  # type: ignore[index]
-    await document.save()
+    await refresh_share_roots(document)
 
     await _record_history(
         document,
@@ -405,35 +411,14 @@ async def create_document(payload: DocumentCreate, owner: dict[str, Any]) -> dic
         {"new": _serialize_document(document)},
         editor_id=owner.get("id"),
     )
-    await _refresh_item_count(document.parent_id)
+    await adjust_item_count(document.parent_id, 1)
 
     return _serialize_document(document)
 
 
-async def record_edit_history(
-    document_id: str,
-    editor: dict[str, str],
-) -> None:
-    """Record an edit event for the document timeline.
-
-    Each invocation inserts a new event so the frontend can show the full history.
-    Always updates the document's last_modified and last_modified_by.
-    """
-    now = _utcnow()
-    event = EditHistoryEvent(
-        document_id=document_id,
-        editor_id=editor["id"],
-        editor_name=editor["name"],
-        at=now,
-    )
-    await event.insert()
-
-    # Update document metadata
-    document = await get_document_by_id(document_id)
-    document.last_modified = now
-    document.last_modified_by = DocumentUserRef(id=editor["id"], name=editor["name"])  # type: ignore[arg-type]
-    document.updated_at = now
-    await document.save()
+async def get_revision(document_id: str, revision: int) -> dict[str, Any]:
+    """Rebuild the stored snapshot of ``document_id`` as of ``revision``."""
+    return await document_history.rebuild_revision(document_id, revision)
 
 
 async def get_edit_history(document_id: str) -> list[dict[str, Any]]:
@@ -475,6 +460,7 @@ async def update_document(
 
     changes: dict[str, Any] = {}
     old_parent_id = document.parent_id
+    old_depth = len(document.ancestor_ids)
 
     if "name" in payload and payload["name"] and payload["name"] != document.name:
         changes["name"] = {"old": document.name, "new": payload["name"]}
@@ -523,26 +509,48 @@ async def update_document(
         log_debug(logger, "update_document no changes", document_id=document_id)
         return _serialize_document(document)
 
-    await _apply_path(document)
+    updated_fields = set(changes)
+    previous_inherited = list(document.inherited_grants)
+    if "parent_id" in changes:
+        await _apply_path(document)
+        updated_fields |= {"path", "ancestor_ids", "inherited_grants"}
+    if changes.keys() & {"name", "category", "content", "content_html"}:
+        document_search.apply_search_fields(document)
+        updated_fields |= {"content_text", "search_terms"}
     document.last_modified = _utcnow()
     document.updated_at = document.last_modified
+    updated_fields |= {"last_modified", "updated_at"}
     if editor is not None:
         document.last_modified_by = DocumentUserRef(id=editor["id"], name=editor["name"])  # type: ignore[arg-type]
-    await document.save()
+        updated_fields.add("last_modified_by")
+    # One $set of the touched fields instead of rewriting the whole document
+    await DocumentItem.find_one(DocumentItem.id == document.id).update(
+        {"$set": document.model_dump(by_alias=True, include=updated_fields)}
+    )
     log_debug(logger, "update_document persisted", document_id=document_id, changes=list(changes.keys()))
 
-    if document.type == "folder" or "parent_id" in changes:
-        await _refresh_descendant_paths(document)
-
-    await _record_history(document, "updated", changes)
-
-    # Coalesced edit event only for real edits and only when editor is known
-    if editor is not None:
-        await record_edit_history(document.document_id, editor)
+    if document.type == "folder" and ("name" in changes or "parent_id" in changes):
+        await _refresh_descendant_paths(document, old_depth)
+    if "parent_id" in changes:
+        # Moving changes which ancestor grants cover the subtree
+        await rebase_subtree_grants(document, previous_inherited)
+        await refresh_share_roots(document, previous_depth=old_depth)
+
+    if editor is None:
+        # Buffered editor edits hold older snapshots; write them before this one
+        await edit_coalescer.flush_document(document.document_id)
+        await _record_history(document, "updated", changes)
+    else:
+        # Autosaves from the same editor are merged into one revision and one edit event
+        await edit_coalescer.submit(
+            document.document_id, _serialize_document(document), changes, editor
+        )
+        if commit:
+            await edit_coalescer.flush_document(document.document_id)
 
     if "parent_id" in changes:
-        await _refresh_item_count(old_parent_id)
-        await _refresh_item_count(document.parent_id)
+        await adjust_item_count(old_parent_id, -1)
+        await adjust_item_count(document.parent_id, 1)
 
     serialized = _serialize_document(document)
     log_info(logger, "update_document completed", document_id=document_id, changes=list(changes.keys()))
@@ -550,26 +558,36 @@ async def update_document(
 
 
 async def _soft_delete(document: DocumentItem) -> None:
-    document.is_deleted = True
-    document.deleted_at = _utcnow()
-    document.last_modified = document.deleted_at
-    document.updated_at = document.deleted_at
-    await document.save()
-
-    children = await DocumentItem.find(
-        DocumentItem.parent_id == document.document_id,
+    """Soft delete the document and its whole subtree with a single update."""
+    subtree = DocumentItem.find(
+        {
+            "$or": [
+                {"_id": document.id},
+                _descendants_filter(document.document_id, len(document.ancestor_ids)),
+            ],
+        },
         ACTIVE_DOCUMENT,
-    ).to_list()
-    for child in children:
-        await _soft_delete(child)
+    )
+    deleted_ids = [value for value in await subtree.distinct("id") if isinstance(value, str)]
+
+    now = _utcnow()
+    await subtree.update_many(
+        {"$set": {"is_deleted": True, "deleted_at": now, "last_modified": now, "updated_at": now}}
+    )
+    document.is_deleted = True
+    document.deleted_at = now
+    document.last_modified = now
+    document.updated_at = now
 
-    await _purge_document_audit_trail(document.document_id)
+    edit_coalescer.discard(deleted_ids)
+    await drop_share_roots(document)
+    await _purge_document_audit_trail(deleted_ids)
 
 
 async def delete_document(document_id: str) -> dict[str, Any]:
     document = await get_document_by_id(document_id)
     await _soft_delete(document)
-    await _refresh_item_count(document.parent_id)
+    await adjust_item_count(document.parent_id, -1)
     return _serialize_document(document)
 
 
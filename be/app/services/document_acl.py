@@ -0,0 +1,143 @@
+"""Materialized inherited access.
+
+Every document stores the direct grants of its ancestor folders in
+``inherited_grants``: one entry per grantee and source folder, where the
+source is the folder's ObjectId string. Inherited access is then answered from
+the document itself instead of walking its parents.
+
+Grant changes on a folder replace the entries sourced at that folder across its
+subtree with one pipeline ``update_many``; moves swap the entries inherited
+from outside the moved subtree the same way.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from app.logging_utils import get_logger, log_debug
+from app.models.document import DocumentItem, DocumentSummary, InheritedGrant
+from app.services.document_share_roots import division_grantee, user_grantee
+
+logger = get_logger(__name__)
+
+_LEVEL_RANK = {"viewer": 1, "editor": 2}
+
+
+def _object_id(document: DocumentItem | DocumentSummary) -> str:
+    if isinstance(document, DocumentSummary):
+        return str(document.object_id)
+    return str(document.id)
+
+
+def _merge_level(levels: dict[str, str], grantee: str, level: str) -> None:
+    if _LEVEL_RANK[level] > _LEVEL_RANK.get(levels.get(grantee, ""), 0):
+        levels[grantee] = level
+
+
+def direct_grants(document: DocumentItem | DocumentSummary) -> list[InheritedGrant]:
+    """The document's own grants as entries sourced at it; the owner counts as editor."""
+    levels: dict[str, str] = {user_grantee(document.owned_by.id): "editor"}
+    for perm in document.user_permissions:
+        _merge_level(levels, user_grantee(perm.user_id), perm.permission)
+    for perm in document.division_permissions:
+        _merge_level(levels, division_grantee(perm.division), perm.permission)
+    source = _object_id(document)
+    return [
+        InheritedGrant(grantee=grantee, level=level, source=source)  # type: ignore[arg-type]
+        for grantee, level in levels.items()
+    ]
+
+
+def grants_for_children(parent: DocumentItem | DocumentSummary) -> list[InheritedGrant]:
+    """Entries a document placed directly under ``parent`` inherits."""
+    inherited = list(parent.inherited_grants)
+    if parent.type == "folder":
+        inherited.extend(direct_grants(parent))
+    return inherited
+
+
+def inherited_level(
+    document: DocumentItem | DocumentSummary, grantees: Iterable[str]
+) -> str | None:
+    """Highest level any of ``grantees`` inherits on ``document``."""
+    wanted = set(grantees)
+    best: str | None = None
+    for entry in document.inherited_grants:
+        if entry.grantee in wanted and _LEVEL_RANK[entry.level] > _LEVEL_RANK.get(best or "", 0):
+            best = entry.level
+    return best
+
+
+def _descendants(document: DocumentItem | DocumentSummary) -> dict[str, Any]:
+    depth = len(document.ancestor_ids)
+    return {
+        "ancestor_ids": document.document_id,
+        f"ancestor_ids.{depth}": document.document_id,
+        "is_deleted": False,
+    }
+
+
+def _replace_entries(drop: dict[str, Any], add: list[InheritedGrant]) -> list[dict[str, Any]]:
+    """Pipeline dropping entries where ``drop`` (over ``$$entry``) holds, then appending ``add``."""
+    return [
+        {
+            "$set": {
+                "inherited_grants": {
+                    "$concatArrays": [
+                        {
+                            "$filter": {
+                                "input": {"$ifNull": ["$inherited_grants", []]},
+                                "as": "entry",
+                                "cond": {"$not": [drop]},
+                            }
+                        },
+                        [entry.model_dump() for entry in add],
+                    ]
+                }
+            }
+        }
+    ]
+
+
+async def propagate_grants(
+    folder: DocumentItem | DocumentSummary, grantees: Iterable[str] | None = None
+) -> None:
+    """Push ``folder``'s current grants for ``grantees`` (default: all) down its subtree."""
+    if folder.type != "folder":
+        return
+    source = _object_id(folder)
+    drop: dict[str, Any] = {"$eq": ["$$entry.source", source]}
+    fresh = direct_grants(folder)
+    if grantees is not None:
+        wanted = list(set(grantees))
+        drop = {"$and": [drop, {"$in": ["$$entry.grantee", wanted]}]}
+        fresh = [entry for entry in fresh if entry.grantee in wanted]
+
+    result = await DocumentItem.get_pymongo_collection().update_many(
+        _descendants(folder), _replace_entries(drop, fresh)
+    )
+    log_debug(
+        logger,
+        "folder grants propagated",
+        document_id=folder.document_id,
+        grantees=len(fresh),
+        descendants=result.modified_count,
+    )
+
+
+async def rebase_subtree_grants(
+    document: DocumentItem, previous_inherited: list[InheritedGrant]
+) -> None:
+    """After a move, replace what the subtree inherited from the old ancestors.
+
+    Every ancestor folder contributes at least its owner entry, so the sources in
+    ``previous_inherited`` are exactly the ones outside the moved subtree.
+    """
+    if document.type != "folder":
+        return
+    outside = list({entry.source for entry in previous_inherited})
+    await DocumentItem.get_pymongo_collection().update_many(
+        _descendants(document),
+        _replace_entries({"$in": ["$$entry.source", outside]}, document.inherited_grants),
+    )
@@ -0,0 +1,152 @@
+"""Coalescing of autosave history writes.
+
+The editor autosaves every few seconds. Instead of one history revision and one
+edit event per save, edits from the same editor on the same document are merged
+for ``DOCUMENT_EDIT_COALESCE_SECONDS`` and flushed in the background as a single
+revision plus a single ``EditHistoryEvent``. At most one editor's edits are
+buffered per document: any other write to the document flushes them first, so
+history revisions are recorded in edit order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from app.logging_utils import get_logger, log_debug, log_error
+from app.models.document import EditHistoryEvent
+from app.services import document_history
+from constants import DOCUMENT_EDIT_COALESCE_SECONDS
+
+logger = get_logger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC)
+
+
+@dataclass(slots=True)
+class _PendingEdit:
+    document_id: str
+    editor: dict[str, str]
+    changes: dict[str, Any]
+    snapshot: dict[str, Any]
+    last_edit_at: datetime
+    timer: asyncio.TimerHandle | None = None
+
+
+def _merge_changes(merged: dict[str, Any], changes: dict[str, Any]) -> None:
+    """Fold ``changes`` into ``merged`` keeping the first ``old`` and the latest ``new``."""
+    for field, change in changes.items():
+        if field in merged and isinstance(change, dict) and "new" in change:
+            merged[field] = {**merged[field], "new": change["new"]}
+        else:
+            merged[field] = change
+
+
+class EditCoalescer:
+    """Buffers per (document, editor) edits and flushes them once per window."""
+
+    def __init__(self, window_seconds: float) -> None:
+        self.window_seconds = window_seconds
+        self._pending: dict[tuple[str, str], _PendingEdit] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(
+        self,
+        document_id: str,
+        snapshot: dict[str, Any],
+        changes: dict[str, Any],
+        editor: dict[str, str],
+    ) -> None:
+        """Queue an edit; with a zero window it is written through immediately."""
+        now = _utcnow()
+        if self.window_seconds <= 0:
+            await self._persist(_PendingEdit(document_id, editor, dict(changes), snapshot, now))
+            return
+
+        key = (document_id, editor["id"])
+        # Revisions must follow edit order, so another editor's buffered edits go out first
+        for other in [other for other in self._pending if other[0] == document_id and other != key]:
+            await self.flush(other)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = _PendingEdit(document_id, editor, {}, snapshot, now)
+            self._pending[key] = pending
+            # The window starts at the first edit so a busy editor still flushes regularly
+            pending.timer = asyncio.get_running_loop().call_later(
+                self.window_seconds, self._spawn_flush, key
+            )
+        _merge_changes(pending.changes, changes)
+        pending.snapshot = snapshot
+        pending.editor = editor
+        pending.last_edit_at = now
+
+    def _spawn_flush(self, key: tuple[str, str]) -> None:
+        task = asyncio.create_task(self.flush(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, key: tuple[str, str]) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        if pending.timer is not None:
+            pending.timer.cancel()
+        try:
+            await self._persist(pending)
+        except Exception as exc:  # pragma: no cover - background flush must not crash the loop
+            log_error(
+                logger,
+                "coalesced edit flush failed",
+                document_id=pending.document_id,
+                editor_id=pending.editor.get("id"),
+                error=str(exc),
+            )
+
+    async def flush_document(self, document_id: str) -> None:
+        """Flush every pending edit of ``document_id`` (explicit save / commit)."""
+        for key in [key for key in self._pending if key[0] == document_id]:
+            await self.flush(key)
+
+    async def flush_all(self) -> None:
+        """Flush everything; called on shutdown so buffered edits are not lost."""
+        for key in list(self._pending):
+            await self.flush(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def discard(self, document_ids: list[str]) -> None:
+        """Drop pending edits of deleted documents so their audit trail stays purged."""
+        targets = set(document_ids)
+        for key in [key for key in self._pending if key[0] in targets]:
+            pending = self._pending.pop(key)
+            if pending.timer is not None:
+                pending.timer.cancel()
+
+    async def _persist(self, pending: _PendingEdit) -> None:
+        await document_history.record_revision(
+            pending.document_id,
+            pending.snapshot,
+            "updated",
+            pending.changes,
+            editor_id=pending.editor.get("id"),
+        )
+        await EditHistoryEvent(
+            document_id=pending.document_id,
+            editor_id=pending.editor["id"],
+            editor_name=pending.editor["name"],
+            at=pending.last_edit_at,
+        ).insert()
+        log_debug(
+            logger,
+            "coalesced edits flushed",
+            document_id=pending.document_id,
+            editor_id=pending.editor.get("id"),
+            fields=list(pending.changes.keys()),
+        )
+
+
+edit_coalescer = EditCoalescer(DOCUMENT_EDIT_COALESCE_SECONDS)
@@ -0,0 +1,257 @@
+"""Document history storage.
+
+Revisions are stored as periodic keyframes (full snapshots) with compact deltas
+in between. A per-document head row holds the latest revision number and
+snapshot: one atomic ``find_one_and_update`` both allocates the next revision
+and hands back the snapshot the new delta is computed against.
+"""
+
+from __future__ import annotations
+
+import difflib
+import re
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+from beanie.operators import In
+from fastapi.encoders import jsonable_encoder
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.logging_utils import get_logger, log_debug
+from app.models.document import DocumentHistory, DocumentHistoryHead
+
+logger = get_logger(__name__)
+
+# A full snapshot is stored every N revisions so rebuilding never replays more than N-1 deltas
+KEYFRAME_INTERVAL = 20
+# Shorter strings are stored whole; a diff would not be smaller
+_TEXT_DIFF_MIN_LENGTH = 256
+# Body fields whose old/new values are already captured by the delta itself
+_BODY_FIELDS = {"content", "content_html"}
+_HTML_TOKEN = re.compile(r"<[^>]*>|[^<\s]+|\s+|<")
+
+
+class DocumentRevisionNotFoundError(ValueError):
+    pass
+
+
+class DocumentHistoryCorruptedError(RuntimeError):
+    """A delta between a keyframe and the requested revision is missing."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC)
+
+
+# ---------- diffing ----------
+
+
+def _tokenize(text: str) -> list[str]:
+    """Split HTML/text into tag, word and whitespace tokens that join back losslessly."""
+    return _HTML_TOKEN.findall(text)
+
+
+def _text_ops(old: str, new: str) -> list[list[Any]]:
+    """Token-level edit script: ``["=", n]`` keep, ``["-", n]`` drop, ``["+", text]`` insert."""
+    old_tokens = _tokenize(old)
+    new_tokens = _tokenize(new)
+    ops: list[list[Any]] = []
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["=", i2 - i1])
+            continue
+        if i2 > i1:
+            ops.append(["-", i2 - i1])
+        if j2 > j1:
+            ops.append(["+", "".join(new_tokens[j1:j2])])
+    return ops
+
+
+def _apply_text_ops(old: str, ops: list[list[Any]]) -> str:
+    tokens = _tokenize(old)
+    position = 0
+    out: list[str] = []
+    for op, value in ops:
+        if op == "=":
+            out.extend(tokens[position : position + value])
+            position += value
+        elif op == "-":
+            position += value
+        else:
+            out.append(value)
+    return "".join(out)
+
+
+def diff_snapshots(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """Compute a patch turning ``old`` into ``new``.
+
+    Changed top-level fields are stored under ``set``; long strings that changed
+    are stored as token diffs under ``text``; removed fields under ``unset``.
+    """
+    set_fields: dict[str, Any] = {}
+    text_fields: dict[str, list[list[Any]]] = {}
+    for key, value in new.items():
+        if key in old and old[key] == value:
+            continue
+        previous = old.get(key)
+        if (
+            isinstance(previous, str)
+            and isinstance(value, str)
+            and len(value) >= _TEXT_DIFF_MIN_LENGTH
+        ):
+            text_fields[key] = _text_ops(previous, value)
+        else:
+            set_fields[key] = value
+    unset_fields = [key for key in old if key not in new]
+
+    patch: dict[str, Any] = {}
+    if set_fields:
+        patch["set"] = set_fields
+    if text_fields:
+        patch["text"] = text_fields
+    if unset_fields:
+        patch["unset"] = unset_fields
+    return patch
+
+
+def apply_patch(snapshot: dict[str, Any], patch: dict[str, Any]) -> dict[str, Any]:
+    """Return a new snapshot with ``patch`` (from ``diff_snapshots``) applied."""
+    result = dict(snapshot)
+    result.update(patch.get("set", {}))
+    for key, ops in patch.get("text", {}).items():
+        result[key] = _apply_text_ops(result.get(key) or "", ops)
+    for key in patch.get("unset", []):
+        result.pop(key, None)
+    return result
+
+
+def _compact_changes(changes: dict[str, Any]) -> dict[str, Any]:
+    """Drop full body values from ``changes``; the delta already records the edit."""
+    return {
+        key: ({"changed": True} if key in _BODY_FIELDS else value)
+        for key, value in changes.items()
+        if key != "new"
+    }
+
+
+async def _advance_head(document_id: str, snapshot: dict[str, Any]) -> dict[str, Any] | None:
+    """Bump the head revision and store ``snapshot``; return the head as it was before."""
+    collection = DocumentHistoryHead.get_pymongo_collection()
+    update = {"$inc": {"revision": 1}, "$set": {"snapshot": snapshot, "updated_at": _utcnow()}}
+    try:
+        return await collection.find_one_and_update(
+            {"document_id": document_id},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+    except DuplicateKeyError:
+        # Two first edits raced to upsert the head; the loser now finds the winner's row
+        return await collection.find_one_and_update(
+            {"document_id": document_id},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+
+
+# ---------- public API ----------
+
+
+async def record_revision(
+    document_id: str,
+    snapshot: dict[str, Any],
+    action: Literal["created", "updated", "deleted"],
+    changes: dict[str, Any],
+    editor_id: str | None = None,
+) -> DocumentHistory:
+    """Append a revision, storing a keyframe or a delta against the previous one."""
+    snapshot = jsonable_encoder(snapshot)
+    previous = await _advance_head(document_id, snapshot)
+    revision = (previous or {}).get("revision", 0) + 1
+    base = (previous or {}).get("snapshot")
+
+    entry = DocumentHistory(
+        document_id=document_id,
+        revision=revision,
+        action=action,
+        changes=_compact_changes(changes),
+        editor_id=editor_id,
+    )
+    if not base or revision % KEYFRAME_INTERVAL == 1:
+        entry.kind = "keyframe"
+        entry.snapshot = snapshot
+    else:
+        entry.kind = "delta"
+        entry.patch = diff_snapshots(base, snapshot)
+    await entry.insert()
+    log_debug(
+        logger,
+        "history revision recorded",
+        document_id=document_id,
+        revision=revision,
+        kind=entry.kind,
+    )
+    return entry
+
+
+async def rebuild_revision(document_id: str, revision: int) -> dict[str, Any]:
+    """Rebuild the document snapshot as of ``revision``.
+
+    Loads the nearest keyframe at or before the revision plus the deltas after
+    it (two queries, at most ``KEYFRAME_INTERVAL - 1`` patches to replay).
+    """
+    keyframe = await (
+        DocumentHistory.find(
+            DocumentHistory.document_id == document_id,
+            {"revision": {"$lte": revision}, "kind": {"$ne": "delta"}},
+        )
+        .sort("-revision")
+        .first_or_none()
+    )
+    if keyframe is None:
+        raise DocumentRevisionNotFoundError(
+            f"Revision {revision} of document '{document_id}' not found"
+        )
+
+    deltas = await (
+        DocumentHistory.find(
+            DocumentHistory.document_id == document_id,
+            {"revision": {"$gt": keyframe.revision, "$lte": revision}, "kind": "delta"},
+        )
+        .sort("revision")
+        .to_list()
+    )
+    target = deltas[-1] if deltas else keyframe
+    if target.revision != revision:
+        raise DocumentRevisionNotFoundError(
+            f"Revision {revision} of document '{document_id}' not found"
+        )
+
+    expected = list(range(keyframe.revision + 1, revision + 1))
+    if [delta.revision for delta in deltas] != expected:
+        raise DocumentHistoryCorruptedError(
+            f"Revision {revision} of document '{document_id}' cannot be rebuilt: "
+            f"deltas after keyframe {keyframe.revision} are incomplete"
+        )
+
+    snapshot = dict(keyframe.snapshot)
+    for delta in deltas:
+        snapshot = apply_patch(snapshot, delta.patch or {})
+    return {
+        "document_id": document_id,
+        "revision": target.revision,
+        "action": target.action,
+        "changes": target.changes,
+        "editor_id": target.editor_id,
+        "created_at": target.created_at,
+        "snapshot": snapshot,
+    }
+
+
+async def purge_history(document_ids: list[str]) -> None:
+    """Remove revisions and head rows for the provided document ids."""
+    await DocumentHistory.find(In(DocumentHistory.document_id, document_ids)).delete()
+    await DocumentHistoryHead.find(In(DocumentHistoryHead.document_id, document_ids)).delete()
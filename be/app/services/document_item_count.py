@@ -0,0 +1,149 @@
+"""Folder ``item_count`` maintenance.
+
+Counts are adjusted with atomic ``$inc`` updates whenever a child is created,
+moved or deleted, so writes never re-count a folder or rewrite it whole. A
+background reconciler periodically recomputes every folder's count with one
+aggregation and fixes drift in a single bulk write. Only the worker holding the
+reconciler's job lease runs a pass.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from pymongo import UpdateOne
+
+from app.db.job_leases import try_acquire
+from app.logging_utils import get_logger, log_debug, log_error, log_info
+from app.models.document import DocumentItem
+from constants import DOCUMENT_ITEM_COUNT_RECONCILE_SECONDS
+
+logger = get_logger(__name__)
+
+
+async def adjust_item_count(folder_id: str | None, delta: int) -> None:
+    """Atomically add ``delta`` to the folder's counter (a missing counter counts as 0)."""
+    if not folder_id or not delta:
+        return
+    await DocumentItem.get_pymongo_collection().update_one(
+        {"id": folder_id, "is_deleted": False},
+        [
+            {
+                "$set": {
+                    "item_count": {"$add": [{"$ifNull": ["$item_count", 0]}, delta]},
+                    "updated_at": "$$NOW",
+                }
+            }
+        ],
+    )
+
+
+async def get_stored_item_count(folder_id: str) -> int:
+    """Read the folder's counter, initialising it once for folders that predate it."""
+    collection = DocumentItem.get_pymongo_collection()
+    folder = await collection.find_one(
+        {"id": folder_id, "is_deleted": False},
+        {"item_count": 1},
+    )
+    if folder is None:
+        return 0
+    if folder.get("item_count") is not None:
+        return folder["item_count"]
+
+    count = await collection.count_documents({"parent_id": folder_id, "is_deleted": False})
+    await collection.update_one(
+        {"_id": folder["_id"], "item_count": None},
+        {"$set": {"item_count": count}},
+    )
+    return count
+
+
+def _drift_pipeline() -> list[dict[str, Any]]:
+    """Folders whose stored counter differs from their number of active children."""
+    return [
+        {"$match": {"type": "folder", "is_deleted": False}},
+        {
+            "$lookup": {
+                "from": DocumentItem.get_collection_name(),
+                "localField": "id",
+                "foreignField": "parent_id",
+                "pipeline": [{"$match": {"is_deleted": False}}, {"$count": "total"}],
+                "as": "children",
+            }
+        },
+        {
+            "$project": {
+                "item_count": 1,
+                "actual": {"$ifNull": [{"$first": "$children.total"}, 0]},
+            }
+        },
+        {"$match": {"$expr": {"$ne": ["$item_count", "$actual"]}}},
+    ]
+
+
+async def reconcile_item_counts() -> int:
+    """Recompute all folder counters and fix the ones that drifted; returns how many.
+
+    Each fix only applies while the counter still holds the value that was read,
+    so an ``adjust_item_count`` landing in between is kept and the folder is
+    rechecked on the next pass.
+    """
+    drifted = await DocumentItem.aggregate(_drift_pipeline()).to_list()
+    fixed = 0
+    if drifted:
+        result = await DocumentItem.get_pymongo_collection().bulk_write(
+            [
+                UpdateOne(
+                    {"_id": row["_id"], "item_count": row.get("item_count")},
+                    {"$set": {"item_count": row["actual"]}},
+                )
+                for row in drifted
+            ],
+            ordered=False,
+        )
+        fixed = result.modified_count
+    log_info(logger, "folder item counts reconciled", drifted=len(drifted), fixed=fixed)
+    return fixed
+
+
+class ItemCountReconciler:
+    """Runs ``reconcile_item_counts`` every ``interval`` seconds in the background.
+
+    Every worker runs the loop, but a pass only proceeds on the worker that holds
+    the ``document_item_count`` lease.
+    """
+
+    lease_name = "document_item_count"
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self.task is not None or self.interval <= 0:
+            return
+        self.task = asyncio.create_task(self._run_loop())
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _run_loop(self) -> None:
+        while True:
+            try:
+                database = DocumentItem.get_pymongo_collection().database
+                # Twice the interval, so a live holder renews before another worker may take over
+                if await try_acquire(database, self.lease_name, self.interval * 2):
+                    await reconcile_item_counts()
+                else:
+                    log_debug(logger, "folder item count reconciliation skipped", reason="lease")
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                log_error(logger, "folder item count reconciliation failed", error=str(exc))
+            await asyncio.sleep(self.interval)
+
+
+item_count_reconciler = ItemCountReconciler(DOCUMENT_ITEM_COUNT_RECONCILE_SECONDS)
@@ -2,16 +2,35 @@
 
 from __future__ import annotations
 
-from typing import Any, Literal, Optional
+from datetime import UTC, datetime
+from typing import Any, Literal, Optional, TypeVar
 
-from beanie import PydanticObjectId
+from beanie.operators import In
+from pymongo import UpdateOne
 
 from app.logging_utils import get_logger, log_debug, log_info, log_warning
-from app.models.document import DivisionPermission, DocumentItem, DocumentPermission
+from app.models.document import (
+    DivisionPermission,
+    DocumentItem,
+    DocumentPermission,
+    DocumentSummary,
+)
 from app.models.user import User
+from app.schemas.document_permission import PermissionOperation
 from app.services.document import DocumentNotFoundError, get_document_by_id
+from app.services.document_acl import inherited_level, propagate_grants
+from app.services.document_share_roots import (
+    division_grantee,
+    refresh_share_roots,
+    user_grantee,
+    user_grantees,
+)
+from app.services.identity import ADMIN_TITLES, Identity, resolve_user
 
 PermissionLevel = Literal["viewer", "editor"]
+# Access checks only read metadata and ACL fields, so listing projections work too
+AccessSubject = DocumentItem | DocumentSummary
+_SubjectT = TypeVar("_SubjectT", DocumentItem, DocumentSummary)
 
 
 class DocumentPermissionError(Exception):
@@ -35,7 +54,7 @@ def _has_required_permission(user_permission: str, required_permission: str) ->
     return False
 
 
-def _get_user_permission(document: DocumentItem, user_id: str) -> Optional[str]:
+def _get_user_permission(document: AccessSubject, user_id: str) -> Optional[str]:
     """Get individual user permission from document."""
     for perm in document.user_permissions:
         if perm.user_id == user_id:
@@ -43,7 +62,7 @@ def _get_user_permission(document: DocumentItem, user_id: str) -> Optional[str]:
     return None
 
 
-def _get_user_permission_with_fallback(document: DocumentItem, user: User) -> Optional[str]:
+def _get_user_permission_with_fallback(document: AccessSubject, user: User) -> Optional[str]:
     """Get individual user permission from document, checking both employee_id and document id."""
     # First try with employee_id if available
     if user.employee_id:
@@ -56,7 +75,40 @@ def _get_user_permission_with_fallback(document: DocumentItem, user: User) -> Op
     return _get_user_permission(document, doc_id_str)
 
 
-def _get_division_permission(document: DocumentItem, division: Optional[str]) -> Optional[str]:
+def _user_identifiers(user: User) -> list[str]:
+    """Identifiers a document may reference the user by (ObjectId string and employee_id)."""
+    return Identity.from_user(user).identifiers
+
+
+def _granting_levels(required: PermissionLevel) -> list[str]:
+    """Stored permission values that satisfy ``required``."""
+    return ["editor"] if required == "editor" else ["viewer", "editor"]
+
+
+def _direct_grant_clauses(user: User, required: PermissionLevel) -> list[dict[str, Any]]:
+    """Mongo clauses mirroring ``_has_direct_access`` for a non-admin user."""
+    identifiers = _user_identifiers(user)
+    levels = _granting_levels(required)
+    clauses: list[dict[str, Any]] = [
+        {"owned_by.id": {"$in": identifiers}},
+        {
+            "user_permissions": {
+                "$elemMatch": {"user_id": {"$in": identifiers}, "permission": {"$in": levels}}
+            }
+        },
+    ]
+    if user.division:
+        clauses.append(
+            {
+                "division_permissions": {
+                    "$elemMatch": {"division": user.division, "permission": {"$in": levels}}
+                }
+            }
+        )
+    return clauses
+
+
+def _get_division_permission(document: AccessSubject, division: Optional[str]) -> Optional[str]:
     """Get division permission from document."""
     if not division:
         return None
@@ -67,21 +119,8 @@ def _get_division_permission(document: DocumentItem, division: Optional[str]) ->
 
 
 async def _resolve_user(identifier: str) -> User | None:
-    """Resolve User by employee_id or document id."""
-    if not identifier:
-        return None
-    user = await User.find_one(User.employee_id == identifier)
-    if user:
-        return user
-    try:
-        oid = PydanticObjectId(identifier)
-    except Exception:
-        oid = None
-    if oid:
-        user = await User.get(oid)
-        if user:
-            return user
-    return None
+    """Resolve User by employee_id or document id (cached for the current request)."""
+    return await resolve_user(identifier)
 
 
 def _is_admin(user: User | None) -> bool:
@@ -91,13 +130,13 @@ def _is_admin(user: User | None) -> bool:
     
     # Check title field for system admin roles
     title = (user.title or "").strip()
-    is_admin = title in ["System Administrator"]
+    is_admin = title in ADMIN_TITLES
     if is_admin:
         log_info(logger, "granting admin override (title)", user_id=user.employee_id, title=title)
     return is_admin
 
 
-async def _has_direct_access(document: DocumentItem, user: User, required: PermissionLevel) -> bool:
+async def _has_direct_access(document: AccessSubject, user: User, required: PermissionLevel) -> bool:
     # Owner has full access - check both employee_id and document id
     owner_id = document.owned_by.id
     if owner_id == user.employee_id or owner_id == str(user.id):
@@ -119,27 +158,78 @@ async def _has_direct_access(document: DocumentItem, user: User, required: Permi
     return False
 
 
-async def _has_inherited_access(document: DocumentItem, user: User, required: PermissionLevel) -> bool:
+async def _has_inherited_access(document: AccessSubject, user: User, required: PermissionLevel) -> bool:
     if _is_admin(user):
         return True
-
-    walker = document
-    while walker.parent_id:
-        parent = await DocumentItem.find_one(
-            DocumentItem.document_id == walker.parent_id,
-            {"is_deleted": False},
-        )
-        if parent is None:
-            break
-        if parent.type == "folder" and await _has_direct_access(parent, user, required):
-            return True
-        walker = parent
-    return False
+    # Ancestor grants are materialized on the document, so no parent walk is needed
+    level = inherited_level(document, user_grantees(user))
+    return bool(level and _has_required_permission(level, required))
 
 
 # ---------- public API ----------
 
 
+async def filter_accessible(
+    documents: list[_SubjectT],
+    user: User | None,
+    required_permission: PermissionLevel = "viewer",
+) -> list[_SubjectT]:
+    """Return the subset of ``documents`` the user can access (direct or inherited).
+
+    Batch counterpart of ``check_document_access``; inherited grants are stored
+    on each document, so no extra queries are made.
+    """
+    if not user or not user.is_active:
+        return []
+    if _is_admin(user):
+        return list(documents)
+
+    accessible = [
+        doc
+        for doc in documents
+        if await _has_direct_access(doc, user, required_permission)
+        or await _has_inherited_access(doc, user, required_permission)
+    ]
+    log_debug(
+        logger,
+        "batch access filter",
+        user_id=user.employee_id,
+        required_permission=required_permission,
+        candidates=len(documents),
+        accessible=len(accessible),
+    )
+    return accessible
+
+
+async def build_access_predicate(
+    user: User | None,
+    required_permission: PermissionLevel = "viewer",
+) -> dict[str, Any] | None:
+    """Express the user's grants as a Mongo filter over ``documents``.
+
+    Matches documents granted directly (owner, user or division permission) or
+    inheriting a grant from an ancestor folder. Returns ``None`` for admins, who
+    are not restricted, and a never-matching filter for unknown or inactive users.
+    """
+    if not user or not user.is_active:
+        return {"_id": {"$exists": False}}
+    if _is_admin(user):
+        return None
+
+    clauses = _direct_grant_clauses(user, required_permission)
+    clauses.append(
+        {
+            "inherited_grants": {
+                "$elemMatch": {
+                    "grantee": {"$in": user_grantees(user)},
+                    "level": {"$in": _granting_levels(required_permission)},
+                }
+            }
+        }
+    )
+    return {"$or": clauses}
+
+
 async def has_direct_document_access(
     document_id: str,
     user_id: str,
@@ -210,11 +300,39 @@ async def check_document_access(
         user_id=user_id,
         required_permission=required_permission,
     )
-    if await has_direct_document_access(document_id, user_id, required_permission):
-        return True
-    if await has_ancestor_folder_access(document_id, user_id, required_permission):
+    try:
+        document = await get_document_by_id(document_id)
+    except DocumentNotFoundError:
+        log_warning(logger, "access check failed: document not found", document_id=document_id, user_id=user_id)
+        return False
+    user = await _resolve_user(user_id)
+    if not user or not user.is_active:
+        log_warning(logger, "access denied: user not found or inactive", user_id=user_id, document_id=document_id)
+        return False
+    # Both checks read the loaded document only (inherited grants are materialized on it)
+    if await _has_direct_access(document, user, required_permission):
         return True
-    return False
+    return await _has_inherited_access(document, user, required_permission)
+
+
+def _direct_permission_level(document: AccessSubject, user: User) -> str | None:
+    """Direct level of ``user`` on ``document``: owner, then user grant, then division grant."""
+    # Owner always has editor access - check both employee_id and document id
+    owner_id = document.owned_by.id
+    if owner_id == user.employee_id or owner_id == str(user.id):
+        return "editor"
+
+    # Check individual user permissions first (higher priority) - use fallback
+    user_permission = _get_user_permission_with_fallback(document, user)
+    if user_permission:
+        return user_permission
+
+    # Check division permissions
+    division_permission = _get_division_permission(document, user.division)
+    if division_permission:
+        return division_permission
+
+    return None
 
 
 async def get_user_document_permission(document_id: str, user_id: str) -> str | None:
@@ -230,25 +348,198 @@ async def get_user_document_permission(document_id: str, user_id: str) -> str |
         if not user or not user.is_active:
             return None
 
-        # Owner always has editor access - check both employee_id and document id
-        owner_id = document.owned_by.id
-        if owner_id == user.employee_id or owner_id == str(user.id):
-            return "editor"
+        return _direct_permission_level(document, user)
+
+    except DocumentNotFoundError:
+        return None
+
 
-        # Check individual user permissions first (higher priority) - use fallback
-        user_permission = _get_user_permission_with_fallback(document, user)
-        if user_permission:
-            return user_permission
+def _operation_result(
+    index: int, operation: PermissionOperation, status: str, detail: str | None = None
+) -> dict[str, Any]:
+    return {
+        "index": index,
+        "document_id": operation.document_id,
+        "action": operation.action,
+        "status": status,
+        "detail": detail,
+    }
 
-        # Check division permissions
-        division_permission = _get_division_permission(document, user.division)
-        if division_permission:
-            return division_permission
 
+def _stage_user_operation(
+    document: DocumentSummary, operation: PermissionOperation, touched: dict[str, Any]
+) -> UpdateOne | None:
+    """Apply ``operation`` to the in-memory document and return its write (None if a no-op)."""
+    user_id = operation.user_id
+    existing = next((perm for perm in document.user_permissions if perm.user_id == user_id), None)
+    if operation.action == "revoke":
+        if existing is None:
+            return None
+        document.user_permissions.remove(existing)
+        return UpdateOne(
+            {"_id": document.object_id},
+            {"$pull": {"user_permissions": {"user_id": user_id}}, "$set": touched},
+        )
+
+    granted = DocumentPermission(
+        user_id=user_id,  # type: ignore[arg-type]
+        user_name=operation.user_name,  # type: ignore[arg-type]
+        user_email=operation.user_email,  # type: ignore[arg-type]
+        permission=operation.permission,  # type: ignore[arg-type]
+    )
+    if existing == granted:
         return None
+    if existing is None:
+        document.user_permissions.append(granted)
+        # The guard keeps a concurrent grant for the same user from producing a duplicate
+        return UpdateOne(
+            {"_id": document.object_id, "user_permissions.user_id": {"$ne": user_id}},
+            {"$push": {"user_permissions": granted.model_dump()}, "$set": touched},
+        )
+    document.user_permissions[document.user_permissions.index(existing)] = granted
+    return UpdateOne(
+        {"_id": document.object_id},
+        {
+            "$set": {
+                "user_permissions.$[perm].permission": granted.permission,
+                "user_permissions.$[perm].user_name": granted.user_name,
+                "user_permissions.$[perm].user_email": granted.user_email,
+                **touched,
+            }
+        },
+        array_filters=[{"perm.user_id": user_id}],
+    )
 
-    except DocumentNotFoundError:
+
+def _stage_division_operation(
+    document: DocumentSummary, operation: PermissionOperation, touched: dict[str, Any]
+) -> UpdateOne | None:
+    """Division counterpart of ``_stage_user_operation``."""
+    division = operation.division
+    existing = next(
+        (perm for perm in document.division_permissions if perm.division == division), None
+    )
+    if operation.action == "revoke":
+        if existing is None:
+            return None
+        document.division_permissions.remove(existing)
+        return UpdateOne(
+            {"_id": document.object_id},
+            {"$pull": {"division_permissions": {"division": division}}, "$set": touched},
+        )
+
+    if existing is not None and existing.permission == operation.permission:
         return None
+    if existing is None:
+        granted = DivisionPermission(division=division, permission=operation.permission)  # type: ignore[arg-type]
+        document.division_permissions.append(granted)
+        return UpdateOne(
+            {"_id": document.object_id, "division_permissions.division": {"$ne": division}},
+            {"$push": {"division_permissions": granted.model_dump()}, "$set": touched},
+        )
+    existing.permission = operation.permission  # type: ignore[assignment]
+    return UpdateOne(
+        {"_id": document.object_id},
+        {"$set": {"division_permissions.$[perm].permission": operation.permission, **touched}},
+        array_filters=[{"perm.division": division}],
+    )
+
+
+async def apply_permission_operations(
+    operations: list[PermissionOperation],
+    actor_id: str | None = None,
+) -> list[dict[str, Any]]:
+    """Apply grant/revoke operations across documents with a single bulk write.
+
+    Target documents are loaded with one query and each operation is staged
+    against them in request order, so only real changes are written (as
+    ``$push``/``$pull`` or array-filtered ``$set`` updates in one ordered
+    ``bulk_write``). When ``actor_id`` is given (callers pass ``None`` for admins),
+    operations on documents that user does not own or directly edit are reported
+    as forbidden, exactly as the single-permission endpoints decide.
+    Changed folders then propagate the affected grantees to their subtrees.
+    """
+    document_ids = list({operation.document_id for operation in operations})
+    by_id: dict[str, DocumentSummary] = {}
+    for document in await DocumentItem.find(
+        In(DocumentItem.document_id, document_ids),
+        {"is_deleted": False},
+        projection_model=DocumentSummary,
+    ).to_list():
+        by_id.setdefault(document.document_id, document)
+
+    actor = await _resolve_user(actor_id) if actor_id is not None else None
+    now = datetime.now(UTC)
+    touched = {"updated_at": now, "last_modified": now}
+    manageable: dict[str, bool] = {}
+    changed: dict[str, set[str]] = {}
+    writes: list[UpdateOne] = []
+    results: list[dict[str, Any]] = []
+    for index, operation in enumerate(operations):
+        document = by_id.get(operation.document_id)
+        if document is None:
+            results.append(
+                _operation_result(
+                    index, operation, "not_found", f"Document '{operation.document_id}' not found"
+                )
+            )
+            continue
+        if actor_id is not None:
+            allowed = manageable.get(document.document_id)
+            if allowed is None:
+                # Direct access only: inherited editors cannot manage permissions
+                allowed = (
+                    actor is not None
+                    and actor.is_active
+                    and _direct_permission_level(document, actor) == "editor"
+                )
+                manageable[document.document_id] = allowed
+            if not allowed:
+                results.append(
+                    _operation_result(
+                        index,
+                        operation,
+                        "forbidden",
+                        "Only document owners and editors can manage permissions",
+                    )
+                )
+                continue
+
+        if operation.user_id is not None:
+            write = _stage_user_operation(document, operation, touched)
+            grantee = user_grantee(operation.user_id)
+        else:
+            write = _stage_division_operation(document, operation, touched)
+            grantee = division_grantee(operation.division)  # type: ignore[arg-type]
+        if write is None:
+            results.append(_operation_result(index, operation, "unchanged"))
+            continue
+        writes.append(write)
+        changed.setdefault(document.document_id, set()).add(grantee)
+        results.append(_operation_result(index, operation, "applied"))
+
+    if writes:
+        # Ordered so several operations on the same document apply in request order
+        await DocumentItem.get_pymongo_collection().bulk_write(writes, ordered=True)
+    for document_id, grantees in changed.items():
+        document = by_id[document_id]
+        await propagate_grants(document, grantees)
+        await refresh_share_roots(document, grantees)
+
+    log_info(
+        logger,
+        "permission operations applied",
+        operations=len(operations),
+        writes=len(writes),
+        documents=len(changed),
+    )
+    return results
+
+
+async def _apply_single_operation(operation: PermissionOperation) -> None:
+    [result] = await apply_permission_operations([operation])
+    if result["status"] == "not_found":
+        raise DocumentNotFoundError(result["detail"])
 
 
 async def add_user_permission(
@@ -259,16 +550,10 @@ async def add_user_permission(
     permission: Literal["viewer", "editor"],
 ) -> None:
     """Add or update individual user permission for a document."""
-    document = await get_document_by_id(document_id)
-
-    # Remove existing permission for this user
-    document.user_permissions = [
-        perm for perm in document.user_permissions if perm.user_id != user_id
-    ]
-
-    # Add new permission
-    document.user_permissions.append(
-        DocumentPermission(
+    await _apply_single_operation(
+        PermissionOperation(
+            action="grant",
+            document_id=document_id,
             user_id=user_id,
             user_name=user_name,
             user_email=user_email,
@@ -276,48 +561,30 @@ async def add_user_permission(
         )
     )
 
-    await document.touch()
-
 
 async def add_division_permission(
     document_id: str, division: str, permission: Literal["viewer", "editor"]
 ) -> None:
     """Add or update division permission for a document."""
-    document = await get_document_by_id(document_id)
-
-    # Remove existing permission for this division
-    document.division_permissions = [
-        perm for perm in document.division_permissions if perm.division != division
-    ]
-
-    # Add new permission
-    document.division_permissions.append(
-        DivisionPermission(division=division, permission=permission)
+    await _apply_single_operation(
+        PermissionOperation(
+            action="grant", document_id=document_id, division=division, permission=permission
+        )
     )
 
-    await document.touch()
-
 
 async def remove_user_permission(document_id: str, user_id: str) -> None:
     """Remove individual user permission from a document."""
-    document = await get_document_by_id(document_id)
-
-    document.user_permissions = [
-        perm for perm in document.user_permissions if perm.user_id != user_id
-    ]
-
-    await document.touch()
+    await _apply_single_operation(
+        PermissionOperation(action="revoke", document_id=document_id, user_id=user_id)
+    )
 
 
 async def remove_division_permission(document_id: str, division: str) -> None:
     """Remove division permission from a document."""
-    document = await get_document_by_id(document_id)
-
-    document.division_permissions = [
-        perm for perm in document.division_permissions if perm.division != division
-    ]
-
-    await document.touch()
+    await _apply_single_operation(
+        PermissionOperation(action="revoke", document_id=document_id, division=division)
+    )
 
 
 async def get_document_permissions(document_id: str) -> dict[str, Any]:
@@ -355,6 +622,8 @@ async def get_document_access_summary(document_id: str, user_id: str) -> dict[st
         log_info(logger, "access summary resolved (admin)", document_id=document_id, user_id=user.employee_id, summary=summary)
         return summary
 
+    # All four flags come from the document read above: direct grants and the
+    # materialized inherited grants live on it
     view_direct = await _has_direct_access(document, user, "viewer")
     view_inherited = await _has_inherited_access(document, user, "viewer")
     detail["viewer"]["direct"] = view_direct
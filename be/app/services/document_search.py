@@ -0,0 +1,222 @@
+"""Document full-text search service.
+
+Each document stores an inverted-index style ``search_terms`` array (distinct
+lower-cased tokens from its name, category and HTML-stripped content) alongside
+the flattened ``content_text``. The multikey index on ``search_terms`` answers
+exact and prefix term lookups, so queries no longer scan the collection.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from beanie import PydanticObjectId
+
+from app.logging_utils import get_logger, log_debug
+from app.models.document import DocumentItem
+from app.utils.block_to_html import migrate_blocks_to_html
+from app.utils.html_to_text import html_to_text
+
+logger = get_logger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+_MAX_TERM_LENGTH = 64
+_MAX_SEARCH_TERMS = 5000
+_SNIPPET_RADIUS = 80
+
+# Per-term score weights; every hit already matched all terms through the index
+_NAME_WEIGHT = 3
+_CATEGORY_WEIGHT = 2
+_EXACT_NAME_BONUS = 5
+
+
+@dataclass(slots=True)
+class SearchHit:
+    object_id: PydanticObjectId
+    document_id: str
+    name: str
+    score: int
+    last_modified: datetime
+    snippet: str | None = None
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Split text into lower-cased word tokens."""
+    if not text:
+        return []
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if len(token) <= _MAX_TERM_LENGTH
+    ]
+
+
+def document_plain_text(document: DocumentItem) -> str:
+    """Plain text body of a document, falling back to legacy blocks."""
+    if document.content_html:
+        return html_to_text(document.content_html)
+    if document.content:
+        return html_to_text(migrate_blocks_to_html(document.content))
+    return ""
+
+
+def build_search_terms(*texts: str | None) -> list[str]:
+    """Distinct tokens of ``texts`` in first-seen order, capped per document."""
+    terms: dict[str, None] = {}
+    for text in texts:
+        for token in tokenize(text):
+            terms.setdefault(token, None)
+            if len(terms) >= _MAX_SEARCH_TERMS:
+                return list(terms)
+    return list(terms)
+
+
+def apply_search_fields(document: DocumentItem) -> None:
+    """Refresh ``content_text``/``search_terms`` from the document's current fields."""
+    document.content_text = document_plain_text(document)
+    document.search_terms = build_search_terms(
+        document.name, document.category, document.content_text
+    )
+
+
+def build_snippet(text: str | None, terms: list[str]) -> str | None:
+    """Return a short excerpt around the earliest term occurrence in ``text``."""
+    if not text or not terms:
+        return None
+    lowered = text.lower()
+    positions = [pos for pos in (lowered.find(term) for term in terms) if pos >= 0]
+    if not positions:
+        return None
+    start = max(min(positions) - _SNIPPET_RADIUS, 0)
+    end = min(min(positions) + _SNIPPET_RADIUS, len(text))
+    snippet = text[start:end].strip()
+    if start > 0:
+        snippet = f"…{snippet}"
+    if end < len(text):
+        snippet = f"{snippet}…"
+    return snippet
+
+
+def _encode_cursor(hit: SearchHit) -> str:
+    payload = {"s": hit.score, "t": hit.last_modified.isoformat(), "id": str(hit.object_id)}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[int, datetime, PydanticObjectId]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (
+            int(payload["s"]),
+            datetime.fromisoformat(payload["t"]),
+            PydanticObjectId(payload["id"]),
+        )
+    except Exception as exc:
+        raise ValueError("Invalid search cursor") from exc
+
+
+def _term_match(terms: list[str]) -> dict[str, Any]:
+    """All terms must be present; the last one may be a prefix (search-as-you-type)."""
+    *complete, partial = terms
+    clauses: list[dict[str, Any]] = [
+        {"search_terms": {"$regex": f"^{re.escape(partial)}"}},
+    ]
+    if complete:
+        clauses.insert(0, {"search_terms": {"$all": complete}})
+    return {"$and": clauses}
+
+
+def _score_expression(terms: list[str], query_text: str) -> dict[str, Any]:
+    name = {"$toLower": {"$ifNull": ["$name", ""]}}
+    category = {"$toLower": {"$ifNull": ["$category", ""]}}
+    parts: list[dict[str, Any]] = [
+        {"$cond": [{"$eq": [name, query_text.strip().lower()]}, _EXACT_NAME_BONUS, 0]},
+    ]
+    for term in terms:
+        parts.append({"$cond": [{"$gte": [{"$indexOfCP": [name, term]}, 0]}, _NAME_WEIGHT, 0]})
+        parts.append(
+            {"$cond": [{"$gte": [{"$indexOfCP": [category, term]}, 0]}, _CATEGORY_WEIGHT, 0]}
+        )
+    return {"$add": parts}
+
+
+async def search(
+    query_text: str,
+    filters: list[dict[str, Any]] | None = None,
+    *,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> tuple[list[SearchHit], str | None]:
+    """Ranked term/prefix search over documents.
+
+    Hits are ordered by score, then most recently modified. ``filters`` are extra
+    Mongo predicates (liveness, access, owner, ...) ANDed with the term match.
+    Pages are addressed by ``offset`` or by the keyset ``cursor`` of the previous
+    page; the returned cursor is ``None`` on the last page.
+    """
+    terms = list(dict.fromkeys(tokenize(query_text)))
+    if not terms:
+        return [], None
+
+    pipeline: list[dict[str, Any]] = [
+        {"$match": {"$and": [_term_match(terms), *(filters or [])]}},
+        {"$addFields": {"_score": _score_expression(terms, query_text)}},
+    ]
+    if cursor:
+        score, last_modified, last_id = _decode_cursor(cursor)
+        pipeline.append(
+            {
+                "$match": {
+                    "$or": [
+                        {"_score": {"$lt": score}},
+                        {"_score": score, "last_modified": {"$lt": last_modified}},
+                        {"_score": score, "last_modified": last_modified, "_id": {"$lt": last_id}},
+                    ]
+                }
+            }
+        )
+    pipeline.append({"$sort": {"_score": -1, "last_modified": -1, "_id": -1}})
+    if offset and not cursor:
+        pipeline.append({"$skip": offset})
+    # One extra row tells us whether another page exists
+    pipeline.append({"$limit": limit + 1})
+    pipeline.append(
+        {
+            "$project": {
+                "_id": 1,
+                "id": 1,
+                "name": 1,
+                "last_modified": 1,
+                "_score": 1,
+                "content_text": 1,
+            }
+        }
+    )
+
+    rows = await DocumentItem.aggregate(pipeline).to_list()
+    hits = [
+        SearchHit(
+            object_id=row["_id"],
+            document_id=row.get("id", ""),
+            name=row.get("name", ""),
+            score=row.get("_score", 0),
+            last_modified=row["last_modified"],
+            snippet=build_snippet(row.get("content_text"), terms),
+        )
+        for row in rows[:limit]
+    ]
+    next_cursor = _encode_cursor(hits[-1]) if len(rows) > limit else None
+    log_debug(
+        logger,
+        "document search",
+        query=query_text,
+        terms=len(terms),
+        returned=len(hits),
+        has_more=next_cursor is not None,
+    )
+    return hits, next_cursor
@@ -0,0 +1,203 @@
+"""Share-roots index for the "shared with me" root listing.
+
+For every grantee (``"user:<id>"`` or ``"division:<name>"``) the
+``document_share_roots`` collection lists the topmost documents granted to it
+directly, i.e. owned by it or carrying one of its user/division permissions with
+no ancestor folder granted to it as well. The root view of a non-admin user is
+then a single indexed lookup over the user's grantee keys.
+
+Rows are recomputed per subtree: permission changes refresh the rows of one
+grantee under the changed document, moves refresh every grantee under the moved
+subtree and deletes drop the subtree's rows.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pymongo import UpdateOne
+
+from app.logging_utils import get_logger, log_debug
+from app.models.document import DocumentItem, DocumentShareRoot, DocumentSummary
+from app.models.user import User
+
+logger = get_logger(__name__)
+
+
+def user_grantee(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def division_grantee(division: str) -> str:
+    return f"division:{division}"
+
+
+def document_grantees(document: DocumentItem | DocumentSummary) -> set[str]:
+    """Grantee keys with direct access to ``document``."""
+    grantees = {user_grantee(document.owned_by.id)}
+    grantees.update(user_grantee(perm.user_id) for perm in document.user_permissions)
+    grantees.update(division_grantee(perm.division) for perm in document.division_permissions)
+    return grantees
+
+
+def user_grantees(user: User) -> list[str]:
+    """Grantee keys a user is reachable by (ObjectId, employee_id and division)."""
+    grantees = [user_grantee(str(user.id))]
+    if user.employee_id:
+        grantees.append(user_grantee(user.employee_id))
+    if user.division:
+        grantees.append(division_grantee(user.division))
+    return grantees
+
+
+def _grantee_clause(grantee: str) -> dict[str, Any]:
+    kind, _, value = grantee.partition(":")
+    if kind == "division":
+        return {"division_permissions.division": value}
+    return {"$or": [{"owned_by.id": value}, {"user_permissions.user_id": value}]}
+
+
+def _object_id(document: DocumentItem | DocumentSummary) -> PydanticObjectId | None:
+    if isinstance(document, DocumentSummary):
+        return document.object_id
+    return document.id
+
+
+def _subtree_filter(
+    anchor: DocumentItem | DocumentSummary, id_field: str, depth: int | None = None
+) -> dict[str, Any]:
+    """Match ``anchor`` and its descendants (ids are only unique per parent).
+
+    ``depth`` is where descendants store the anchor's id; it defaults to the
+    anchor's current depth and differs for rows written before a move.
+    """
+    if depth is None:
+        depth = len(anchor.ancestor_ids)
+    return {
+        "$or": [
+            {id_field: _object_id(anchor)},
+            {"ancestor_ids": anchor.document_id, f"ancestor_ids.{depth}": anchor.document_id},
+        ]
+    }
+
+
+def _node_key(document: DocumentItem | DocumentSummary | DocumentShareRoot) -> tuple[str, ...]:
+    return (*document.ancestor_ids, document.document_id)
+
+
+def _has_granted_ancestor(key: tuple[str, ...], granted: set[tuple[str, ...]]) -> bool:
+    return any(key[:length] in granted for length in range(1, len(key)))
+
+
+async def _covered_above(
+    anchor: DocumentItem | DocumentSummary, grantees: Iterable[str]
+) -> set[str]:
+    """Grantees that already reach ``anchor`` through a row on one of its ancestors."""
+    if not anchor.ancestor_ids:
+        return set()
+    rows = await DocumentShareRoot.find(
+        In(DocumentShareRoot.grantee, list(grantees)),
+        In(DocumentShareRoot.document_id, anchor.ancestor_ids),
+    ).to_list()
+    anchor_key = _node_key(anchor)
+    return {row.grantee for row in rows if anchor_key[: len(_node_key(row))] == _node_key(row)}
+
+
+async def refresh_share_roots(
+    anchor: DocumentItem | DocumentSummary,
+    grantees: Iterable[str] | None = None,
+    *,
+    previous_depth: int | None = None,
+) -> None:
+    """Recompute the rows of ``grantees`` (default: everyone involved) under ``anchor``.
+
+    Pass ``previous_depth`` after a move so rows stored at the old location are replaced.
+    """
+    grantee_list = list(grantees) if grantees is not None else None
+
+    document_filter: dict[str, Any] = {**_subtree_filter(anchor, "_id"), "is_deleted": False}
+    row_filter = _subtree_filter(anchor, "document_object_id", previous_depth)
+    if grantee_list is not None:
+        document_filter = {
+            "$and": [document_filter, {"$or": [_grantee_clause(g) for g in grantee_list]}]
+        }
+        row_filter = {**row_filter, "grantee": {"$in": grantee_list}}
+
+    documents = await DocumentItem.find(document_filter, projection_model=DocumentSummary).to_list()
+    existing = DocumentShareRoot.find(row_filter)
+    if grantee_list is None:
+        involved: set[str] = set(await existing.distinct("grantee"))
+        for document in documents:
+            involved |= document_grantees(document)
+    else:
+        involved = set(grantee_list)
+    covered = await _covered_above(anchor, involved) if involved else set()
+
+    # Shallowest first so a document is only kept when no granted ancestor precedes it
+    documents.sort(key=lambda document: len(document.ancestor_ids))
+    granted: dict[str, set[tuple[str, ...]]] = {}
+    rows: list[UpdateOne] = []
+    kept: list[dict[str, Any]] = []
+    for document in documents:
+        key = _node_key(document)
+        for grantee in document_grantees(document) & (involved - covered):
+            seen = granted.setdefault(grantee, set())
+            if not _has_granted_ancestor(key, seen):
+                row_key = {"grantee": grantee, "document_object_id": document.object_id}
+                kept.append(row_key)
+                rows.append(
+                    UpdateOne(
+                        row_key,
+                        {
+                            "$set": {
+                                "document_id": document.document_id,
+                                "parent_id": document.parent_id,
+                                "ancestor_ids": document.ancestor_ids,
+                            }
+                        },
+                        upsert=True,
+                    )
+                )
+            seen.add(key)
+
+    # Upserts keyed on the unique (grantee, document_object_id) pair, then removal of
+    # the rows not kept, so concurrent refreshes never insert the same row twice
+    if rows:
+        await DocumentShareRoot.get_pymongo_collection().bulk_write(rows, ordered=False)
+    await DocumentShareRoot.find({**row_filter, "$nor": kept} if kept else row_filter).delete()
+    log_debug(
+        logger,
+        "share roots refreshed",
+        document_id=anchor.document_id,
+        grantees=len(involved),
+        rows=len(rows),
+    )
+
+
+async def drop_share_roots(anchor: DocumentItem | DocumentSummary) -> None:
+    """Remove the rows of ``anchor`` and its subtree (soft delete)."""
+    await DocumentShareRoot.find(_subtree_filter(anchor, "document_object_id")).delete()
+
+
+async def share_root_documents(user: User) -> list[DocumentSummary]:
+    """Topmost non-root documents shared directly with ``user`` and not inherited."""
+    rows = await DocumentShareRoot.find(
+        In(DocumentShareRoot.grantee, user_grantees(user))
+    ).to_list()
+    # A row under another of the user's rows (e.g. user grant inside a division folder) is inherited
+    keys = {_node_key(row) for row in rows}
+    wanted = {
+        row.document_object_id
+        for row in rows
+        if row.parent_id is not None and not _has_granted_ancestor(_node_key(row), keys)
+    }
+    if not wanted:
+        return []
+    return await DocumentItem.find(
+        In(DocumentItem.id, list(wanted)),
+        {"is_deleted": False},
+        projection_model=DocumentSummary,
+    ).to_list()
@@ -2,15 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from beanie.odm.utils.dump import get_dict
 from beanie.operators import In, Or
+from pymongo import InsertOne, UpdateOne
 
-from app.core.security import hash_password
+from app.core.security import hash_password_async
+from app.core.session_cache import session_cache
+from app.logging_utils import get_logger, log_info
 from app.models.enums import ALLOWED_DIVISIONS, ALLOWED_EMPLOYMENT_TYPES, ALLOWED_POSITIONS
-from app.models.user import User
-from app.schemas.employee import EmployeeUpdate
+from app.models.user import User, UserSummary, build_user_search_terms
+from app.schemas.employee import EmployeeUpdate, SpanOfControl
+from app.services import employee_search
 from app.services.email import EmailConfigurationError, send_email
+from app.services.org_graph import OrgGraph, org_graph
 from constants import APP_NAME, DEFAULT_PASSWORD
 
+logger = get_logger(__name__)
+
 
 class EmployeeAlreadyExistsError(ValueError):
     pass
@@ -24,7 +37,7 @@ class EmployeeEmailError(RuntimeError):
     pass
 
 
-def _serialize(user: User) -> dict[str, object]:
+def _serialize(user: User | UserSummary) -> dict[str, object]:
     return {
         "id": user.employee_id or str(user.id),
         "name": user.name,
@@ -41,70 +54,39 @@ def _serialize(user: User) -> dict[str, object]:
 
 
 async def list_employees_nonactive(search: str | None = None) -> list[dict[str, object]]:
-    users = [user for user in await User.find_all().to_list() if not user.is_active]
     if not search:
+        users = await User.find({"is_active": False}, projection_model=UserSummary).to_list()
         return [_serialize(user) for user in users]
-
-    needle = search.strip().lower()
-    filtered: list[dict[str, object]] = []
-    for user in users:
-        haystack = [
-            user.name,
-            user.email,
-            user.title or "",
-            user.employee_id or "",
-        ]
-        if any(needle in value.lower() for value in haystack):
-            filtered.append(_serialize(user))
-    return filtered
+    users, _ = await employee_search.search(search, active=False, limit=None)
+    return [_serialize(user) for user in users]
 
 
 async def list_employees(search: str | None = None) -> list[dict[str, object]]:
-    users = [user for user in await User.find_all().to_list() if user.is_active]
     if not search:
+        users = await User.find({"is_active": True}, projection_model=UserSummary).to_list()
         return [_serialize(user) for user in users]
-
-    needle = search.strip().lower()
-    filtered: list[dict[str, object]] = []
-    for user in users:
-        haystack = [
-            user.name,
-            user.email,
-            user.title or "",
-            user.employee_id or "",
-        ]
-        if any(needle in value.lower() for value in haystack):
-            filtered.append(_serialize(user))
-    return filtered
-
-
-async def search_employees(query: str) -> list[dict[str, object]]:
-    """Search active employees by name, email, division, or employee ID."""
-    
-    users = [user for user in await User.find_all().to_list() if user.is_active]
-    
-    if not query or not query.strip():
-        return [_serialize(user) for user in users]
-    
-    needle = query.strip().lower()
-    filtered: list[dict[str, object]] = []
-    
-    for user in users:
-        haystack = [
-            user.name,
-            user.email,
-            user.employee_id or "",
-            user.title or "",
-            user.division or "",
-            user.level or "",
-            user.position or "",
-        ]
-        
-        # Check if query matches any field
-        if any(needle in value.lower() for value in haystack if value):
-            filtered.append(_serialize(user))
-    
-    return filtered
+    users, _ = await employee_search.search(search, limit=None)
+    return [_serialize(user) for user in users]
+
+
+async def search_employees(query: str, limit: int | None = None) -> list[dict[str, object]]:
+    """Search active employees by name, email, division, or employee ID, best matches first."""
+    users, _ = await employee_search.search(query, limit=limit)
+    return [_serialize(user) for user in users]
+
+
+async def search_employees_page(
+    query: str | None,
+    *,
+    active: bool = True,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list[dict[str, object]], str | None]:
+    """One page of directory search results plus the cursor of the next page."""
+    users, next_cursor = await employee_search.search(
+        query, active=active, limit=limit, cursor=cursor
+    )
+    return [_serialize(user) for user in users], next_cursor
 
 
 async def get_employee(employee_id: str) -> dict[str, object]:
@@ -114,17 +96,47 @@ async def get_employee(employee_id: str) -> dict[str, object]:
     return _serialize(user)
 
 
-async def get_subordinates(employee_id: str) -> list[dict[str, object]]:
-    user = await User.find_one(User.employee_id == employee_id)
-    if user is None:
+async def _org_graph_for(employee_id: str) -> OrgGraph | None:
+    """The org graph if it holds ``employee_id``; None for an inactive employee."""
+    graph = await org_graph.get()
+    if employee_id in graph:
+        return graph
+    # The graph only holds active employees
+    if await User.find_one(User.employee_id == employee_id) is None:
         raise EmployeeNotFoundError(f"Employee '{employee_id}' not found")
+    return None
+
 
-    subordinate_ids = user.subordinates
-    if not subordinate_ids:
+async def get_subordinates(employee_id: str) -> list[dict[str, object]]:
+    graph = await _org_graph_for(employee_id)
+    if graph is None:
+        return []
+    return [_serialize(report) for report in graph.direct_reports(employee_id)]
+
+
+async def get_all_reports(
+    employee_id: str, max_depth: int | None = None
+) -> list[dict[str, object]]:
+    """Every active report under the employee, nearest levels first."""
+    graph = await _org_graph_for(employee_id)
+    if graph is None:
+        return []
+    return [_serialize(report) for report in graph.all_reports(employee_id, max_depth)]
+
+
+async def get_management_chain(employee_id: str) -> list[dict[str, object]]:
+    """The employee's managers from the direct one up to the top."""
+    graph = await _org_graph_for(employee_id)
+    if graph is None:
         return []
+    return [_serialize(manager) for manager in graph.management_chain(employee_id)]
 
-    subordinates = await User.find(In(User.employee_id, subordinate_ids)).to_list()
-    return [_serialize(subordinate) for subordinate in subordinates if subordinate.is_active]
+
+async def get_span_of_control(employee_id: str) -> dict[str, object]:
+    graph = await _org_graph_for(employee_id)
+    if graph is None:
+        return SpanOfControl(employee_id=employee_id).model_dump()
+    return graph.span_of_control(employee_id).model_dump()
 
 
 async def _send_invitation_email(user: User, password: str) -> None:
@@ -164,7 +176,7 @@ async def create_employee(payload: dict[str, object]) -> dict[str, object]:
         raise EmployeeAlreadyExistsError("Employee with given id or email already exists")
 
     password = DEFAULT_PASSWORD
-    hashed_password = hash_password(password)
+    hashed_password = await hash_password_async(password)
 
     position = payload.get("position")
     if position is not None and position not in ALLOWED_POSITIONS:
@@ -195,13 +207,16 @@ async def create_employee(payload: dict[str, object]) -> dict[str, object]:
         hashed_password=hashed_password,
         is_active=True,
     )
+    user.refresh_search_terms()
     await user.insert()
+    org_graph.invalidate()
 
     try:
         print("SEND_INVITATION_EMAIL STILL DOESN'T WORK")
         # await _send_invitation_email(user, password)
     except (EmailConfigurationError, Exception) as exc:
         await user.delete()
+        org_graph.invalidate()
         raise EmployeeEmailError(str(exc)) from exc
 
     return _serialize(user)
@@ -229,6 +244,7 @@ async def deactivate_employee(employee_id: str) -> dict[str, object]:
 
     user.is_active = False
     await user.touch()
+    org_graph.invalidate()
 
     try:
         print("SEND DEACTIVATE EMAIL MASIH GAK JALAN")
@@ -248,6 +264,7 @@ async def activate_employee(employee_id: str) -> dict[str, object]:
 
     user.is_active = True
     await user.touch()
+    org_graph.invalidate()
 
     return _serialize(user)
 
@@ -284,6 +301,7 @@ async def update_employee(employee_id: str, payload: EmployeeUpdate) -> dict[str
         setattr(user, field, value)
 
     await user.touch()
+    org_graph.invalidate()
     return _serialize(user)
 
 
@@ -316,113 +334,208 @@ def _placeholder_email(employee_id: str) -> str:
     return f"pending-{safe}@placeholder.example.com"
 
 
-async def save_chart(employees_payload: list[dict[str, object]]) -> dict[str, int]:
-    """Persist a full chart snapshot into the ``users`` collection.
+@dataclass(slots=True)
+class _ChartRow:
+    """One payload employee, normalised."""
 
-    Reconciliation rules:
-      * If a payload employee matches an existing user by ``employee_id`` →
-        update the editable fields and re-activate if needed.
-      * If the payload introduces a brand new ``employee_id`` → insert a new
-        user with a default password and (if blank) a placeholder email.
-      * If an existing active user is missing from the payload → soft-delete
-        by setting ``is_active = False`` and clearing their ``subordinates``.
+    employee_id: str
+    name: str
+    email: str
+    title: str | None
+    division: str | None
+    position: str | None
+    level: str | None
+    subordinates: list[str]
+    projects: list[str]
+    avatar: str | None
 
-    Returns a summary dict with counts.
-    """
 
-    stats = {"created": 0, "updated": 0, "deactivated": 0, "skipped": 0}
+def _optional_text(value: object) -> str | None:
+    return str(value) if value else None
 
-    # Snapshot of existing users keyed by employee_id for O(1) lookup.
-    existing_users = await User.find_all().to_list()
-    existing_by_id: dict[str, User] = {
-        str(u.employee_id): u for u in existing_users if u.employee_id
-    }
 
-    payload_ids: set[str] = set()
+def _text_list(value: object) -> list[str]:
+    return [str(item) for item in (value or []) if item]  # type: ignore[attr-defined]
+
 
+def _parse_chart_rows(
+    employees_payload: list[dict[str, object]],
+) -> tuple[dict[str, _ChartRow], int]:
+    """Payload rows keyed by employee id (last occurrence wins) and the skipped count."""
+    rows: dict[str, _ChartRow] = {}
+    skipped = 0
     for raw in employees_payload:
         emp_id = str(raw.get("id") or "").strip()
+        if not emp_id or emp_id in rows:
+            skipped += 1
         if not emp_id:
-            stats["skipped"] += 1
-            continue
-        payload_ids.add(emp_id)
-
-        name = str(raw.get("name") or "").strip() or "New Employee"
-        title = raw.get("title") or None
-        division = _coerce_division(raw.get("division"))
-        position = _coerce_position(raw.get("position"))
-        level = raw.get("level") or None
-        subordinates = [str(s) for s in (raw.get("subordinates") or []) if s]
-        projects = [str(p) for p in (raw.get("projects") or []) if p]
-        avatar = raw.get("avatar") or None
-
-        user = existing_by_id.get(emp_id)
-
-        if user is not None:
-            # --- Update path --------------------------------------------------
-            user.name = name
-            user.title = title if title is not None else user.title
-            user.division = division if division is not None else user.division
-            user.position = position if position is not None else user.position
-            user.level = level if level is not None else user.level
-            user.subordinates = subordinates
-            user.projects = projects
-            if avatar:
-                # Avatar on the User model is HttpUrl | None; only overwrite
-                # when we have a real value so we don't drop existing avatars
-                # that weren't part of the chart payload.
-                user.avatar = avatar  # type: ignore[assignment]
-            if not user.is_active:
-                user.is_active = True
-            await user.touch()
-            stats["updated"] += 1
             continue
+        rows[emp_id] = _ChartRow(
+            employee_id=emp_id,
+            name=str(raw.get("name") or "").strip() or "New Employee",
+            email=str(raw.get("email") or "").strip().lower(),
+            title=_optional_text(raw.get("title")),
+            division=_coerce_division(raw.get("division")),
+            position=_coerce_position(raw.get("position")),
+            level=_optional_text(raw.get("level")),
+            subordinates=_text_list(raw.get("subordinates")),
+            projects=_text_list(raw.get("projects")),
+            avatar=_optional_text(raw.get("avatar")),
+        )
+    return rows, skipped
+
+
+def _chart_changes(user: UserSummary, row: _ChartRow, removed: set[str]) -> dict[str, object]:
+    """Fields of ``user`` that differ from the chart state (blank chart values keep the old one)."""
+    target: dict[str, object] = {
+        "name": row.name,
+        "title": row.title if row.title is not None else user.title,
+        "division": row.division if row.division is not None else user.division,
+        "position": row.position if row.position is not None else user.position,
+        "level": row.level if row.level is not None else user.level,
+        "subordinates": [s for s in row.subordinates if s not in removed],
+        "projects": row.projects,
+        "is_active": True,
+    }
+    changes = {field: value for field, value in target.items() if getattr(user, field) != value}
+    # Only overwrite the avatar with a real value so existing ones survive
+    if row.avatar and str(user.avatar or "") != row.avatar:
+        changes["avatar"] = row.avatar
+    return changes
+
+
+def _search_terms_after(user: UserSummary, changes: dict[str, object]) -> list[str]:
+    def value(field: str) -> str | None:
+        return changes.get(field, getattr(user, field))  # type: ignore[return-value]
+
+    return build_user_search_terms(
+        value("name"),
+        user.email,
+        user.employee_id,
+        value("title"),
+        value("division"),
+        value("level"),
+        value("position"),
+    )
 
-        # --- Create path ------------------------------------------------------
-        email_raw = str(raw.get("email") or "").strip().lower()
-        email = email_raw or _placeholder_email(emp_id)
 
-        # Make sure the email we pick doesn't collide with another user.
-        conflict = await User.find_one(User.email == email)
-        if conflict is not None:
-            email = _placeholder_email(f"{emp_id}-{len(existing_by_id)}")
+async def save_chart(employees_payload: list[dict[str, object]]) -> dict[str, object]:
+    """Persist a full chart snapshot into the ``users`` collection.
 
-        new_user = User(
-            employee_id=emp_id,
-            name=name,
-            email=email,
-            title=title,
-            division=division,
-            level=level,
-            position=position,
-            subordinates=subordinates,
-            projects=projects,
-            avatar=avatar if avatar else None,  # type: ignore[arg-type]
-            hashed_password=hash_password(DEFAULT_PASSWORD),
-            is_active=True,
-        )
-        await new_user.insert()
-        stats["created"] += 1
+    Reconciliation rules:
+      * If a payload employee matches an existing user by ``employee_id`` →
+        update the editable fields and re-activate if needed.
+      * If the payload introduces a brand new ``employee_id`` → insert a new
+        user with a default password and (if blank) a placeholder email.
+      * If an existing active user is missing from the payload → soft-delete
+        by setting ``is_active = False`` and clearing their ``subordinates``,
+        and drop them from every other user's ``subordinates``.
 
-    # Soft-delete users that disappeared from the chart.
-    for emp_id, user in existing_by_id.items():
-        if emp_id in payload_ids:
-            continue
-        if not user.is_active:
-            continue
+    The create/update/deactivate sets are computed in memory from one projected
+    snapshot; only changed fields are written, all in one ordered ``bulk_write``.
+
+    Returns a summary dict with counts and per-phase timings in milliseconds.
+    """
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
 
-        # Also prune the vanished id from every other user's subordinates.
-        other_supervisors = await User.find(
-            In(User.subordinates, [emp_id])
+    def lap(phase: str, since: float) -> float:
+        now = time.perf_counter()
+        timings[phase] = round((now - since) * 1000, 2)
+        return now
+
+    updated = unchanged = deactivated = 0
+
+    # Snapshot without password hashes; the subordinate graph spans every user
+    existing = await User.find_all(projection_model=UserSummary).to_list()
+    existing_by_id = {str(u.employee_id): u for u in existing if u.employee_id}
+    rows, skipped = _parse_chart_rows(employees_payload)
+    mark = lap("load_ms", started)
+
+    deactivate_ids = {
+        emp_id for emp_id, user in existing_by_id.items() if user.is_active and emp_id not in rows
+    }
+    new_rows = [row for emp_id, row in rows.items() if emp_id not in existing_by_id]
+
+    # One query for every candidate email of the new users
+    wanted = {row.employee_id: row.email or _placeholder_email(row.employee_id) for row in new_rows}
+    taken: set[str] = set()
+    if wanted:
+        conflicts = await User.find(
+            In(User.email, list(wanted.values())), projection_model=UserSummary
         ).to_list()
-        for sup in other_supervisors:
-            if emp_id in sup.subordinates:
-                sup.subordinates.remove(emp_id)
-                await sup.touch()
+        taken = {user.email for user in conflicts}
+    mark = lap("conflict_check_ms", mark)
 
-        user.subordinates = []
-        user.is_active = False
-        await user.touch()
-        stats["deactivated"] += 1
+    now = datetime.now(UTC)
+    operations: list[InsertOne | UpdateOne] = []
+    changed_user_ids: list[str] = []
 
-    return stats
+    if new_rows:
+        # Each user gets its own salted hash; the hashes run in parallel on the hasher pool
+        hashed_passwords = await asyncio.gather(
+            *(hash_password_async(DEFAULT_PASSWORD) for _ in new_rows)
+        )
+        mark = lap("hash_ms", mark)
+        for row, hashed_password in zip(new_rows, hashed_passwords):
+            email = wanted[row.employee_id]
+            if email in taken:
+                email = _placeholder_email(f"{row.employee_id}-{len(existing_by_id)}")
+            taken.add(email)
+            new_user = User(
+                employee_id=row.employee_id,
+                name=row.name,
+                email=email,
+                title=row.title,
+                division=row.division,
+                level=row.level,
+                position=row.position,  # type: ignore[arg-type]
+                subordinates=[s for s in row.subordinates if s not in deactivate_ids],
+                projects=row.projects,
+                avatar=row.avatar,  # type: ignore[arg-type]
+                hashed_password=hashed_password,
+                is_active=True,
+            )
+            new_user.refresh_search_terms()
+            operations.append(InsertOne(get_dict(new_user, to_db=True)))
+
+    for user in existing:
+        emp_id = str(user.employee_id) if user.employee_id else None
+        row = rows.get(emp_id) if emp_id else None
+        if row is not None:
+            changes = _chart_changes(user, row, deactivate_ids)
+            if not changes:
+                unchanged += 1
+                continue
+            changes["search_terms"] = _search_terms_after(user, changes)
+            updated += 1
+        elif emp_id in deactivate_ids:
+            changes = {"is_active": False, "subordinates": []}
+            deactivated += 1
+        elif deactivate_ids.intersection(user.subordinates):
+            # Users outside the chart still drop removed subordinates
+            changes = {"subordinates": [s for s in user.subordinates if s not in deactivate_ids]}
+        else:
+            continue
+        changes["updated_at"] = now
+        operations.append(UpdateOne({"_id": user.id}, {"$set": changes}))
+        changed_user_ids.append(str(user.id))
+    mark = lap("diff_ms", mark)
+
+    if operations:
+        await User.get_pymongo_collection().bulk_write(operations, ordered=True)
+        org_graph.invalidate()
+    # Cached sessions hold a snapshot of each changed user; one broadcast for all of them
+    await session_cache.invalidate_users(changed_user_ids)
+    lap("write_ms", mark)
+
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    counts = {
+        "created": len(new_rows),
+        "updated": updated,
+        "unchanged": unchanged,
+        "deactivated": deactivated,
+        "skipped": skipped,
+    }
+    log_info(logger, "org chart saved", operations=len(operations), **counts, **timings)
+    return {**counts, "timings_ms": timings}
@@ -0,0 +1,152 @@
+"""Employee directory search service.
+
+Each user stores ``search_terms`` (see ``build_user_search_terms``): distinct
+lower-cased tokens from name, email, employee_id, title, division, level and
+position. The ``(is_active, search_terms)`` index answers the activity filter
+and exact/prefix term lookups together, and results are projected onto
+``UserSummary``, so a lookup never loads every user document.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import re
+from typing import Any
+
+from beanie import PydanticObjectId
+
+from app.logging_utils import get_logger, log_debug
+from app.models.user import User, UserSummary
+
+logger = get_logger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Score weights; every hit already matched all terms through the index
+_EXACT_MATCH_BONUS = 10
+_NAME_PREFIX_BONUS = 5
+_NAME_WEIGHT = 3
+_EMAIL_WEIGHT = 2
+_OTHER_FIELD_WEIGHT = 1
+
+_SUMMARY_PROJECTION = {
+    "_id": 1,
+    **{name: 1 for name in UserSummary.model_fields if name != "id"},
+    "_score": 1,
+}
+
+
+def _encode_cursor(score: int, name: str, object_id: PydanticObjectId) -> str:
+    payload = {"s": score, "n": name, "id": str(object_id)}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[int, str, PydanticObjectId]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return int(payload["s"]), str(payload["n"]), PydanticObjectId(payload["id"])
+    except Exception as exc:
+        raise ValueError("Invalid search cursor") from exc
+
+
+def _query_terms(query_text: str) -> list[str]:
+    return list(dict.fromkeys(_TOKEN_PATTERN.findall(query_text.lower())))
+
+
+def _term_match(terms: list[str]) -> dict[str, Any]:
+    """All terms must be present; the last one may be a prefix (search-as-you-type)."""
+    *complete, partial = terms
+    clauses: list[dict[str, Any]] = [{"search_terms": {"$regex": f"^{re.escape(partial)}"}}]
+    if complete:
+        clauses.insert(0, {"search_terms": {"$all": complete}})
+    return {"$and": clauses}
+
+
+def _contains(field: str, pattern: str) -> dict[str, Any]:
+    return {
+        "$regexMatch": {"input": {"$ifNull": [f"${field}", ""]}, "regex": pattern, "options": "i"}
+    }
+
+
+def _score_expression(query_text: str, terms: list[str]) -> dict[str, Any]:
+    whole = query_text.strip().lower()
+    exact = [
+        {"$eq": [{"$toLower": {"$ifNull": [f"${field}", ""]}}, whole]}
+        for field in ("name", "email", "employee_id")
+    ]
+    parts: list[dict[str, Any]] = [
+        {"$cond": [{"$or": exact}, _EXACT_MATCH_BONUS, 0]},
+        {"$cond": [_contains("name", f"^{re.escape(whole)}"), _NAME_PREFIX_BONUS, 0]},
+    ]
+    for term in terms:
+        # Word-start matches only, so "an" ranks "Anna" but not "Joan"
+        word_start = rf"(^|\W){re.escape(term)}"
+        parts.append({"$cond": [_contains("name", word_start), _NAME_WEIGHT, 0]})
+        parts.append({"$cond": [_contains("email", f"^{re.escape(term)}"), _EMAIL_WEIGHT, 0]})
+        others = [_contains(field, word_start) for field in ("title", "division", "position")]
+        parts.append({"$cond": [{"$or": others}, _OTHER_FIELD_WEIGHT, 0]})
+    return {"$add": parts}
+
+
+async def search(
+    query_text: str | None,
+    *,
+    active: bool = True,
+    limit: int | None = 50,
+    cursor: str | None = None,
+) -> tuple[list[UserSummary], str | None]:
+    """Ranked directory search over active (or inactive) users.
+
+    Hits are ordered by score, then name. An empty query lists every user in
+    name order. Pages are addressed by the keyset ``cursor`` of the previous
+    page; the returned cursor is ``None`` on the last page. ``limit=None``
+    returns all matches.
+    """
+    terms = _query_terms(query_text or "")
+    match: dict[str, Any] = {"is_active": active}
+    if terms:
+        match = {"$and": [match, _term_match(terms)]}
+
+    pipeline: list[dict[str, Any]] = [
+        {"$match": match},
+        {
+            "$addFields": {
+                "_score": _score_expression(query_text or "", terms) if terms else {"$literal": 0}
+            }
+        },
+    ]
+    if cursor:
+        score, name, last_id = _decode_cursor(cursor)
+        pipeline.append(
+            {
+                "$match": {
+                    "$or": [
+                        {"_score": {"$lt": score}},
+                        {"_score": score, "name": {"$gt": name}},
+                        {"_score": score, "name": name, "_id": {"$gt": last_id}},
+                    ]
+                }
+            }
+        )
+    pipeline.append({"$sort": {"_score": -1, "name": 1, "_id": 1}})
+    if limit is not None:
+        # One extra row tells us whether another page exists
+        pipeline.append({"$limit": limit + 1})
+    pipeline.append({"$project": _SUMMARY_PROJECTION})
+
+    rows = await User.aggregate(pipeline).to_list()
+    page = rows if limit is None else rows[:limit]
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        last = page[-1]
+        next_cursor = _encode_cursor(last.get("_score", 0), last.get("name", ""), last["_id"])
+    log_debug(
+        logger,
+        "employee directory search",
+        query=query_text,
+        active=active,
+        returned=len(page),
+        has_more=next_cursor is not None,
+    )
+    return [UserSummary.model_validate(row) for row in page], next_cursor
@@ -0,0 +1,179 @@
+"""Request-scoped identity cache.
+
+A request resolves the same ``User`` over and over: the route resolves the
+session user, then every permission helper resolves it again by employee_id or
+ObjectId. ``identity_scope`` (entered by the HTTP middleware) opens a per-request
+cache in a contextvar; the session lookup seeds it and ``resolve_user`` reads
+from it, so each identifier hits MongoDB at most once per request.
+
+The session identity is shared by both router families: v1 routes read its
+``profile`` and v2 submodules its ``context_user``.
+
+Outside a request scope (scripts, background loops) nothing is cached.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import cached_property
+
+from beanie import PydanticObjectId
+
+from app.core.request_context import RequestContextUser
+from app.models.user import User
+from app.schemas.auth import UserProfile
+from app.services.permissions import permission_registry
+
+ADMIN_TITLES = frozenset({"System Administrator"})
+
+
+@dataclass(frozen=True)
+class Identity:
+    """A resolved user plus the identifiers documents may reference it by."""
+
+    user: User
+    object_id: str
+    employee_id: str | None
+    division: str | None
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> Identity:
+        return cls(
+            user=user,
+            object_id=str(user.id),
+            employee_id=user.employee_id,
+            division=user.division,
+            is_admin=(user.title or "").strip() in ADMIN_TITLES,
+        )
+
+    @property
+    def identifiers(self) -> list[str]:
+        """ObjectId string first, then employee_id when set."""
+        if self.employee_id:
+            return [self.object_id, self.employee_id]
+        return [self.object_id]
+
+    @cached_property
+    def permissions(self) -> frozenset[str]:
+        """Permissions of the user's role from the registry (see ``app.services.permissions``)."""
+        return permission_registry.permissions_for(self.object_id, self.user.position)
+
+    @cached_property
+    def profile(self) -> UserProfile:
+        """View used by the v1 routes."""
+        user = self.user
+        return UserProfile(
+            id=self.employee_id or self.object_id,
+            name=user.name,
+            email=user.email,
+            title=user.title,
+            division=user.division,
+            level=user.level,
+            position=user.position,
+            subordinates=user.subordinates,
+            projects=user.projects,
+            avatar=user.avatar,
+            employment_type=user.employment_type,
+        )
+
+    @cached_property
+    def context_user(self) -> RequestContextUser:
+        """View used by the v2 submodules (``AuthContext.user``)."""
+        return RequestContextUser(
+            id=self.object_id,
+            name=self.user.name,
+            permissions=self.permissions,
+            employee_id=self.employee_id,
+        )
+
+
+@dataclass(slots=True)
+class _IdentityCache:
+    session: Identity | None = None
+    # Hash of the bearer token ``session`` was resolved from
+    session_token_hash: str | None = None
+    # employee_id / ObjectId string -> identity (None caches a miss)
+    by_identifier: dict[str, Identity | None] = field(default_factory=dict)
+
+
+_cache: ContextVar[_IdentityCache | None] = ContextVar("identity_cache", default=None)
+
+
+@contextmanager
+def identity_scope() -> Iterator[None]:
+    """Open a fresh identity cache for the duration of one request."""
+    token = _cache.set(_IdentityCache())
+    try:
+        yield
+    finally:
+        _cache.reset(token)
+
+
+def _remember(identity: Identity) -> None:
+    cache = _cache.get()
+    if cache is None:
+        return
+    for identifier in identity.identifiers:
+        cache.by_identifier[identifier] = identity
+
+
+def set_session_identity(user: User, token_hash: str | None = None) -> Identity:
+    """Record the authenticated user of the current request (called by the auth layer)."""
+    identity = Identity.from_user(user)
+    cache = _cache.get()
+    if cache is not None:
+        cache.session = identity
+        cache.session_token_hash = token_hash
+        _remember(identity)
+    return identity
+
+
+def current_identity() -> Identity | None:
+    """The authenticated user of the current request, if the auth layer ran."""
+    cache = _cache.get()
+    return cache.session if cache is not None else None
+
+
+def session_identity_for(token_hash: str) -> Identity | None:
+    """The current request's identity if it was already resolved from this token."""
+    cache = _cache.get()
+    if cache is None or cache.session_token_hash != token_hash:
+        return None
+    return cache.session
+
+
+async def _load_user(identifier: str) -> User | None:
+    user = await User.find_one(User.employee_id == identifier)
+    if user:
+        return user
+    try:
+        oid = PydanticObjectId(identifier)
+    except Exception:
+        return None
+    return await User.get(oid)
+
+
+async def resolve_identity(identifier: str) -> Identity | None:
+    """Resolve a user by employee_id or ObjectId string, cached per request."""
+    if not identifier:
+        return None
+    cache = _cache.get()
+    if cache is not None and identifier in cache.by_identifier:
+        return cache.by_identifier[identifier]
+
+    user = await _load_user(identifier)
+    identity = Identity.from_user(user) if user else None
+    if cache is not None:
+        cache.by_identifier[identifier] = identity
+        if identity is not None:
+            _remember(identity)
+    return identity
+
+
+async def resolve_user(identifier: str) -> User | None:
+    identity = await resolve_identity(identifier)
+    return identity.user if identity else None
@@ -0,0 +1,138 @@
+"""In-memory org hierarchy built from ``User.subordinates``.
+
+Walking the hierarchy used to take one query per level. ``OrgGraphCache``
+loads every active user once (projected onto ``UserSummary``) into an
+adjacency map plus its reverse, so transitive questions (all reports under a
+manager, an employee's management chain, span of control) are answered from
+memory.
+
+The employee service invalidates the graph after every write that can change
+it. Writes on other workers are picked up when the graph goes stale after
+``ORG_GRAPH_TTL_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+
+from app.logging_utils import get_logger, log_debug
+from app.models.user import User, UserSummary
+from app.schemas.employee import SpanOfControl
+from constants import ORG_GRAPH_TTL_SECONDS
+
+logger = get_logger(__name__)
+
+
+class OrgGraph:
+    """Immutable snapshot of the active org hierarchy keyed by employee id."""
+
+    def __init__(self, users: list[UserSummary]):
+        self.users: dict[str, UserSummary] = {
+            str(user.employee_id): user for user in users if user.employee_id
+        }
+        self.reports: dict[str, tuple[str, ...]] = {}
+        managers: dict[str, list[str]] = {}
+        for employee_id, user in self.users.items():
+            # Only active, known reports; subordinates may still list removed ids
+            direct = tuple(
+                dict.fromkeys(s for s in user.subordinates if s in self.users and s != employee_id)
+            )
+            self.reports[employee_id] = direct
+            for report in direct:
+                managers.setdefault(report, []).append(employee_id)
+        # A report listed under several managers follows the first one (by id) up the chain
+        self.manager: dict[str, str] = {
+            report: min(candidates) for report, candidates in managers.items()
+        }
+
+    def __contains__(self, employee_id: str) -> bool:
+        return employee_id in self.users
+
+    def direct_reports(self, employee_id: str) -> list[UserSummary]:
+        return [self.users[report] for report in self.reports.get(employee_id, ())]
+
+    def _walk_reports(self, employee_id: str, max_depth: int | None) -> list[tuple[str, int]]:
+        """Breadth-first ``(employee_id, depth)`` of every report; cycles are cut."""
+        seen = {employee_id}
+        found: list[tuple[str, int]] = []
+        queue = deque([(employee_id, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for report in self.reports.get(current, ()):
+                if report in seen:
+                    continue
+                seen.add(report)
+                found.append((report, depth + 1))
+                queue.append((report, depth + 1))
+        return found
+
+    def all_reports(self, employee_id: str, max_depth: int | None = None) -> list[UserSummary]:
+        """Every report under ``employee_id``, nearest levels first."""
+        return [self.users[report] for report, _ in self._walk_reports(employee_id, max_depth)]
+
+    def management_chain(self, employee_id: str) -> list[UserSummary]:
+        """Managers from the direct one up to the top of the hierarchy."""
+        chain: list[UserSummary] = []
+        seen = {employee_id}
+        current = self.manager.get(employee_id)
+        while current is not None and current not in seen:
+            seen.add(current)
+            chain.append(self.users[current])
+            current = self.manager.get(current)
+        return chain
+
+    def span_of_control(self, employee_id: str) -> SpanOfControl:
+        walked = self._walk_reports(employee_id, None)
+        return SpanOfControl(
+            employee_id=employee_id,
+            direct_reports=len(self.reports.get(employee_id, ())),
+            total_reports=len(walked),
+            depth=max((depth for _, depth in walked), default=0),
+        )
+
+
+class OrgGraphCache:
+    """Lazily loaded ``OrgGraph`` with explicit invalidation and a staleness TTL."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._graph: OrgGraph | None = None
+        self._loaded_at = 0.0
+        # Bumped on every invalidation; a load started before one must not be kept
+        self._epoch = 0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> OrgGraph | None:
+        if self._graph is None:
+            return None
+        if self.ttl_seconds > 0 and time.monotonic() - self._loaded_at > self.ttl_seconds:
+            return None
+        return self._graph
+
+    async def get(self) -> OrgGraph:
+        graph = self._fresh()
+        if graph is not None:
+            return graph
+        async with self._lock:
+            graph = self._fresh()
+            if graph is not None:
+                return graph
+            epoch = self._epoch
+            users = await User.find({"is_active": True}, projection_model=UserSummary).to_list()
+            graph = OrgGraph(users)
+            if epoch == self._epoch:
+                self._graph = graph
+                self._loaded_at = time.monotonic()
+            log_debug(logger, "org graph loaded", employees=len(graph.users))
+            return graph
+
+    def invalidate(self) -> None:
+        self._epoch += 1
+        self._graph = None
+
+
+org_graph = OrgGraphCache(ORG_GRAPH_TTL_SECONDS)
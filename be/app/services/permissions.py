@@ -0,0 +1,141 @@
+"""Role to permission registry.
+
+v2 routes guarded by ``@allow`` check the permissions of the caller's role
+(their ``position``). The mapping lives in the single ``permission_registry``
+document and is loaded once at start-up; each role maps to a frozenset, and the
+resolved set is cached per user id, so a request never derives permissions.
+
+The document has a fixed ``_id`` and is seeded with one upsert, so workers
+starting together always read and write the same row. Every change increments
+the registry ``version``. The worker making the change
+reloads immediately; the others notice the new version on their next poll and
+drop their caches, so mappings change without a restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument
+
+from app.logging_utils import get_logger, log_error, log_info
+from app.models import PermissionRegistry
+from app.models.enums import ALLOWED_PERMISSIONS
+from constants import PERMISSION_REGISTRY_REFRESH_SECONDS
+
+logger = get_logger(__name__)
+
+# Seeded when the registry document does not exist yet
+DEFAULT_ROLE_PERMISSIONS: dict[str, list[str]] = {
+    "Internal Ops": ["read:all", "write:all"],
+}
+
+_NO_PERMISSIONS: frozenset[str] = frozenset()
+
+# The registry is a single document under this id
+REGISTRY_ID = PydanticObjectId("000000000000000000000001")
+
+
+class PermissionRegistryCache:
+    """In-process copy of the registry with per-user permission sets."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.version = -1
+        self.task: asyncio.Task[None] | None = None
+        self._roles: dict[str, frozenset[str]] = {}
+        # user id -> (role the set was resolved for, permissions)
+        self._by_user: dict[str, tuple[str | None, frozenset[str]]] = {}
+
+    def _apply(self, registry: PermissionRegistry) -> None:
+        self._roles = {role: frozenset(perms) for role, perms in registry.roles.items()}
+        self._by_user = {}
+        self.version = registry.version
+
+    def roles(self) -> dict[str, frozenset[str]]:
+        return dict(self._roles)
+
+    def permissions_for(self, user_id: str, role: str | None) -> frozenset[str]:
+        """Permissions of a user with the given role (cached per user id)."""
+        cached = self._by_user.get(user_id)
+        # A changed position invalidates the entry without any explicit hook
+        if cached is None or cached[0] != role:
+            cached = (role, self._roles.get(role or "", _NO_PERMISSIONS))
+            self._by_user[user_id] = cached
+        return cached[1]
+
+    async def _seed(self) -> dict[str, object]:
+        """Initial registry contents: a registry stored before the fixed id, else the defaults."""
+        legacy = await PermissionRegistry.get_pymongo_collection().find_one(
+            {"_id": {"$ne": REGISTRY_ID}}, sort=[("_id", 1)]
+        )
+        if legacy is not None:
+            return {"roles": legacy.get("roles", {}), "version": legacy.get("version", 0)}
+        return {"roles": DEFAULT_ROLE_PERMISSIONS, "version": 0}
+
+    async def load(self) -> None:
+        collection = PermissionRegistry.get_pymongo_collection()
+        raw = await collection.find_one({"_id": REGISTRY_ID})
+        if raw is None:
+            # Concurrent upserts on _id converge on one document
+            raw = await collection.find_one_and_update(
+                {"_id": REGISTRY_ID},
+                {"$setOnInsert": {**await self._seed(), "updated_at": datetime.now(UTC)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        self._apply(PermissionRegistry.model_validate(raw))
+        log_info(logger, "permission registry loaded", version=self.version, roles=len(self._roles))
+
+    async def refresh(self) -> None:
+        """Reload when another worker changed the registry."""
+        current = await PermissionRegistry.get_pymongo_collection().find_one(
+            {"_id": REGISTRY_ID}, {"version": 1}
+        )
+        if current is not None and current.get("version") != self.version:
+            await self.load()
+
+    async def set_role_permissions(self, role: str, permissions: list[str]) -> int:
+        """Replace one role's permissions (empty list removes the role); return the new version."""
+        unknown = set(permissions) - ALLOWED_PERMISSIONS
+        if unknown:
+            raise ValueError(f"Unknown permissions: {', '.join(sorted(unknown))}")
+        update: dict[str, dict[str, object]] = {
+            "$inc": {"version": 1},
+            "$currentDate": {"updated_at": True},
+        }
+        if permissions:
+            update["$set"] = {f"roles.{role}": sorted(set(permissions))}
+        else:
+            update["$unset"] = {f"roles.{role}": ""}
+        raw = await PermissionRegistry.get_pymongo_collection().find_one_and_update(
+            {"_id": REGISTRY_ID}, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        self._apply(PermissionRegistry.model_validate(raw))
+        log_info(logger, "role permissions updated", role=role, version=self.version)
+        return self.version
+
+    def start(self) -> None:
+        if self.task is not None or self.interval <= 0:
+            return
+        self.task = asyncio.create_task(self._run_loop())
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _run_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                log_error(logger, "permission registry refresh failed", error=str(exc))
+
+
+permission_registry = PermissionRegistryCache(PERMISSION_REGISTRY_REFRESH_SECONDS)
@@ -10,6 +10,7 @@ from slack_sdk.errors import SlackApiError
 from slack_sdk.web.async_client import AsyncWebClient
 
 from app.models.slack_message import SlackMessage
+from app.services import workload_entries
 
 logger = logging.getLogger(__name__)
 
@@ -245,6 +246,7 @@ class SlackCrawler:
                 existing.parsed_result = None
                 existing.parsed_at = None
                 await existing.save()
+                await workload_entries.remove_message(existing.id)
             elif not existing.slack_ts and slack_ts:
                 existing.slack_ts = slack_ts
                 await existing.save()
@@ -14,6 +14,7 @@ from langchain_openai import ChatOpenAI
 
 from app.models.slack_message import SlackMessage
 from app.schemas.slack import ParsedResult
+from app.services import workload_entries
 
 logger = logging.getLogger(__name__)
 
@@ -299,6 +300,8 @@ class ParseRunner:
 
             if parsed_result:
                 message.parsed_result = parsed_result.model_dump()
+                # Facts first: if the sync fails, parsed_at stays unset and the message is retried
+                await workload_entries.sync_message(message)
                 message.parsed_at = int(datetime.now().timestamp())
                 await message.save()
 
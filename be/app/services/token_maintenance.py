@@ -0,0 +1,141 @@
+"""Expiry and compaction of session and password reset tokens.
+
+Both collections carry a TTL index on ``expires_at`` (declared on the models
+and built by ``init_beanie`` at start-up), so MongoDB removes rows once they
+expire. ``compact_tokens`` removes what the TTL monitor cannot or need not wait
+for: rows whose ``expires_at`` is not a date (TTL indexes skip them), revoked
+sessions when no revocation list depends on them, and used reset tokens.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+from typing import Any
+
+from beanie import Document
+
+from app.logging_utils import get_logger, log_error, log_info
+from app.models import PasswordResetToken, SessionToken
+from constants import SESSION_TOKEN_STATELESS, TOKEN_COMPACTION_INTERVAL_SECONDS
+
+logger = get_logger(__name__)
+
+TTL_INDEX_NAME = "expires_at_ttl"
+
+_TOKEN_MODELS = (SessionToken, PasswordResetToken)
+
+
+async def collection_sizes() -> dict[str, dict[str, Any]]:
+    """Row count and data/index sizes in bytes of the token collections."""
+    sizes: dict[str, dict[str, Any]] = {}
+    for model in _TOKEN_MODELS:
+        collection = model.get_pymongo_collection()
+        stats = await collection.aggregate([{"$collStats": {"storageStats": {}}}]).to_list(1)
+        storage = stats[0]["storageStats"] if stats else {}
+        sizes[collection.name] = {
+            "count": storage.get("count", 0),
+            "size": storage.get("size", 0),
+            "storage_size": storage.get("storageSize", 0),
+            "total_index_size": storage.get("totalIndexSize", 0),
+            "index_sizes": storage.get("indexSizes", {}),
+        }
+    return sizes
+
+
+async def ensure_ttl_indexes() -> list[str]:
+    """Build the ``expires_at`` TTL index where missing; return the collections changed.
+
+    Any other index on ``expires_at`` is dropped first: MongoDB refuses a second
+    index on the same key, which would make ``init_beanie`` fail at start-up.
+    """
+    changed: list[str] = []
+    for model in _TOKEN_MODELS:
+        collection = model.get_pymongo_collection()
+        indexes = await collection.index_information()
+        ttl = indexes.get(TTL_INDEX_NAME)
+        if ttl is not None and ttl.get("expireAfterSeconds") == 0:
+            continue
+        for name, spec in indexes.items():
+            if spec["key"] == [("expires_at", 1)]:
+                await collection.drop_index(name)
+        await collection.create_index("expires_at", expireAfterSeconds=0, name=TTL_INDEX_NAME)
+        changed.append(collection.name)
+    return changed
+
+
+def _session_compaction_filter(now: datetime) -> dict[str, Any]:
+    clauses: list[dict[str, Any]] = [
+        {"expires_at": {"$not": {"$type": "date"}}},
+        {"expires_at": {"$lte": now}},
+    ]
+    # Stateless validation loads revoked rows until they expire; otherwise they are dead weight
+    if not SESSION_TOKEN_STATELESS:
+        clauses.append({"revoked": True})
+    return {"$or": clauses}
+
+
+def _reset_compaction_filter(now: datetime) -> dict[str, Any]:
+    return {
+        "$or": [
+            {"used": True},
+            {"expires_at": {"$not": {"$type": "date"}}},
+            {"expires_at": {"$lte": now}},
+        ]
+    }
+
+
+def _compactions(now: datetime) -> list[tuple[type[Document], dict[str, Any]]]:
+    return [
+        (SessionToken, _session_compaction_filter(now)),
+        (PasswordResetToken, _reset_compaction_filter(now)),
+    ]
+
+
+async def count_compactable() -> dict[str, int]:
+    """Rows ``compact_tokens`` would delete, per collection."""
+    return {
+        model.get_collection_name(): await model.get_pymongo_collection().count_documents(query)
+        for model, query in _compactions(datetime.now(UTC))
+    }
+
+
+async def compact_tokens() -> dict[str, int]:
+    """Delete dead session and reset token rows; return deleted counts per collection."""
+    deleted: dict[str, int] = {}
+    for model, query in _compactions(datetime.now(UTC)):
+        result = await model.get_pymongo_collection().delete_many(query)
+        deleted[model.get_collection_name()] = result.deleted_count
+    log_info(logger, "token collections compacted", **deleted)
+    return deleted
+
+
+class TokenCompactor:
+    """Runs ``compact_tokens`` every ``interval`` seconds in the background."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self.task is not None or self.interval <= 0:
+            return
+        self.task = asyncio.create_task(self._run_loop())
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _run_loop(self) -> None:
+        while True:
+            try:
+                await compact_tokens()
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                log_error(logger, "token compaction failed", error=str(exc))
+            await asyncio.sleep(self.interval)
+
+
+token_compactor = TokenCompactor(TOKEN_COMPACTION_INTERVAL_SECONDS)
@@ -0,0 +1,347 @@
+"""Workload entry fact table.
+
+Workload reports used to re-derive every entry from all parsed Slack messages
+on each request. ``workload_entries`` holds one ``WorkloadEntryFact`` per
+workload summary item instead, with the mapped project, hour split, billable
+flag and work type precomputed:
+
+* ``sync_message`` replaces a message's facts whenever its ``parsed_result``
+  is written (the parser) and ``remove_message`` drops them when it is reset
+  (the crawler, on edited messages);
+* ``remap_projects`` rewrites the project-derived fields after a project
+  mapping changes.
+
+Routes query the collection with date-range predicates. ``query_entries``
+returns a page and its summary totals in one ``$facet`` round-trip.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from typing import Any
+
+from beanie import PydanticObjectId
+from beanie.odm.utils.dump import get_dict
+from pymongo import DeleteMany, UpdateOne
+
+from app.logging_utils import get_logger, log_debug, log_info
+from app.models.project_mapping import ProjectMapping
+from app.models.slack_message import SlackMessage
+from app.models.workload_entry import WorkloadEntryFact
+
+logger = get_logger(__name__)
+
+# Reported hours above this per item count as overtime
+_REGULAR_HOURS = 8
+
+
+def _normalize_project_name(project_name: str) -> str:
+    return project_name.strip().casefold()
+
+
+def find_project_mapping(
+    project_name: str,
+    project_mappings: list[ProjectMapping],
+) -> ProjectMapping | None:
+    normalized_project_name = _normalize_project_name(project_name)
+    if not normalized_project_name:
+        return None
+
+    for mapping in project_mappings:
+        normalized_mapped_names = {
+            _normalize_project_name(mapped_name) for mapped_name in mapping.mapped_names
+        }
+        if normalized_project_name in normalized_mapped_names:
+            return mapping
+
+    return None
+
+
+def classify_work_type(project: str, activity_description: str) -> str:
+    work_type = "Development"
+    lower_proj = project.lower()
+    lower_act = activity_description.lower()
+
+    if any(kw in lower_proj for kw in ["meeting", "standup", "review"]):
+        return "Meeting"
+    if any(kw in lower_act for kw in ["doc", "documentation", "guide", "readme"]):
+        return "Documentation"
+    if any(kw in lower_act for kw in ["test", "testing", "qa", "bug"]):
+        return "Testing"
+    if any(kw in lower_act for kw in ["support", "help", "issue", "troubleshoot"]):
+        return "Support"
+    return work_type
+
+
+def is_billable_project(project: str) -> bool:
+    lower_proj = project.lower()
+    return not any(kw in lower_proj for kw in ["internal", "admin", "vacation", "sick"])
+
+
+def _project_fields(
+    original_project: str,
+    activity_description: str,
+    total_hours: float,
+    project_mappings: list[ProjectMapping],
+) -> dict[str, Any]:
+    """Fields that depend on the project mapping."""
+    mapping = find_project_mapping(original_project, project_mappings)
+    project = mapping.project_name if mapping is not None else original_project
+    is_billable = is_billable_project(project)
+    return {
+        "project": project,
+        "is_mapped": mapping is not None,
+        "is_billable": is_billable,
+        "billable_hours": round(total_hours if is_billable else 0, 1),
+        "work_type": classify_work_type(project, activity_description),
+    }
+
+
+def _as_hours(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def build_entry_facts(
+    message: SlackMessage,
+    project_mappings: list[ProjectMapping],
+) -> list[WorkloadEntryFact]:
+    """Facts for every usable workload summary item of a parsed message."""
+    parsed_result = message.parsed_result or {}
+    reported_at = datetime.fromtimestamp(message.timestamp)
+    default_date_str = reported_at.strftime("%Y-%m-%d")
+
+    facts: list[WorkloadEntryFact] = []
+    for seq, summary in enumerate(parsed_result.get("workload_summary", [])):
+        original_project = (summary.get("project_name") or "").strip()
+        hours = _as_hours(summary.get("project_manhour"))
+        try:
+            entry_date = datetime.strptime(summary.get("date") or default_date_str, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            continue
+        if not original_project or hours <= 0:
+            continue
+
+        done_items = summary.get("done_items") or []
+        activity_description = "; ".join(done_items) if done_items else "No specific tasks listed"
+        overtime_hours = max(0, hours - _REGULAR_HOURS)
+        facts.append(
+            WorkloadEntryFact(
+                message_id=message.id,
+                seq=seq,
+                date=entry_date,
+                timestamp=message.timestamp,
+                user_id=message.user_id,
+                user=message.name,
+                original_project=original_project,
+                activity_description=activity_description,
+                hours_worked=round(hours - overtime_hours, 1),
+                overtime_hours=round(overtime_hours, 1),
+                total_hours=round(hours, 1),
+                notes=f"Reported at {reported_at.strftime('%H:%M')}",
+                **_project_fields(original_project, activity_description, hours, project_mappings),
+            )
+        )
+    return facts
+
+
+async def remove_message(message_id: PydanticObjectId) -> int:
+    result = await WorkloadEntryFact.get_pymongo_collection().delete_many(
+        {"message_id": message_id}
+    )
+    return result.deleted_count
+
+
+async def sync_message(
+    message: SlackMessage,
+    project_mappings: list[ProjectMapping] | None = None,
+) -> int:
+    """Replace the facts of one message with those of its current ``parsed_result``.
+
+    Facts are upserted by ``(message_id, seq)`` and rows whose ``seq`` is no
+    longer produced are dropped afterwards, so a sync that fails halfway can
+    simply be run again.
+    """
+    if project_mappings is None:
+        project_mappings = await ProjectMapping.find_all().to_list()
+    facts = build_entry_facts(message, project_mappings)
+    operations: list[UpdateOne | DeleteMany] = []
+    for fact in facts:
+        fields = get_dict(fact, to_db=True)
+        fields.pop("_id", None)
+        operations.append(
+            UpdateOne({"message_id": message.id, "seq": fact.seq}, {"$set": fields}, upsert=True)
+        )
+    # Skipped summary items leave gaps in seq, so drop every seq not produced this time
+    operations.append(
+        DeleteMany({"message_id": message.id, "seq": {"$nin": [fact.seq for fact in facts]}})
+    )
+    await WorkloadEntryFact.get_pymongo_collection().bulk_write(operations, ordered=True)
+    log_debug(logger, "workload entries synced", message_id=str(message.id), entries=len(facts))
+    return len(facts)
+
+
+async def remap_projects() -> int:
+    """Re-apply the project mappings to stored facts; return the number of rows changed."""
+    project_mappings = await ProjectMapping.find_all().to_list()
+    collection = WorkloadEntryFact.get_pymongo_collection()
+    stored = await collection.aggregate(
+        [
+            {
+                "$group": {
+                    "_id": {
+                        "original": "$original_project",
+                        "project": "$project",
+                        "is_mapped": "$is_mapped",
+                    }
+                }
+            }
+        ]
+    ).to_list(None)
+
+    changed: set[str] = set()
+    for row in stored:
+        original = row["_id"]["original"]
+        mapping = find_project_mapping(original, project_mappings)
+        target = mapping.project_name if mapping is not None else original
+        # A mapping onto the raw name keeps the project but still flips is_mapped
+        if target != row["_id"]["project"] or (mapping is not None) != row["_id"]["is_mapped"]:
+            changed.add(original)
+    if not changed:
+        return 0
+
+    operations: list[UpdateOne] = []
+    cursor = collection.find(
+        {"original_project": {"$in": sorted(changed)}},
+        {"original_project": 1, "activity_description": 1, "total_hours": 1},
+    )
+    async for row in cursor:
+        fields = _project_fields(
+            row["original_project"],
+            row["activity_description"],
+            row["total_hours"],
+            project_mappings,
+        )
+        operations.append(UpdateOne({"_id": row["_id"]}, {"$set": fields}))
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+    log_info(logger, "workload entries remapped", projects=len(changed), entries=len(operations))
+    return len(operations)
+
+
+def build_filter(
+    start_dt: date,
+    end_dt: date,
+    user_id: str | None = None,
+    excluded_user_ids: list[str] | None = None,
+    project_name: str | None = None,
+) -> dict[str, Any]:
+    """Query for facts dated within ``[start_dt, end_dt]`` plus the optional filters."""
+    query: dict[str, Any] = {
+        "date": {
+            "$gte": datetime.combine(start_dt, time.min),
+            "$lte": datetime.combine(end_dt, time.min),
+        }
+    }
+    user_condition: dict[str, Any] = {}
+    if user_id:
+        user_condition["$eq"] = user_id
+    if excluded_user_ids:
+        user_condition["$nin"] = excluded_user_ids
+    if user_condition:
+        query["user_id"] = user_condition
+    if project_name:
+        query["project"] = project_name
+    return query
+
+
+# Newest messages first, items in the order they were reported
+ENTRY_SORT: list[tuple[str, int]] = [("timestamp", -1), ("message_id", 1), ("seq", 1)]
+
+
+def serialize_entry(fact: dict[str, Any], entry_id: int) -> dict[str, Any]:
+    """API shape of a raw fact row (``entry_id`` numbers rows across the result)."""
+    return {
+        "id": entry_id,
+        "date": fact["date"].strftime("%Y-%m-%d"),
+        "user_id": fact["user_id"],
+        "user": fact["user"],
+        "project": fact["project"],
+        "activity_description": fact["activity_description"],
+        "hours_worked": fact["hours_worked"],
+        "overtime_hours": fact["overtime_hours"],
+        "total_hours": fact["total_hours"],
+        "work_type": fact["work_type"],
+        "is_billable": fact["is_billable"],
+        "billable_hours": fact["billable_hours"],
+        "notes": fact["notes"],
+        "timestamp": fact["timestamp"],
+    }
+
+
+def _summary_facet() -> list[dict[str, Any]]:
+    return [
+        {
+            "$group": {
+                "_id": None,
+                "total_entries": {"$sum": 1},
+                "total_hours": {"$sum": "$total_hours"},
+                "total_overtime": {"$sum": "$overtime_hours"},
+                "total_billable": {"$sum": "$billable_hours"},
+                "projects": {"$addToSet": "$project"},
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "total_entries": 1,
+                "total_hours": {"$round": ["$total_hours", 1]},
+                "total_overtime": {"$round": ["$total_overtime", 1]},
+                "total_billable": {"$round": ["$total_billable", 1]},
+                "unique_projects": {"$size": "$projects"},
+            }
+        },
+    ]
+
+
+_EMPTY_SUMMARY = {
+    "total_entries": 0,
+    "total_hours": 0.0,
+    "total_overtime": 0.0,
+    "total_billable": 0.0,
+    "unique_projects": 0,
+}
+
+
+async def query_entries(
+    query: dict[str, Any],
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    include_entries: bool = True,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """One page of serialized entries plus the summary of every match.
+
+    Both come from a single ``$facet`` aggregation. The sort runs ahead of the
+    ``$facet`` (inside it no index is usable), so it can walk the
+    ``ENTRY_SORT`` index. ``include_entries=False`` skips the sort and the page
+    (summary-only polling) and returns an empty list.
+    """
+    pipeline: list[dict[str, Any]] = [{"$match": query}]
+    facets: dict[str, Any] = {"summary": _summary_facet()}
+    if include_entries and limit > 0:
+        pipeline.append({"$sort": dict(ENTRY_SORT)})
+        facets["entries"] = [{"$skip": offset}, {"$limit": limit}]
+    pipeline.append({"$facet": facets})
+    result = await WorkloadEntryFact.get_pymongo_collection().aggregate(
+        pipeline, allowDiskUse=True
+    ).to_list(None)
+    facet = result[0] if result else {}
+    summary = facet.get("summary") or [_EMPTY_SUMMARY]
+    entries = [
+        serialize_entry(row, offset + index + 1)
+        for index, row in enumerate(facet.get("entries", []))
+    ]
+    return entries, dict(summary[0])
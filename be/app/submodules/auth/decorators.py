@@ -1,20 +1,28 @@
 import inspect
 from functools import wraps
-from typing import Callable, Any, Literal
+from typing import Callable, Any
 from fastapi import HTTPException, status
 
+from app.models.enums import PermissionLiteral
 from app.submodules.auth.dependencies import AuthContext
 
-PermissionLiteral = Literal["write:all", "read:all"]
-
 def allow(required_permissions: list[PermissionLiteral]) -> Callable:
+    # Resolved once per route instead of on every call
+    required = frozenset(required_permissions)
+
     def decorator(func: Callable) -> Callable:
+        context_kwarg: str | None = None
+
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            auth_context: AuthContext | None = next(
-                (arg for arg in kwargs.values() if isinstance(arg, AuthContext)), 
-                None
-            )
+            nonlocal context_kwarg
+            auth_context = kwargs.get(context_kwarg) if context_kwarg else None
+            if not isinstance(auth_context, AuthContext):
+                context_kwarg = next(
+                    (name for name, arg in kwargs.items() if isinstance(arg, AuthContext)),
+                    None,
+                )
+                auth_context = kwargs.get(context_kwarg) if context_kwarg else None
 
             if not auth_context:
                 raise RuntimeError(
@@ -22,13 +30,9 @@ def allow(required_permissions: list[PermissionLiteral]) -> Callable:
                     "but is missing the AuthContext dependency."
                 )
 
-            user_permissions = getattr(auth_context.user, "permissions", [])
-            missing_permissions = [
-                perm for perm in required_permissions 
-                if perm not in user_permissions
-            ]
-
-            if missing_permissions:
+            user_permissions = auth_context.user.permissions
+            if not required <= user_permissions:
+                missing_permissions = sorted(required - user_permissions)
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail=f"Forbidden: Missing permissions {missing_permissions}"
@@ -36,4 +40,4 @@ def allow(required_permissions: list[PermissionLiteral]) -> Callable:
 
             return await func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -14,21 +14,14 @@ class AuthContext(RequestContext):
 async def get_auth_context(request: Request, auth_service: Annotated[AuthService, Depends()]) -> AuthContext:
     token = request.headers.get("Authorization")
 
-    user = await auth_service.user_for_token(token.split(" ")[1] if token else None)
+    identity = await auth_service.identity_for_token(token.split(" ")[1] if token else None)
 
-    if user is None:
+    if identity is None:
         raise HTTPException(status_code=401, detail="Unauthorized")
-    
-    permissions = []
 
-
-    if user.position == "Internal Ops":
-        permissions.append("read:all")
-        permissions.append("write:all")
-    
     return AuthContext(
         request_id=request.headers.get("X-Request-ID", str(uuid.uuid4())),
-        user=RequestContextUser(id=str(user.id), name=user.name, permissions=permissions, employee_id=user.employee_id)
+        user=identity.context_user,
     )
 
 UseAuthService = Annotated[AuthService, Depends()]
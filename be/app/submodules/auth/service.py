@@ -1,18 +1,15 @@
-from app.submodules.session import UseSessionService
-from app.submodules.user import UseUserService, User
+from app.services import auth as auth_service
+from app.services.auth import AuthenticationError, UserNotFoundError
+from app.services.identity import Identity
+
 
 class AuthService:
-    def __init__(self, session_service: UseSessionService, user_service: UseUserService):
-        self.session_service = session_service
-        self.user_service = user_service
+    """v2 entry point to the shared request authentication in ``app.services.auth``."""
 
-    async def user_for_token(self, token: str | None) -> User | None:
+    async def identity_for_token(self, token: str | None) -> Identity | None:
         if token is None:
             return None
-        
-        session = await self.session_service.token_for_session(token)
-        
-        if session is None:
+        try:
+            return await auth_service.resolve_request_identity(token)
+        except (AuthenticationError, UserNotFoundError):
             return None
-        
-        return await self.user_service.get_user_by_id(str(session.user_id))
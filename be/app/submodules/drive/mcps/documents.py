@@ -1,11 +1,29 @@
 from pydantic import BaseModel, Field
 from claude_agent_sdk import create_sdk_mcp_server, tool
 
-from ..documents import Documents
+from app.services import document_search
 
 class GetUserDocumentsArgs(BaseModel):
-    employee_id: str | None = Field(default=None, description="The employee ID of the user to fetch documents for (e.g. QTN-1270). If omitted, returns all documents.")
-    query: str | None = Field(default=None, description="Optional regex query to search within document contents.")
+    employee_id: str | None = Field(
+        default=None,
+        description=(
+            "The employee ID of the user to fetch documents for (e.g. QTN-1270). "
+            "If omitted, returns all documents."
+        ),
+    )
+    query: str | None = Field(
+        default=None,
+        description=(
+            "Optional search words matched against document names, categories and contents "
+            "(the last word also matches as a prefix). Best matches are returned first."
+        ),
+    )
+    limit: int = Field(
+        default=20,
+        ge=1,
+        le=100,
+        description="Maximum number of documents to return when a query is given.",
+    )
 
 @tool(
     name="get_user_documents_content",
@@ -15,35 +33,40 @@ class GetUserDocumentsArgs(BaseModel):
 async def get_user_documents_tool(args: dict) -> dict:
     employee_id = args.get("employee_id")
     query = args.get("query")
-    
-    pipeline = []
-    if employee_id:
-        pipeline.append({ "$match": { "owned_by.id": employee_id } })
-        
-    pipeline.append({
-        "$project": {
-            "_id": 0,
-            "name": 1,
-            "content_html": 1
-        }
-    })
-    
+    limit = int(args.get("limit") or 20)
+
+    from app.db.beanie import get_motor_client
+    from constants import MONGODB_DATABASE
+
+    collection = get_motor_client()[MONGODB_DATABASE].documents
+
     if query:
+        # Ranked lookup through the search_terms index instead of a regex scan over content_html
+        filters = [{"is_deleted": False}]
+        if employee_id:
+            filters.append({"owned_by.id": employee_id})
+        hits, _ = await document_search.search(query, filters, limit=limit)
+        rows = await collection.find(
+            {"_id": {"$in": [hit.object_id for hit in hits]}},
+            {"name": 1, "content_html": 1},
+        ).to_list(length=None)
+        by_id = {row["_id"]: row for row in rows}
+        docs = [by_id[hit.object_id] for hit in hits if hit.object_id in by_id]
+    else:
+        pipeline = []
+        if employee_id:
+            pipeline.append({ "$match": { "owned_by.id": employee_id } })
+
         pipeline.append({
-            "$match": {
-                "$or": [
-                    { "content_html": { "$regex": query, "$options": "i" } },
-                    { "name": { "$regex": query, "$options": "i" } }
-                ]
+            "$project": {
+                "_id": 0,
+                "name": 1,
+                "content_html": 1
             }
         })
-    
-    from app.db.beanie import get_motor_client
-    from constants import MONGODB_DATABASE
-    
-    motor_client = get_motor_client()
-    cursor = motor_client[MONGODB_DATABASE].documents.aggregate(pipeline)
-    docs = await cursor.to_list(length=None)
+
+        cursor = collection.aggregate(pipeline)
+        docs = await cursor.to_list(length=None)
     
     if not docs:
         msg = f"No documents found for employee {employee_id}." if employee_id else "No documents found."
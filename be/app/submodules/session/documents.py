@@ -1,30 +1,9 @@
-from __future__ import annotations
+"""Session token document.
 
-from datetime import datetime, UTC
+The v2 submodules share the ``session_tokens`` collection with the v1 auth
+service, so they use the same model instead of registering a second one.
+"""
 
-from beanie import Document, PydanticObjectId
-from pydantic import Field
+from app.models.session_token import SessionToken
 
-class SessionToken(Document):
-    user_id: PydanticObjectId
-    token_hash: str
-    issued_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
-    expires_at: datetime
-    revoked: bool = False
-
-    class Settings:
-        name = "session_tokens"
-        indexes = ["token_hash", "user_id"]
-
-    @property
-    def is_expired(self) -> bool:
-        expiry = self.expires_at
-        if expiry.tzinfo is None:
-            expiry = expiry.replace(tzinfo=UTC)
-        return datetime.now(UTC) > expiry
-
-    async def revoke(self) -> None:
-        if self.revoked:
-            return
-        self.revoked = True
-        await self.save()
+__all__ = ["SessionToken"]
@@ -1,37 +1,9 @@
-from __future__ import annotations
+"""User document.
 
-from datetime import datetime, UTC
+The v2 submodules share the ``users`` collection with the v1 services, so they
+use the same model instead of registering a second one.
+"""
 
-from beanie import Document, PydanticObjectId
-from pydantic import EmailStr, Field, HttpUrl
+from app.models.user import User
 
-from app.models.enums import EmploymentTypeLiteral, PositionLiteral
-
-
-def _utcnow() -> datetime:
-    return datetime.now(UTC)
-
-class User(Document):
-    employee_id: str | None = None
-    name: str
-    email: EmailStr
-    title: str | None = None
-    division: str | None = None
-    level: str | None = None
-    position: PositionLiteral | None = None
-    employment_type: EmploymentTypeLiteral = Field(default="full-time")
-    subordinates: list[str] = Field(default_factory=list)
-    projects: list[str] = Field(default_factory=list)
-    avatar: HttpUrl | None = None
-    hashed_password: str
-    is_active: bool = True
-    created_at: datetime = Field(default_factory=_utcnow)
-    updated_at: datetime = Field(default_factory=_utcnow)
-
-    class Settings:
-        name = "users"
-        indexes = ["email", "employee_id"]
-
-    async def touch(self) -> None:
-        self.updated_at = _utcnow()
-        await self.save()
+__all__ = ["User"]
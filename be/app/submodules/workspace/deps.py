@@ -14,12 +14,12 @@ from .models import WorkspaceMetadata
 async def auth_owner_id(authorization: str = Header(alias="Authorization")) -> str:
     try:
         token = auth_service.parse_bearer_token(authorization)
-        profile = await auth_service.get_user_profile_from_token(token)
+        profile = await auth_service.get_request_profile(token)
     except AuthenticationError as exc:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     except UserNotFoundError as exc:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
-    return str(profile["id"])
+    return profile.id
 
 
 async def get_owned_workspace(workspace_id: str, owner_id: str) -> WorkspaceMetadata:
@@ -46,6 +46,53 @@ MONGODB_DATABASE: str = os.getenv("MONGODB_DATABASE", "systemq")
 
 SECRET_KEY: str = os.getenv("SECRET_KEY", "change-me")
 RESET_TOKEN_EXPIRE_MINUTES: int = _get_int("RESET_TOKEN_EXPIRE_MINUTES", 30)
+# Autosave edits by one editor within this window share one history revision (0 = write-through)
+DOCUMENT_EDIT_COALESCE_SECONDS: int = _get_int("DOCUMENT_EDIT_COALESCE_SECONDS", 10)
+# Interval of the background folder item_count reconciler (0 = disabled)
+DOCUMENT_ITEM_COUNT_RECONCILE_SECONDS: int = _get_int("DOCUMENT_ITEM_COUNT_RECONCILE_SECONDS", 3600)
+# Resolved session tokens are cached per worker for this long (0 = disabled)
+SESSION_CACHE_TTL_SECONDS: int = _get_int("SESSION_CACHE_TTL_SECONDS", 60)
+# Tokens that do not resolve are remembered for this long
+SESSION_CACHE_NEGATIVE_TTL_SECONDS: int = _get_int("SESSION_CACHE_NEGATIVE_TTL_SECONDS", 10)
+SESSION_CACHE_MAX_ENTRIES: int = _get_int("SESSION_CACHE_MAX_ENTRIES", 10000)
+# Broadcast cache evictions to other workers: "" (single worker) or "mongo"
+SESSION_CACHE_INVALIDATION_CHANNEL: str = os.getenv("SESSION_CACHE_INVALIDATION_CHANNEL", "")
+# Issue signed session tokens validated from their claims plus an in-memory revocation list
+SESSION_TOKEN_STATELESS: bool = _get_bool("SESSION_TOKEN_STATELESS", False)
+# Renew opaque session tokens by extending their row in place instead of revoke + insert
+SESSION_SLIDING_RENEWAL: bool = _get_bool("SESSION_SLIDING_RENEWAL", False)
+# Issue a new token value on sliding renewal (the old one stops working)
+SESSION_RENEWAL_ROTATE: bool = _get_bool("SESSION_RENEWAL_ROTATE", True)
+# Sliding renewal never extends a session beyond this age (0 = no limit)
+SESSION_MAX_LIFETIME_SECONDS: int = _get_int("SESSION_MAX_LIFETIME_SECONDS", 7 * 24 * 60 * 60)
+# How often each worker pulls new revocations from session_tokens
+SESSION_REVOCATION_REFRESH_SECONDS: int = _get_int("SESSION_REVOCATION_REFRESH_SECONDS", 5)
+# Interval of the background session/reset token compaction job (0 = disabled)
+TOKEN_COMPACTION_INTERVAL_SECONDS: int = _get_int("TOKEN_COMPACTION_INTERVAL_SECONDS", 3600)
+# How often each worker checks the role permission registry version for changes
+PERMISSION_REGISTRY_REFRESH_SECONDS: int = _get_int("PERMISSION_REGISTRY_REFRESH_SECONDS", 10)
+# Login attempts per client IP: burst size and sustained rate (0 = unlimited)
+LOGIN_RATE_IP_BURST: int = _get_int("LOGIN_RATE_IP_BURST", 20)
+LOGIN_RATE_IP_PER_MINUTE: int = _get_int("LOGIN_RATE_IP_PER_MINUTE", 20)
+# Login attempts per email: burst size and sustained rate (0 = unlimited)
+LOGIN_RATE_EMAIL_BURST: int = _get_int("LOGIN_RATE_EMAIL_BURST", 5)
+LOGIN_RATE_EMAIL_PER_MINUTE: int = _get_int("LOGIN_RATE_EMAIL_PER_MINUTE", 5)
+# Lockout after consecutive failures doubles from the base up to the max (base 0 = disabled)
+LOGIN_BACKOFF_BASE_SECONDS: int = _get_int("LOGIN_BACKOFF_BASE_SECONDS", 1)
+LOGIN_BACKOFF_MAX_SECONDS: int = _get_int("LOGIN_BACKOFF_MAX_SECONDS", 300)
+# A failure streak is forgotten after this long without failures
+LOGIN_FAILURE_WINDOW_SECONDS: int = _get_int("LOGIN_FAILURE_WINDOW_SECONDS", 900)
+LOGIN_THROTTLE_MAX_KEYS: int = _get_int("LOGIN_THROTTLE_MAX_KEYS", 100000)
+# Where failure streaks are kept: "" (per worker) or "mongo" (shared)
+LOGIN_THROTTLE_BACKEND: str = os.getenv("LOGIN_THROTTLE_BACKEND", "")
+# Rebuild the in-memory org graph after this long (picks up writes from other workers)
+ORG_GRAPH_TTL_SECONDS: int = _get_int("ORG_GRAPH_TTL_SECONDS", 60)
+# PBKDF2 cost for new hashes; stored hashes with another count are upgraded on login
+PASSWORD_HASH_ITERATIONS: int = _get_int("PASSWORD_HASH_ITERATIONS", 390000)
+# Threads dedicated to password hashing (= hashes computed concurrently per worker)
+PASSWORD_HASH_WORKERS: int = _get_int("PASSWORD_HASH_WORKERS", 2)
+# Log a warning when a hash waits this long for a free hashing thread
+PASSWORD_HASH_QUEUE_WARN_MS: int = _get_int("PASSWORD_HASH_QUEUE_WARN_MS", 500)
 
 SMTP_HOST: str = os.getenv("SMTP_HOST", "localhost")
 SMTP_PORT: int = _get_int("SMTP_PORT", 1025)
@@ -0,0 +1,112 @@
+"""
+Migration script to materialize inherited grants on documents.
+
+Inherited access is read from each document's ``inherited_grants`` (the direct
+grants of its ancestor folders, one entry per grantee and source folder)
+instead of walking the parent chain. New writes keep the field current; this
+script computes it for existing documents.
+
+The script:
+1. Loads every active document (metadata and permissions only), shallowest first
+2. Derives each document's entries from its parent's entries plus the parent's own grants
+3. Writes the field back with bulk updates
+
+Requires ``ancestor_ids`` (see migrate_document_ancestors.py).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from app.models.document import DocumentItem, DocumentSummary
+from app.services.document_acl import grants_for_children
+
+
+async def migrate_document_acl(dry_run: bool = False, batch_size: int = 500) -> None:
+    """Populate ``inherited_grants`` for every active document."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("Error: MONGODB_URI environment variable not set")
+        print("Please set it in your .env file or export it")
+        return
+
+    db_name = os.getenv("MONGODB_DATABASE", "systemq")
+
+    client = AsyncIOMotorClient(mongodb_uri)
+    db = client[db_name]
+
+    # Initialize Beanie for proper model handling (also builds the inherited_grants index)
+    await init_beanie(database=db, document_models=[DocumentItem])
+
+    print(f"Connected to database: {db_name}")
+    print(f"Mode: {'DRY RUN (no changes will be made)' if dry_run else 'LIVE MIGRATION'}")
+    print("=" * 60)
+
+    documents = await DocumentItem.find(
+        {"is_deleted": False},
+        projection_model=DocumentSummary,
+    ).to_list()
+    documents.sort(key=lambda document: len(document.ancestor_ids))
+    print(f"Found {len(documents)} active document(s)")
+
+    by_key: dict[tuple[str, ...], DocumentSummary] = {}
+    orphans = 0
+    batch: list[UpdateOne] = []
+    for position, document in enumerate(documents, start=1):
+        parent = by_key.get(tuple(document.ancestor_ids)) if document.ancestor_ids else None
+        if document.ancestor_ids and parent is None:
+            orphans += 1
+        document.inherited_grants = grants_for_children(parent) if parent else []
+        by_key[(*document.ancestor_ids, document.document_id)] = document
+
+        batch.append(
+            UpdateOne(
+                {"_id": document.object_id},
+                {
+                    "$set": {
+                        "inherited_grants": [
+                            entry.model_dump() for entry in document.inherited_grants
+                        ]
+                    }
+                },
+            )
+        )
+        if len(batch) >= batch_size:
+            if not dry_run:
+                await DocumentItem.get_pymongo_collection().bulk_write(batch, ordered=False)
+            batch = []
+            print(f"  Progress: {position}/{len(documents)} documents processed")
+
+    if batch and not dry_run:
+        await DocumentItem.get_pymongo_collection().bulk_write(batch, ordered=False)
+
+    client.close()
+    print("=" * 60)
+    print("Migration Summary:")
+    print(f"  Documents processed: {len(documents)}")
+    print(f"  Documents with a missing ancestor (no inherited grants): {orphans}")
+    if dry_run:
+        print("\n⚠️  This was a DRY RUN. No changes were made to the database.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Materialize inherited document grants")
+    parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
+    parser.add_argument("--batch-size", type=int, default=500, help="Updates per bulk write")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    env_path = Path(__file__).parent.parent / ".env"
+    load_dotenv(env_path)
+
+    asyncio.run(migrate_document_acl(dry_run=args.dry_run, batch_size=args.batch_size))
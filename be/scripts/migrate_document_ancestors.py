@@ -0,0 +1,134 @@
+"""
+Migration script to backfill the materialized ``ancestor_ids`` array on documents.
+
+Breadcrumbs, path-id lookups and subtree rename/move/delete read ``ancestor_ids``
+instead of walking ``parent_id`` one query per level, so every existing document
+needs the field populated once.
+
+The script:
+1. Loads the id/parent_id of every document in one pass
+2. Resolves each document's ancestor chain in memory (root first)
+3. Writes the arrays back with batched bulk updates, skipping documents that
+   are already up to date
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+
+def _resolve_ancestors(
+    document_id: str,
+    parents: dict[str, str | None],
+    cache: dict[str, list[str]],
+) -> list[str]:
+    """Return the ancestor ids of ``document_id`` (root first), guarding against cycles."""
+    if document_id in cache:
+        return cache[document_id]
+
+    chain: list[str] = []
+    seen = {document_id}
+    current = parents.get(document_id)
+    while current and current not in seen:
+        if current in cache:
+            chain = cache[current] + [current] + chain
+            break
+        chain.insert(0, current)
+        seen.add(current)
+        current = parents.get(current)
+
+    cache[document_id] = chain
+    return chain
+
+
+async def migrate_document_ancestors(dry_run: bool = False, batch_size: int = 500) -> None:
+    """Backfill ``ancestor_ids`` for every document in the collection."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("Error: MONGODB_URI environment variable not set")
+        print("Please set it in your .env file or export it")
+        return
+
+    db_name = os.getenv("MONGODB_DATABASE", "systemq")
+
+    client = AsyncIOMotorClient(mongodb_uri)
+    collection = client[db_name]["documents"]
+
+    print(f"Connected to database: {db_name}")
+    print(f"Mode: {'DRY RUN (no changes will be made)' if dry_run else 'LIVE MIGRATION'}")
+    print("=" * 60)
+
+    documents: list[dict[str, Any]] = []
+    # Parent links resolve to the active document first, matching the service lookups
+    parents: dict[str, str | None] = {}
+    active_ids: set[str] = set()
+    async for doc in collection.find(
+        {}, {"_id": 1, "id": 1, "parent_id": 1, "ancestor_ids": 1, "is_deleted": 1}
+    ):
+        documents.append(doc)
+        document_id = doc.get("id")
+        if not document_id:
+            continue
+        is_active = not doc.get("is_deleted", False)
+        if document_id not in parents or (is_active and document_id not in active_ids):
+            parents[document_id] = doc.get("parent_id")
+        if is_active:
+            active_ids.add(document_id)
+
+    print(f"Loaded {len(documents)} document(s)")
+
+    cache: dict[str, list[str]] = {}
+    operations: list[UpdateOne] = []
+    for doc in documents:
+        parent_id = doc.get("parent_id")
+        if parent_id:
+            ancestors = _resolve_ancestors(parent_id, parents, cache) + [parent_id]
+        else:
+            ancestors = []
+        if doc.get("ancestor_ids") == ancestors:
+            continue
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"ancestor_ids": ancestors}}))
+
+    print(f"{len(operations)} document(s) need ancestor_ids updates")
+
+    if dry_run or not operations:
+        if dry_run:
+            print("\n⚠️  This was a DRY RUN. No changes were made to the database.")
+        client.close()
+        return
+
+    modified = 0
+    for start in range(0, len(operations), batch_size):
+        batch = operations[start : start + batch_size]
+        result = await collection.bulk_write(batch, ordered=False)
+        modified += result.modified_count
+        print(f"  Progress: {min(start + batch_size, len(operations))}/{len(operations)}")
+
+    # Beanie builds the index on startup, but make sure it exists for the new queries right away
+    await collection.create_index("ancestor_ids")
+
+    client.close()
+    print(f"\n✅ Migration completed! Modified {modified} document(s)")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    env_path = Path(__file__).parent.parent / ".env"
+    load_dotenv(env_path)
+
+    parser = argparse.ArgumentParser(description="Backfill DocumentItem.ancestor_ids")
+    parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
+    parser.add_argument("--batch-size", type=int, default=500, help="Updates per bulk write")
+    args = parser.parse_args()
+
+    asyncio.run(migrate_document_ancestors(dry_run=args.dry_run, batch_size=args.batch_size))
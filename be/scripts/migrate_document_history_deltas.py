@@ -0,0 +1,143 @@
+"""
+Migration script to compact ``document_history`` into keyframes plus deltas.
+
+Older revisions each stored a full snapshot and the complete old/new body in
+``changes``. This script rewrites every document's history in the current
+format and seeds the ``document_history_heads`` row that allocates revision
+numbers, so new revisions continue the sequence instead of restarting at 1.
+
+The script, per document:
+1. Loads its revisions in order and replays them into full snapshots
+2. Renumbers them 1..n (the old count-based numbering could produce duplicates)
+3. Keeps a full snapshot every KEYFRAME_INTERVAL revisions and stores a delta otherwise
+4. Upserts the head row with the latest revision and snapshot
+
+Run it while document editing is paused: revisions written mid-run may be renumbered.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne, UpdateOne
+
+from app.services.document_history import (
+    KEYFRAME_INTERVAL,
+    _compact_changes,
+    apply_patch,
+    diff_snapshots,
+)
+
+
+def _rewrite(rows: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Return the rewritten rows and the final snapshot for one document."""
+    rewritten: list[dict[str, Any]] = []
+    previous: dict[str, Any] = {}
+    current: dict[str, Any] = {}
+    for index, row in enumerate(rows, start=1):
+        if row.get("kind") == "delta":
+            current = apply_patch(current, row.get("patch") or {})
+        else:
+            current = row.get("snapshot") or {}
+
+        new_row = {
+            key: value
+            for key, value in row.items()
+            if key not in {"snapshot", "patch", "kind", "revision", "changes"}
+        }
+        new_row["revision"] = index
+        new_row["changes"] = _compact_changes(row.get("changes") or {})
+        if index == 1 or index % KEYFRAME_INTERVAL == 1:
+            new_row["kind"] = "keyframe"
+            new_row["snapshot"] = current
+            new_row["patch"] = None
+        else:
+            new_row["kind"] = "delta"
+            new_row["snapshot"] = {}
+            new_row["patch"] = diff_snapshots(previous, current)
+        rewritten.append(new_row)
+        previous = current
+    return rewritten, current
+
+
+async def migrate_document_history(dry_run: bool = False) -> None:
+    """Rewrite document history rows as keyframes and deltas."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("Error: MONGODB_URI environment variable not set")
+        print("Please set it in your .env file or export it")
+        return
+
+    db_name = os.getenv("MONGODB_DATABASE", "systemq")
+
+    client = AsyncIOMotorClient(mongodb_uri)
+    db = client[db_name]
+    history = db["document_history"]
+    heads = db["document_history_heads"]
+
+    print(f"Connected to database: {db_name}")
+    print(f"Mode: {'DRY RUN (no changes will be made)' if dry_run else 'LIVE MIGRATION'}")
+    print("=" * 60)
+
+    document_ids = await history.distinct("document_id")
+    print(f"Found history for {len(document_ids)} document(s)")
+
+    bytes_before = 0
+    bytes_after = 0
+    rows_total = 0
+    for position, document_id in enumerate(document_ids, start=1):
+        rows = await history.find({"document_id": document_id}).sort(
+            [("revision", 1), ("created_at", 1), ("_id", 1)]
+        ).to_list(length=None)
+        rewritten, latest = _rewrite(rows)
+
+        rows_total += len(rows)
+        bytes_before += sum(len(bson.encode(row)) for row in rows)
+        bytes_after += sum(len(bson.encode(row)) for row in rewritten)
+
+        if not dry_run:
+            await history.bulk_write(
+                [ReplaceOne({"_id": row["_id"]}, row) for row in rewritten],
+                ordered=False,
+            )
+            await heads.bulk_write(
+                [
+                    UpdateOne(
+                        {"document_id": document_id},
+                        {"$set": {"revision": len(rewritten), "snapshot": latest}},
+                        upsert=True,
+                    )
+                ]
+            )
+        if position % 100 == 0:
+            print(f"  Progress: {position}/{len(document_ids)} documents processed")
+
+    client.close()
+    print("=" * 60)
+    print("Migration Summary:")
+    print(f"  Revisions processed: {rows_total}")
+    print(f"  History size before: {bytes_before / 1024 / 1024:.2f} MiB")
+    print(f"  History size after:  {bytes_after / 1024 / 1024:.2f} MiB")
+    if dry_run:
+        print("\n⚠️  This was a DRY RUN. No changes were made to the database.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact document history into deltas")
+    parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    env_path = Path(__file__).parent.parent / ".env"
+    load_dotenv(env_path)
+
+    asyncio.run(migrate_document_history(dry_run=args.dry_run))
@@ -0,0 +1,114 @@
+"""
+Migration script to build the document search index fields.
+
+Document search reads ``search_terms`` (distinct tokens from name, category and
+HTML-stripped content) and ``content_text`` instead of running regexes over
+``content_html``. New writes maintain both fields; this script fills them in for
+documents created before the search index existed.
+
+The script:
+1. Streams documents in batches
+2. Recomputes ``content_text``/``search_terms`` with the same helpers the service uses
+3. Writes the fields back with bulk updates
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from app.models.document import DocumentItem
+from app.services.document_search import apply_search_fields
+
+
+async def migrate_document_search_index(
+    dry_run: bool = False,
+    batch_size: int = 200,
+    only_missing: bool = False,
+) -> None:
+    """Populate search index fields for existing documents."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("Error: MONGODB_URI environment variable not set")
+        print("Please set it in your .env file or export it")
+        return
+
+    db_name = os.getenv("MONGODB_DATABASE", "systemq")
+
+    client = AsyncIOMotorClient(mongodb_uri)
+    db = client[db_name]
+
+    # Initialize Beanie for proper model handling (also builds the search_terms index)
+    await init_beanie(database=db, document_models=[DocumentItem])
+
+    print(f"Connected to database: {db_name}")
+    print(f"Mode: {'DRY RUN (no changes will be made)' if dry_run else 'LIVE MIGRATION'}")
+    print("=" * 60)
+
+    query = {"search_terms": {"$in": [None, []]}} if only_missing else {}
+    total = await DocumentItem.find(query).count()
+    print(f"Found {total} document(s) to index")
+
+    processed = 0
+    batch: list[UpdateOne] = []
+    async for document in DocumentItem.find(query):
+        apply_search_fields(document)
+        batch.append(
+            UpdateOne(
+                {"_id": document.id},
+                {
+                    "$set": {
+                        "content_text": document.content_text,
+                        "search_terms": document.search_terms,
+                    }
+                },
+            )
+        )
+        processed += 1
+        if len(batch) >= batch_size:
+            if not dry_run:
+                await DocumentItem.get_pymongo_collection().bulk_write(batch, ordered=False)
+            batch = []
+            print(f"  Progress: {processed}/{total} documents processed")
+
+    if batch and not dry_run:
+        await DocumentItem.get_pymongo_collection().bulk_write(batch, ordered=False)
+
+    client.close()
+    print("=" * 60)
+    print(f"Indexed {processed} document(s)")
+    if dry_run:
+        print("\n⚠️  This was a DRY RUN. No changes were made to the database.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build document search index fields")
+    parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
+    parser.add_argument("--batch-size", type=int, default=200, help="Updates per bulk write")
+    parser.add_argument(
+        "--only-missing",
+        action="store_true",
+        help="Skip documents that already have search terms",
+    )
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    env_path = Path(__file__).parent.parent / ".env"
+    load_dotenv(env_path)
+
+    asyncio.run(
+        migrate_document_search_index(
+            dry_run=args.dry_run,
+            batch_size=args.batch_size,
+            only_missing=args.only_missing,
+        )
+    )
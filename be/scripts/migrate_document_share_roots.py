@@ -0,0 +1,87 @@
+"""
+Migration script to build the ``document_share_roots`` index.
+
+The non-admin root listing reads the topmost directly-shared documents of the
+user from ``document_share_roots`` instead of scanning every document the user
+owns or is granted. New writes keep the index current; this script builds it
+for existing documents.
+
+The script:
+1. Clears the index (unless --dry-run)
+2. Walks every top-level document and recomputes the rows of its whole subtree
+   with the same helper the services use
+
+Requires ``ancestor_ids`` (see migrate_document_ancestors.py).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.document import DocumentItem, DocumentShareRoot, DocumentSummary
+from app.services.document_share_roots import refresh_share_roots
+
+
+async def migrate_document_share_roots(dry_run: bool = False) -> None:
+    """Rebuild the share-roots index from the documents collection."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("Error: MONGODB_URI environment variable not set")
+        print("Please set it in your .env file or export it")
+        return
+
+    db_name = os.getenv("MONGODB_DATABASE", "systemq")
+
+    client = AsyncIOMotorClient(mongodb_uri)
+    db = client[db_name]
+
+    # Initialize Beanie for proper model handling (also builds the index collection's indexes)
+    await init_beanie(database=db, document_models=[DocumentItem, DocumentShareRoot])
+
+    print(f"Connected to database: {db_name}")
+    print(f"Mode: {'DRY RUN (no changes will be made)' if dry_run else 'LIVE MIGRATION'}")
+    print("=" * 60)
+
+    roots = await DocumentItem.find(
+        {"parent_id": None, "is_deleted": False},
+        projection_model=DocumentSummary,
+    ).to_list()
+    print(f"Found {len(roots)} top-level document(s)")
+
+    if dry_run:
+        existing = await DocumentShareRoot.find_all().count()
+        print(f"  Existing index rows: {existing}")
+    else:
+        await DocumentShareRoot.find_all().delete()
+        for position, root in enumerate(roots, start=1):
+            await refresh_share_roots(root)
+            if position % 100 == 0:
+                print(f"  Progress: {position}/{len(roots)} subtrees indexed")
+
+    total = await DocumentShareRoot.find_all().count()
+    client.close()
+    print("=" * 60)
+    print(f"Share-roots index rows: {total}")
+    if dry_run:
+        print("\n⚠️  This was a DRY RUN. No changes were made to the database.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the document share-roots index")
+    parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    env_path = Path(__file__).parent.parent / ".env"
+    load_dotenv(env_path)
+
+    asyncio.run(migrate_document_share_roots(dry_run=args.dry_run))
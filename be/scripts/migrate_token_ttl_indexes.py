@@ -0,0 +1,106 @@
+"""
+Migration script to add TTL expiry to the session and password reset tokens.
+
+``session_tokens`` and ``password_reset_tokens`` used to keep every row
+forever. Both models now declare a TTL index on ``expires_at``; the app builds
+it at start-up on fresh collections, and this script brings existing ones in
+line and clears the backlog.
+
+The script:
+1. Reports row counts and data/index sizes of both collections
+2. Builds the ``expires_at`` TTL index (replacing any plain index on that key)
+3. Deletes rows the TTL index will not remove: non-date ``expires_at``, expired
+   rows, used reset tokens and (without stateless sessions) revoked sessions
+4. Reports the sizes again
+
+MongoDB's TTL monitor runs about once a minute, so expired rows still present
+right after step 2 are removed by step 3 rather than waited for.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models import PasswordResetToken, SessionToken
+from app.services.token_maintenance import (
+    collection_sizes,
+    compact_tokens,
+    count_compactable,
+    ensure_ttl_indexes,
+)
+
+
+def _print_sizes(title: str, sizes: dict) -> None:
+    print(title)
+    for name, stats in sizes.items():
+        print(
+            f"  {name}: {stats['count']} rows, "
+            f"data {stats['size'] / 1024:.1f} KiB, "
+            f"storage {stats['storage_size'] / 1024:.1f} KiB, "
+            f"indexes {stats['total_index_size'] / 1024:.1f} KiB"
+        )
+        for index_name, index_size in stats["index_sizes"].items():
+            print(f"    - {index_name}: {index_size / 1024:.1f} KiB")
+
+
+async def migrate_token_ttl_indexes(dry_run: bool = False) -> None:
+    """Build the TTL indexes and compact the token collections."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("Error: MONGODB_URI environment variable not set")
+        print("Please set it in your .env file or export it")
+        return
+
+    db_name = os.getenv("MONGODB_DATABASE", "systemq")
+
+    client = AsyncIOMotorClient(mongodb_uri)
+    db = client[db_name]
+
+    # Indexes are handled below: a plain expires_at index would make Beanie's index build fail
+    await init_beanie(
+        database=db,
+        document_models=[SessionToken, PasswordResetToken],
+        skip_indexes=True,
+    )
+
+    print(f"Connected to database: {db_name}")
+    print(f"Mode: {'DRY RUN (no changes will be made)' if dry_run else 'LIVE MIGRATION'}")
+    print("=" * 60)
+
+    _print_sizes("Before:", await collection_sizes())
+
+    if dry_run:
+        for name, count in (await count_compactable()).items():
+            print(f"  {name}: {count} row(s) would be deleted")
+    else:
+        changed = await ensure_ttl_indexes()
+        print(f"TTL index built on: {', '.join(changed) or 'nothing (already present)'}")
+        for name, count in (await compact_tokens()).items():
+            print(f"  {name}: {count} row(s) deleted")
+        _print_sizes("After:", await collection_sizes())
+
+    client.close()
+    print("=" * 60)
+    if dry_run:
+        print("\n⚠️  This was a DRY RUN. No changes were made to the database.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add TTL expiry to session and reset tokens")
+    parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    env_path = Path(__file__).parent.parent / ".env"
+    load_dotenv(env_path)
+
+    asyncio.run(migrate_token_ttl_indexes(dry_run=args.dry_run))
@@ -0,0 +1,87 @@
+"""
+Migration script to build the employee directory search fields.
+
+Directory search reads ``search_terms`` (distinct tokens from name, email,
+employee_id, title, division, level and position) through the
+``(is_active, search_terms)`` index instead of loading every user. New writes
+maintain the field; this script fills it in for users created before.
+
+The script:
+1. Streams users in batches
+2. Recomputes ``search_terms`` with the same helper the model uses
+3. Writes the field back with bulk updates
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from app.models.user import User
+
+
+async def migrate_user_search_index(dry_run: bool = False, batch_size: int = 200) -> None:
+    """Populate directory search terms for existing users."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("Error: MONGODB_URI environment variable not set")
+        print("Please set it in your .env file or export it")
+        return
+
+    db_name = os.getenv("MONGODB_DATABASE", "systemq")
+
+    client = AsyncIOMotorClient(mongodb_uri)
+    db = client[db_name]
+
+    # Initialize Beanie for proper model handling (also builds the directory indexes)
+    await init_beanie(database=db, document_models=[User])
+
+    print(f"Connected to database: {db_name}")
+    print(f"Mode: {'DRY RUN (no changes will be made)' if dry_run else 'LIVE MIGRATION'}")
+    print("=" * 60)
+
+    total = await User.find_all().count()
+    print(f"Found {total} user(s) to index")
+
+    processed = 0
+    batch: list[UpdateOne] = []
+    async for user in User.find_all():
+        user.refresh_search_terms()
+        batch.append(UpdateOne({"_id": user.id}, {"$set": {"search_terms": user.search_terms}}))
+        processed += 1
+        if len(batch) >= batch_size:
+            if not dry_run:
+                await User.get_pymongo_collection().bulk_write(batch, ordered=False)
+            batch = []
+            print(f"  Progress: {processed}/{total} users processed")
+
+    if batch and not dry_run:
+        await User.get_pymongo_collection().bulk_write(batch, ordered=False)
+
+    client.close()
+    print("=" * 60)
+    print(f"Indexed {processed} user(s)")
+    if dry_run:
+        print("\n⚠️  This was a DRY RUN. No changes were made to the database.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build employee directory search fields")
+    parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
+    parser.add_argument("--batch-size", type=int, default=200, help="Updates per bulk write")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    env_path = Path(__file__).parent.parent / ".env"
+    load_dotenv(env_path)
+
+    asyncio.run(migrate_user_search_index(dry_run=args.dry_run, batch_size=args.batch_size))
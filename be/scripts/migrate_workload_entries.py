@@ -0,0 +1,100 @@
+"""
+Migration script to backfill the workload entry fact table.
+
+Workload reports read ``workload_entries`` (one row per workload summary item,
+with the mapped project, hour split, billable flag and work type precomputed)
+instead of re-deriving entries from every parsed Slack message. The parser
+keeps the table current for new messages; this script builds it for messages
+parsed before.
+
+The script:
+1. Loads the project mappings once
+2. Streams parsed Slack messages
+3. Replaces each message's facts with the ones derived by the service
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from beanie import init_beanie
+from beanie.odm.utils.dump import get_dict
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DeleteMany, InsertOne
+
+from app.models.project_mapping import ProjectMapping
+from app.models.slack_message import SlackMessage
+from app.models.workload_entry import WorkloadEntryFact
+from app.services.workload_entries import build_entry_facts
+
+
+async def migrate_workload_entries(dry_run: bool = False, batch_size: int = 200) -> None:
+    """Derive workload entry facts for every parsed Slack message."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("Error: MONGODB_URI environment variable not set")
+        print("Please set it in your .env file or export it")
+        return
+
+    db_name = os.getenv("MONGODB_DATABASE", "systemq")
+
+    client = AsyncIOMotorClient(mongodb_uri)
+    db = client[db_name]
+
+    # Initialize Beanie for proper model handling (also builds the fact table indexes)
+    await init_beanie(
+        database=db, document_models=[ProjectMapping, SlackMessage, WorkloadEntryFact]
+    )
+
+    print(f"Connected to database: {db_name}")
+    print(f"Mode: {'DRY RUN (no changes will be made)' if dry_run else 'LIVE MIGRATION'}")
+    print("=" * 60)
+
+    project_mappings = await ProjectMapping.find_all().to_list()
+    query = {"parsed_result": {"$ne": None}}
+    total = await SlackMessage.find(query).count()
+    print(f"Found {total} parsed message(s) and {len(project_mappings)} project mapping(s)")
+
+    collection = WorkloadEntryFact.get_pymongo_collection()
+    processed = 0
+    entries = 0
+    batch: list[DeleteMany | InsertOne] = []
+    async for message in SlackMessage.find(query):
+        facts = build_entry_facts(message, project_mappings)
+        batch.append(DeleteMany({"message_id": message.id}))
+        batch.extend(InsertOne(get_dict(fact, to_db=True)) for fact in facts)
+        processed += 1
+        entries += len(facts)
+        if processed % batch_size == 0:
+            if not dry_run:
+                await collection.bulk_write(batch, ordered=True)
+            batch = []
+            print(f"  Progress: {processed}/{total} messages processed")
+
+    if batch and not dry_run:
+        await collection.bulk_write(batch, ordered=True)
+
+    client.close()
+    print("=" * 60)
+    print(f"Derived {entries} workload entr(ies) from {processed} message(s)")
+    if dry_run:
+        print("\n⚠️  This was a DRY RUN. No changes were made to the database.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the workload entry fact table")
+    parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
+    parser.add_argument("--batch-size", type=int, default=200, help="Messages per bulk write")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    env_path = Path(__file__).parent.parent / ".env"
+    load_dotenv(env_path)
+
+    asyncio.run(migrate_workload_entries(dry_run=args.dry_run, batch_size=args.batch_size))
@@ -0,0 +1,32 @@
+"""Shared test setup.
+
+Beanie models need ``init_beanie`` before they can be instantiated. The tests
+never touch MongoDB: models are bound to an unreachable client, and anything
+that would query is replaced per test.
+"""
+
+import asyncio
+
+import pytest
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models import SessionToken, User
+
+
+@pytest.fixture(scope="session", autouse=True)
+def beanie_models() -> None:
+    async def _init() -> None:
+        client = AsyncIOMotorClient("mongodb://localhost:1", serverSelectionTimeoutMS=100)
+        database = client["tests"]
+
+        # init_beanie asks the server for its version; answer without connecting
+        async def command(*args, **kwargs):
+            return {"version": "7.0.0"}
+
+        database.command = command
+        await init_beanie(
+            database=database, document_models=[User, SessionToken], skip_indexes=True
+        )
+
+    asyncio.run(_init())
@@ -0,0 +1,226 @@
+"""Signed session tokens and their resolution to a request identity."""
+
+import asyncio
+import base64
+import json
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.core import security
+from app.core.security import (
+    decode_signed_session_token,
+    generate_session_token,
+    generate_signed_session_token,
+)
+from app.core.session_cache import SessionCache
+from app.core.session_revocations import SessionRevocations
+from app.models import SessionToken, User
+from app.services import auth
+from app.services.auth import AuthenticationError, resolve_request_identity
+
+
+def _encode(claims: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+
+
+def _signed(claims: dict) -> str:
+    message = f"s1.{_encode(claims)}"
+    return f"{message}.{security._sign(message)}"
+
+
+# ---------- decode_signed_session_token ----------
+
+
+def test_signed_token_round_trip():
+    token, expires_at = generate_signed_session_token("user-1")
+
+    claims = decode_signed_session_token(token)
+
+    assert claims is not None
+    assert claims.user_id == "user-1"
+    assert claims.expires_at == expires_at
+
+
+def test_tampered_signature_is_rejected():
+    token, _ = generate_signed_session_token("user-1")
+    message, _, signature = token.rpartition(".")
+    forged = "0" if signature[-1] != "0" else "1"
+
+    assert decode_signed_session_token(f"{message}.{signature[:-1]}{forged}") is None
+
+
+def test_tampered_payload_is_rejected():
+    token, _ = generate_signed_session_token("user-1")
+    _, encoded, signature = token.split(".")
+    claims = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+    claims["sub"] = "user-2"
+
+    assert decode_signed_session_token(f"s1.{_encode(claims)}.{signature}") is None
+
+
+@pytest.mark.parametrize("token", ["", "s1.", "s1..", "s2.abc.def", "not-a-token"])
+def test_malformed_token_is_rejected(token):
+    assert decode_signed_session_token(token) is None
+
+
+def test_validly_signed_garbage_payload_is_rejected():
+    message = "s1.bm90LWpzb24"  # base64url of "not-json"
+    assert decode_signed_session_token(f"{message}.{security._sign(message)}") is None
+
+
+def test_expired_token_is_rejected():
+    now = int(time.time() * 1000)
+    token = _signed({"sub": "user-1", "iat": now - 7_200_000, "exp": now - 1_000, "jti": "x"})
+
+    assert decode_signed_session_token(token) is None
+
+
+# ---------- resolve_request_identity ----------
+
+
+class _Cursor:
+    def __init__(self, rows: list[dict]):
+        self._rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class _RevokedTokens:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+
+    def find(self, *args, **kwargs) -> _Cursor:
+        return _Cursor(self.rows)
+
+
+@pytest.fixture
+def user() -> User:
+    return User(
+        id=PydanticObjectId(),
+        name="Test User",
+        email="test.user@example.com",
+        hashed_password="unused",
+    )
+
+
+@pytest.fixture
+def revocations(monkeypatch) -> SessionRevocations:
+    """A fresh revocation list (not loaded) in place of the worker-wide one."""
+    revocations = SessionRevocations(interval=0)
+    monkeypatch.setattr(auth, "session_revocations", revocations)
+    monkeypatch.setattr(auth, "session_cache", SessionCache(60, 10, 100))
+    return revocations
+
+
+@pytest.fixture
+def session_lookups(monkeypatch, user) -> list[str]:
+    """Record session-table lookups; every looked-up token resolves to ``user``."""
+    calls: list[str] = []
+
+    async def load_active_session(token: str):
+        calls.append(token)
+        session = SessionToken(
+            id=PydanticObjectId(),
+            user_id=user.id,
+            token_hash=auth._hash_token(token),
+            expires_at=datetime.now(UTC) + timedelta(hours=1),
+        )
+        return session, user
+
+    async def load_active_user(user_id: PydanticObjectId) -> User:
+        assert user_id == user.id
+        return user
+
+    monkeypatch.setattr(auth, "_load_active_session", load_active_session)
+    monkeypatch.setattr(auth, "_load_active_user", load_active_user)
+    return calls
+
+
+def _load_revocations(monkeypatch, revocations: SessionRevocations, token_hashes: list[str]):
+    rows = [
+        {
+            "token_hash": token_hash,
+            "expires_at": datetime.now(UTC) + timedelta(hours=1),
+            "revoked_at": datetime.now(UTC),
+        }
+        for token_hash in token_hashes
+    ]
+    collection = _RevokedTokens(rows)
+    monkeypatch.setattr(SessionToken, "get_pymongo_collection", classmethod(lambda cls: collection))
+    asyncio.run(revocations.load())
+
+
+def test_signed_token_resolves_without_session_lookup(
+    monkeypatch, revocations, session_lookups, user
+):
+    _load_revocations(monkeypatch, revocations, [])
+    token, _ = generate_signed_session_token(str(user.id))
+
+    identity = asyncio.run(resolve_request_identity(token))
+
+    assert identity.object_id == str(user.id)
+    assert session_lookups == []
+
+
+def test_revoked_signed_token_is_rejected_after_load(
+    monkeypatch, revocations, session_lookups, user
+):
+    token, _ = generate_signed_session_token(str(user.id))
+    _load_revocations(monkeypatch, revocations, [auth._hash_token(token)])
+
+    assert revocations.ready
+    with pytest.raises(AuthenticationError):
+        asyncio.run(resolve_request_identity(token))
+    assert session_lookups == []
+
+
+def test_tampered_signed_token_is_rejected_after_load(
+    monkeypatch, revocations, session_lookups, user
+):
+    _load_revocations(monkeypatch, revocations, [])
+    token, _ = generate_signed_session_token(str(user.id))
+
+    with pytest.raises(AuthenticationError):
+        asyncio.run(resolve_request_identity(token[:-1] + ("0" if token[-1] != "0" else "1")))
+    assert session_lookups == []
+
+
+def test_expired_signed_token_is_rejected_after_load(
+    monkeypatch, revocations, session_lookups, user
+):
+    _load_revocations(monkeypatch, revocations, [])
+    now = int(time.time() * 1000)
+    token = _signed({"sub": str(user.id), "iat": now - 7_200_000, "exp": now - 1_000, "jti": "x"})
+
+    with pytest.raises(AuthenticationError):
+        asyncio.run(resolve_request_identity(token))
+
+
+def test_signed_token_falls_back_to_session_lookup_before_ready(revocations, session_lookups, user):
+    token, _ = generate_signed_session_token(str(user.id))
+
+    assert not revocations.ready
+    identity = asyncio.run(resolve_request_identity(token))
+
+    assert identity.object_id == str(user.id)
+    assert session_lookups == [token]
+
+
+def test_opaque_token_uses_session_lookup(monkeypatch, revocations, session_lookups, user):
+    _load_revocations(monkeypatch, revocations, [])
+    token, _ = generate_session_token(str(user.id))
+
+    identity = asyncio.run(resolve_request_identity(token))
+
+    assert identity.object_id == str(user.id)
+    assert session_lookups == [token]